@@ -23,13 +23,32 @@ import ifcopenshell
 import ifcopenshell.api
 import asyncio
 import threading
+import collections
 import websockets # <- 이제 이 import가 정상적으로 동작합니다.
 from bpy.app.handlers import persistent
 import io
 import subprocess
+import tempfile
 import time
 import urllib.request
+import uuid
 import webbrowser
+import numpy as np
+
+from .ifc_extractor import ElementExtractor
+from .ifc_model import IfcModelProvider, get_ifc_store
+from .parallel_extract import ParallelExtraction
+from .extraction_cache import ExtractionCache
+from .delta_sync import DeltaTracker, FingerprintStore
+from .quantity_columns import QuantityColumns, encode_quantity_frames
+from .flow_control import ACK_WINDOW, FlowControl
+from .send_queue import SendQueue, SendQueueClosed
+from .command_inbox import INBOX_FIRST_IDLE_INTERVAL, CommandInbox
+from .fetch_session import RESEND_BUFFER_UNACKED_BYTES, RESUME_TIMEOUT, Backoff, ResendBuffer, ResumeError
+from .element_index import ElementIndex
+from .selection_sync import SelectionTracker
+from .viewport_batch import category_colors, union_bounds, value_colors, view_distance_for_bounds
+from . import protocol
 
 
 bl_info = {
@@ -41,21 +60,89 @@ bl_info = {
 
 # --- 전역 변수 관리 ---
 websocket_client = None
-event_queue = asyncio.Queue()
+command_inbox = CommandInbox(protocol.INTERACTIVE_COMMANDS) # 웹소켓 스레드 -> 메인 스레드 명령 전달
 status_message = "연결 대기 중..."
 websocket_thread_loop = None
+websocket_thread = None
+websocket_stop_event = None # 사용자가 연결을 끊으면 설정되어 재연결을 멈춥니다. (웹소켓 스레드의 asyncio.Event)
+wire_format = protocol.WIRE_FORMAT_JSON # 서버가 server_hello 로 고른 송신 프레임 형식. 연결이 끊기면 JSON 으로 돌아갑니다.
+server_fetch_resume = False # 서버가 server_hello 에서 전송 재개(resume_fetch)를 지원한다고 알렸으면 True
+send_queue = None # 현재 연결의 송신 큐 (웹소켓 스레드가 소유). 연결되어 있지 않으면 None.
 
 server_process = None
 server_status = "서버 꺼짐" # "서버 꺼짐", "시작 중...", "실행 중", "오류"
 SERVER_CHECK_TIMEOUT = 30 
 
+FETCH_CHUNK_SIZE = 100 # 추출·디스크 캐시 단위(요소 수). 전송 메시지 크기는 flow_control 의 목표 바이트 크기로 정합니다.
+SEND_TIMEOUT = 30
+FETCH_TICK_BUDGET = 0.008 # 타이머 한 번에 추출에 쓰는 최대 시간(초). 이 시간만큼만 블렌더 UI 를 점유합니다.
+FETCH_WAIT_INTERVAL = 0.005 # 송신 버퍼가 가득 찼을 때 다시 시도하기까지의 간격(초)
+PANEL_REDRAW_INTERVAL = 0.2
+FETCH_SUPERSEDED = "superseded" # 뒤의 같은 요청으로 대체된 전송 요청의 fetch_cancelled reason
+ISOLATE_COLLECTION_NAME = "CostEstimator Isolate" # isolate_elements 대상 객체를 링크하는 임시 컬렉션
+ISOLATE_STATE_KEY = "costestimator_isolate" # 임시 컬렉션에 저장하는 격리 전 상태(JSON). 파일을 저장했다 열어도 unhide_all 로 되돌릴 수 있습니다.
+active_fetch_job = None
+deferred_cache_invalidations = [] # 전송 작업 중 받은 invalidate_cache 의 unique_ids (None 이면 전체). 작업이 끝나면 적용합니다.
+queued_fetch_requests = [] # 다른 전송 작업이 진행 중일 때 받은 (command_data, job_class). 작업이 끝나면 차례로 시작합니다.
+cancelled_request_ids = collections.deque(maxlen=64) # 시작하기 전에 취소된 요청도 무시하도록 최근 취소한 request_id 를 기억합니다.
+
+ifc_model_provider = IfcModelProvider()
+element_index = ElementIndex() # GlobalId <-> step id <-> 객체 (선택 명령용)
+selection_tracker = SelectionTracker() # subscribe_selection 구독 상태와 마지막으로 알린 선택
+color_backup = {} # colorize_elements 로 칠하기 전 객체 색: GlobalId -> 선형 RGBA (reset_colors 로 되돌림)
+shading_color_type_backup = None # 객체 색을 보이게 바꾸기 전 3D 뷰 솔리드 셰이딩의 color_type
+extraction_cache = ExtractionCache()
+sent_fingerprints = FingerprintStore() # 프로젝트별로 서버에 마지막으로 보낸 요소 지문 (fetch_delta 비교 기준)
+
+
+def is_connection_alive():
+    return websocket_thread is not None and websocket_thread.is_alive()
 
-def schedule_blender_task(task_callable, *args, **kwargs):
-    def safe_task():
-        try: task_callable(*args, **kwargs)
-        except Exception as e: print(f"Blender 작업 실행 오류: {e}")
-        return None
-    bpy.app.timers.register(safe_task)
+
+@persistent
+def on_load_post(*args):
+    """새 .blend 파일을 열면 이전 파일의 IFC 모델 캐시, GlobalId 색인, 색칠 전 색을 비웁니다.
+
+    진행 중인 전송 작업은 이전 파일의 모델을 보내고 있으므로 취소하고(fetch_cancelled), 대기 중인 다음 요청을 시작합니다.
+    """
+    global shading_color_type_backup
+    ifc_model_provider.invalidate()
+    element_index.invalidate()
+    color_backup.clear()
+    shading_color_type_backup = None
+    if active_fetch_job:
+        cancel_active_fetch("다른 파일을 열었음")
+        start_queued_fetch()
+
+@persistent
+def on_undo_redo(*args):
+    """undo/redo 는 객체를 다시 만들어 색인의 객체 참조가 무효가 됩니다."""
+    element_index.invalidate_objects()
+
+@persistent
+def on_depsgraph_update_post(scene, depsgraph):
+    """객체가 추가·삭제되거나 컬렉션을 옮기면 색인의 객체 쪽을 버리고, step id 가 바뀐 객체는 색인을 고칩니다.
+
+    선택 변경도 depsgraph 업데이트로 알려지므로, 구독 중이면 선택 비교를 예약합니다.
+    장면 객체 수를 세는 것은 객체 전체를 훑으므로(O(n)) 객체가 갱신된 업데이트에서만 합니다.
+    """
+    if selection_tracker.subscribed:
+        selection_tracker.mark_changed(time.perf_counter())
+        if not bpy.app.timers.is_registered(push_selection_changes):
+            bpy.app.timers.register(push_selection_changes, first_interval=selection_tracker.debounce)
+    if not element_index.objects_valid or scene != bpy.context.scene: return
+    # 컬렉션 링크가 바뀌면 객체 수가 같아도 장면 객체 순서(위치 정보)가 달라질 수 있습니다.
+    if depsgraph.id_type_updated('COLLECTION'):
+        element_index.invalidate_objects()
+        return
+    if not depsgraph.id_type_updated('OBJECT'): return
+    if len(scene.objects) != element_index.object_count:
+        element_index.invalidate_objects()
+        return
+    for update in depsgraph.updates:
+        if isinstance(update.id, bpy.types.Object): element_index.update_object(update.id.original)
+
+INDEX_HANDLERS = (("load_post", on_load_post), ("undo_post", on_undo_redo), ("redo_post", on_undo_redo), ("depsgraph_update_post", on_depsgraph_update_post))
 
 
 def stop_server_process():
@@ -80,173 +167,1063 @@ def stop_server_process():
 def get_ifc_file():
     try:
         ifc_file_path = bpy.data.scenes["Scene"].BIMProperties.ifc_file
+        # Bonsai(BlenderBIM)가 이미 메모리에 올린 모델이 있으면 그대로 재사용합니다.
+        live_file = ifc_model_provider.get_live_file(ifc_file_path)
+        if live_file is not None: return live_file, None
         if not ifc_file_path or not os.path.exists(ifc_file_path):
             return None, "IFC 파일 경로를 찾을 수 없습니다. BlenderBIM 프로젝트를 확인하세요."
-        return ifcopenshell.open(ifc_file_path), None
+        ifc_file, source = ifc_model_provider.get_file(ifc_file_path)
+        if source == "disk": print(f"📂 [Blender] IFC 파일을 열었습니다: {ifc_file_path}")
+        return ifc_file, None
     except Exception as e:
         print(f"IFC 파일을 여는 데 실패했습니다: {e}")
         return None, f"IFC 파일을 여는 데 실패했습니다: {e}"
 
-def get_quantity_value(quantity):
-    if quantity.is_a("IfcQuantityArea"): return quantity.AreaValue
-    if quantity.is_a("IfcQuantityLength"): return quantity.LengthValue
-    if quantity.is_a("IfcQuantityVolume"): return quantity.VolumeValue
-    if quantity.is_a("IfcQuantityCount"): return quantity.CountValue
-    if quantity.is_a("IfcQuantityWeight"): return quantity.WeightValue
-    return None
+def live_model_has_unsaved_changes():
+    """Bonsai 모델에 저장되지 않은 편집이 있을 수 있으면 True. 판단할 수 없으면 안전하게 True 를 반환합니다."""
+    is_dirty = getattr(bpy.context.scene.BIMProperties, "is_dirty", None)
+    if is_dirty is not None: return bool(is_dirty)
+    ifc_store = get_ifc_store()
+    history = getattr(ifc_store, "history", None) if ifc_store else None
+    return history is None or bool(history)
 
-def serialize_ifc_elements_to_string_list(ifc_file):
-    elements_data = []
-    products = ifc_file.by_type("IfcProduct")
-    print(f"🔍 [Blender] {len(products)}개의 IFC 객체 데이터 직렬화를 시작합니다.") # 디버깅 추가
-    for element in products:
-        if not element.GlobalId: continue
-        element_dict = { "Name": element.Name or "이름 없음", "IfcClass": element.is_a(), "ElementId": element.id(), "UniqueId": element.GlobalId, "Parameters": {}, "TypeParameters": {}, "RelatingType": None, "SpatialContainer": None, "Aggregates": None, "Nests": None, }
-        is_spatial_element = element.is_a("IfcSpatialStructureElement")
-        try:
-            if hasattr(element, 'IsDefinedBy') and element.IsDefinedBy:
-                for definition in element.IsDefinedBy:
-                    if definition.is_a("IfcRelDefinesByProperties"):
-                        prop_set = definition.RelatingPropertyDefinition
-                        if prop_set and prop_set.is_a("IfcPropertySet"):
-                            if hasattr(prop_set, 'HasProperties') and prop_set.HasProperties:
-                                for prop in prop_set.HasProperties:
-                                    # ▼▼▼ [수정] 구분자를 '.'에서 '__'로 변경 ▼▼▼
-                                    if prop.is_a("IfcPropertySingleValue"): 
-                                        prop_key = f"{prop_set.Name}__{prop.Name}"
-                                        element_dict["Parameters"][prop_key] = prop.NominalValue.wrappedValue if prop.NominalValue else None
-                                        # print(f"  - 파라미터 추가: {prop_key}") # 상세 디버깅 필요시 주석 해제
-            if not is_spatial_element:
-                if hasattr(element, 'IsDefinedBy') and element.IsDefinedBy:
-                    for definition in element.IsDefinedBy:
-                        if definition.is_a("IfcRelDefinesByProperties"):
-                            prop_set = definition.RelatingPropertyDefinition
-                            if prop_set and prop_set.is_a("IfcElementQuantity"):
-                                if hasattr(prop_set, 'Quantities') and prop_set.Quantities:
-                                    for quantity in prop_set.Quantities:
-                                        prop_value = get_quantity_value(quantity)
-                                        if prop_value is not None:
-                                            # ▼▼▼ [수정] 구분자를 '.'에서 '__'로 변경 ▼▼▼
-                                            prop_key = f"{prop_set.Name}__{quantity.Name}"
-                                            element_dict["Parameters"][prop_key] = prop_value
-                                            # print(f"  - 수량 파라미터 추가: {prop_key}") # 상세 디버깅 필요시 주석 해제
-                if hasattr(element, 'IsTypedBy') and element.IsTypedBy:
-                    type_definition = element.IsTypedBy[0]
-                    if type_definition and type_definition.is_a("IfcRelDefinesByType"):
-                        relating_type = type_definition.RelatingType
-                        if relating_type:
-                            element_dict["RelatingType"] = relating_type.Name
-                            if hasattr(relating_type, 'HasPropertySets') and relating_type.HasPropertySets:
-                                for prop_set in relating_type.HasPropertySets:
-                                    if prop_set and prop_set.is_a("IfcPropertySet"):
-                                        if hasattr(prop_set, 'HasProperties') and prop_set.HasProperties:
-                                            for prop in prop_set.HasProperties:
-                                                # ▼▼▼ [수정] 구분자를 '.'에서 '__'로 변경 ▼▼▼
-                                                if prop.is_a("IfcPropertySingleValue"): 
-                                                    prop_key = f"{prop_set.Name}__{prop.Name}"
-                                                    element_dict["TypeParameters"][prop_key] = prop.NominalValue.wrappedValue if prop.NominalValue else None
-                                                    # print(f"  - 타입 파라미터 추가: {prop_key}") # 상세 디버깅 필요시 주석 해제
-                if hasattr(element, 'ContainedInStructure') and element.ContainedInStructure: element_dict["SpatialContainer"] = f"{element.ContainedInStructure[0].RelatingStructure.is_a()}: {element.ContainedInStructure[0].RelatingStructure.Name}"
-            if hasattr(element, 'Decomposes') and element.Decomposes: element_dict["Aggregates"] = f"{element.Decomposes[0].RelatingObject.is_a()}: {element.Decomposes[0].RelatingObject.Name}"
-            if hasattr(element, 'Nests') and element.Nests: element_dict["Nests"] = f"{element.Nests[0].RelatingObject.is_a()}: {element.Nests[0].RelatingObject.Name}"
-        except (AttributeError, IndexError, TypeError): pass
-        elements_data.append(json.dumps(element_dict))
-    print(f"✅ [Blender] 객체 데이터 직렬화 완료.") # 디버깅 추가
-    return elements_data
-def get_selected_element_guids():
-    guids = []
+def get_element_index():
+    """현재 IFC 파일과 장면 기준으로 최신인 GlobalId 색인. IFC 파일을 열 수 없으면 None."""
     ifc_file, error = get_ifc_file()
-    if error: return guids
-    for obj in bpy.context.selected_objects:
-        if hasattr(obj, "BIMObjectProperties") and hasattr(obj.BIMObjectProperties, "ifc_definition_id"):
-            step_id = obj.BIMObjectProperties.ifc_definition_id
-            if step_id:
-                element = ifc_file.by_id(step_id)
-                if element and element.GlobalId: guids.append(element.GlobalId)
-    return guids
+    if error: return None
+    element_index.ensure(ifc_file, bpy.context.scene.objects)
+    return element_index
+
+def get_selected_element_guids():
+    index = get_element_index()
+    if index is None: return []
+    return index.guids_for_objects(bpy.context.selected_objects)
+
+def apply_selection(target_objects, selected_objects):
+    """선택을 target_objects 로 바꿉니다. select_all 연산자 대신 선택 상태가 바뀌는 객체만 select_set 합니다."""
+    targets = set(target_objects)
+    for obj in selected_objects:
+        if obj not in targets: obj.select_set(False)
+    already_selected = set(selected_objects)
+    for obj in target_objects:
+        if obj in already_selected: continue
+        try: obj.select_set(True)
+        except RuntimeError: pass # 제외된 컬렉션에 있어 뷰 레이어에 없는 객체
+
+def frame_objects_in_view(target_objects):
+    """대상 객체들의 월드 공간 합집합 경계 상자로 첫 번째 3D 뷰를 맞춥니다.
+
+    장면 전체의 matrix_world/bound_box 를 foreach_get 으로 한 번에 읽고 NumPy 로 계산합니다.
+    위치를 모르는 객체가 있으면 대상 객체의 값만 하나씩 읽어 같은 방식으로 계산합니다. (현재 선택이 아닌 대상을 맞춤)
+    """
+    area = next((area for area in bpy.context.screen.areas if area.type == 'VIEW_3D'), None)
+    if area is None or not target_objects: return
+    index = get_element_index()
+    positions = index.positions_for_objects(target_objects) if index is not None else None
+    if positions is not None:
+        objects = bpy.context.scene.objects
+        count = len(objects)
+        matrices = np.empty(count * 16, dtype=np.float32)
+        corners = np.empty(count * 24, dtype=np.float32)
+        objects.foreach_get("matrix_world", matrices)
+        objects.foreach_get("bound_box", corners)
+    else:
+        # foreach_get 과 같은 배치: 행렬은 열 우선, 경계 상자는 꼭짓점 8개 * xyz
+        matrices = np.array([[value for column in obj.matrix_world.col for value in column] for obj in target_objects], dtype=np.float32)
+        corners = np.array([[tuple(corner) for corner in obj.bound_box] for obj in target_objects], dtype=np.float32)
+        positions = range(len(target_objects))
+    space = area.spaces.active
+    region_3d = space.region_3d
+    center, distance = view_distance_for_bounds(*union_bounds(matrices, corners, positions), space.lens)
+    if region_3d.view_perspective == 'CAMERA': region_3d.view_perspective = 'PERSP'
+    region_3d.view_location = center
+    region_3d.view_distance = distance
+    area.tag_redraw()
 
 def select_elements_by_guids(guids):
+    selected_objects = bpy.context.selected_objects
     if not guids:
-        bpy.ops.object.select_all(action='DESELECT')
+        apply_selection([], selected_objects)
+        if selection_tracker.subscribed: selection_tracker.reset([]) # 서버가 요청한 선택 해제도 다시 알리지 않습니다.
         return
-    ifc_file, error = get_ifc_file()
-    if error: return
-    target_step_ids = {ifc_file.by_guid(guid).id() for guid in guids if ifc_file.by_guid(guid)}
-    if not target_step_ids: return
-    bpy.ops.object.select_all(action='DESELECT')
-    target_objects = []
-    for obj in bpy.context.scene.objects:
-        if hasattr(obj, "BIMObjectProperties") and hasattr(obj.BIMObjectProperties, "ifc_definition_id"):
-            if obj.BIMObjectProperties.ifc_definition_id in target_step_ids:
-                obj.select_set(True)
-                target_objects.append(obj)
-    if target_objects:
-        bpy.context.view_layer.objects.active = target_objects[0]
-        for area in bpy.context.screen.areas:
-            if area.type == 'VIEW_3D':
-                override = {'area': area, 'region': next(r for r in area.regions if r.type == 'WINDOW')}
-                with bpy.context.temp_override(**override): bpy.ops.view3d.view_selected(use_all_regions=False)
-                break
-
-def send_message_to_server(message_dict):
-    if websocket_client and websocket_thread_loop: asyncio.run_coroutine_threadsafe(websocket_client.send(json.dumps(message_dict)), websocket_thread_loop)
-
-async def websocket_handler(uri):
-    global websocket_client, status_message
+    index = get_element_index()
+    if index is None: return
+    target_objects = index.objects_for_guids(guids)
+    if not target_objects: return
+    try: apply_selection(target_objects, selected_objects)
+    except ReferenceError:
+        # 색인이 놓친 삭제로 무효가 된 객체 참조: 객체 쪽을 다시 만들어 한 번 더 시도합니다.
+        index.invalidate_objects()
+        index = get_element_index()
+        target_objects = index.objects_for_guids(guids)
+        if not target_objects: return
+        apply_selection(target_objects, bpy.context.selected_objects)
+    # 서버가 요청한 선택은 다시 알리지 않습니다.
+    if selection_tracker.subscribed: selection_tracker.reset(index.guids_for_objects(target_objects))
+    bpy.context.view_layer.objects.active = target_objects[0]
+    frame_objects_in_view(target_objects)
+
+def send_message_to_server(message_dict, priority=False):
+    return send_frame_to_server(protocol.encode_message(message_dict, wire_format), priority=priority)
+
+def send_frame_to_server(frame, timeout=SEND_TIMEOUT, priority=False):
+    """프레임을 송신 큐에 넣습니다. str 은 텍스트 프레임, bytes 는 바이너리 프레임으로 전송됩니다.
+
+    큐가 가득 차면 timeout 초까지 기다립니다. priority 이면 대량 전송 중이어도 기다리지 않고 먼저 보냅니다.
+    연결이 없거나 넣지 못하면 False 를 반환합니다.
+    """
+    queue = send_queue
+    if queue is None: return False
+    try: queue.put(frame, timeout, priority)
+    except (ConnectionError, TimeoutError) as e:
+        print(f"⚠️ [Blender] 메시지 전송 실패: {e}")
+        return False
+    return True
+
+async def websocket_handler(uri, stop_event):
+    """연결이 끊어지면 지수 백오프로 다시 연결합니다. 처음 연결에 실패하거나 사용자가 끊으면(stop_event) 끝납니다."""
+    global status_message
+    backoff = Backoff()
+    connected_once = False
+    while not stop_event.is_set():
+        if await websocket_connection(uri):
+            connected_once = True
+            backoff.reset()
+        if stop_event.is_set() or not connected_once: break
+        if backoff.exhausted:
+            status_message = f"{backoff.max_attempts}번 다시 연결하지 못해 중단했습니다."
+            break
+        delay = backoff.next_delay()
+        status_message = f"연결이 끊어졌습니다. {delay:.1f}초 뒤 다시 연결합니다... ({backoff.attempt}/{backoff.max_attempts})"
+        print(f"🔄 [Blender] {status_message}")
+        try: await asyncio.wait_for(stop_event.wait(), delay)
+        except asyncio.TimeoutError: pass
+
+async def websocket_connection(uri):
+    """연결 하나를 끝날 때까지 처리합니다. 연결이 맺어졌었으면 True 를 반환합니다."""
+    global websocket_client, status_message, wire_format, send_queue, server_fetch_resume
+    wire_format = protocol.WIRE_FORMAT_JSON
+    server_fetch_resume = False
+    queue = send_task = receive_task = None
+    connected = False
     try:
         async with websockets.connect(uri) as websocket:
             websocket_client = websocket; status_message = "서버에 연결되었습니다."
-            while True:
-                try:
-                    message_str = await asyncio.wait_for(websocket.recv(), timeout=1.0)
-                    message_data = json.loads(message_str)
-                    await event_queue.put(message_data)
-                except asyncio.TimeoutError: continue
-                except websockets.exceptions.ConnectionClosed: break
+            connected = True
+            await websocket.send(protocol.encode_message(protocol.client_hello()))
+            queue = SendQueue(asyncio.get_running_loop())
+            send_task = asyncio.create_task(queue.run(websocket))
+            send_queue = queue
+            # 수신은 프레임이 도착할 때만 깨어납니다. 송신 작업이 실패해 끝나도 연결을 정리합니다.
+            receive_task = asyncio.create_task(command_inbox.receive(websocket, protocol.decode_message))
+            done, _ = await asyncio.wait((receive_task, send_task), return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                try: task.result()
+                except websockets.exceptions.ConnectionClosed: pass
     except Exception as e: status_message = f"연결 실패: {e}"; traceback.print_exc()
-    finally: status_message = "연결이 끊어졌습니다."; websocket_client = None
+    finally:
+        status_message = "연결이 끊어졌습니다."; websocket_client = None; wire_format = protocol.WIRE_FORMAT_JSON
+        send_queue = None
+        selection_tracker.subscribed = False # 구독은 연결 단위입니다. 다시 연결되면 서버가 다시 구독합니다.
+        if queue: queue.close()
+        tasks = [task for task in (send_task, receive_task) if task]
+        for task in tasks: task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    return connected
 
 def run_websocket_in_thread(uri):
+    """메인 스레드에서 호출합니다. 웹소켓 스레드를 시작하고 명령함 타이머를 등록합니다."""
+    global websocket_thread, websocket_thread_loop, websocket_stop_event
+    loop = asyncio.new_event_loop()
+    stop_event = asyncio.Event()
+    websocket_thread_loop, websocket_stop_event = loop, stop_event
     def loop_in_thread():
-        global websocket_thread_loop
-        loop = asyncio.new_event_loop(); asyncio.set_event_loop(loop)
-        websocket_thread_loop = loop
-        loop.run_until_complete(websocket_handler(uri))
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(websocket_handler(uri, stop_event))
         loop.close()
-    thread = threading.Thread(target=loop_in_thread, daemon=True); thread.start()
+    websocket_thread = threading.Thread(target=loop_in_thread, daemon=True); websocket_thread.start()
+    # 연결은 파일을 열어도 유지되므로 명령함 타이머도 persistent 로 등록합니다. (연결이 끊기면 스스로 해제됩니다)
+    if not bpy.app.timers.is_registered(process_command_inbox_timer):
+        bpy.app.timers.register(process_command_inbox_timer, first_interval=INBOX_FIRST_IDLE_INTERVAL, persistent=True)
 
-def process_event_queue_timer():
+def stop_websocket():
+    """웹소켓 스레드에 재연결을 멈추고 현재 연결을 닫으라고 알립니다."""
+    global websocket_client, websocket_thread_loop, websocket_stop_event
+    loop, stop_event, client = websocket_thread_loop, websocket_stop_event, websocket_client
+    if loop is None or loop.is_closed(): return
     try:
-        while not event_queue.empty():
-            command_data = event_queue.get_nowait()
-            command = command_data.get("command")
-            if command == "fetch_all_elements_chunked": schedule_blender_task(handle_fetch_all_elements, command_data)
-            elif command == "get_selection": schedule_blender_task(handle_get_selection)
-            elif command == "select_elements": schedule_blender_task(select_elements_by_guids, command_data.get("unique_ids", []))
-    except Exception as e: print(f"이벤트 큐 처리 중 오류: {e}")
-    return 0.1
-
-def handle_fetch_all_elements(command_data):
-    global status_message
+        if stop_event: loop.call_soon_threadsafe(stop_event.set)
+        if client: asyncio.run_coroutine_threadsafe(client.close(), loop)
+    except RuntimeError: pass # 스레드가 방금 끝나 루프가 닫혔습니다.
+    websocket_client = websocket_thread_loop = websocket_stop_event = None
+
+def process_command_inbox_timer():
+    """쌓인 명령을 처리합니다. 명령이 오가는 동안은 바로 다시, 조용하면 점점 늦게 확인하고, 연결이 없으면 해제됩니다."""
+    commands = command_inbox.drain()
+    for command_data in commands: dispatch_command(command_data)
+    if not commands and not is_connection_alive():
+        command_inbox.clear()
+        queued_fetch_requests.clear()
+        return None
+    return command_inbox.next_interval(bool(commands))
+
+def dispatch_priority_commands():
+    """긴 작업이 틱마다 호출합니다. 선택 같은 대화형 명령이 다음 명령함 타이머까지 기다리지 않게 합니다."""
+    for command_data in command_inbox.drain(priority_only=True): dispatch_command(command_data)
+
+def dispatch_command(command_data):
+    global wire_format, server_fetch_resume
+    try:
+        command = command_data.get("command")
+        if command == "server_hello":
+            wire_format = protocol.negotiate_wire_format(command_data)
+            server_fetch_resume = bool(command_data.get("fetch_resume"))
+        elif command == "ack":
+            if active_fetch_job: active_fetch_job.on_ack(command_data)
+        elif command == "resume_fetch":
+            if active_fetch_job: active_fetch_job.on_resume(command_data)
+        elif command == "fetch_all_elements_chunked": handle_fetch_all_elements(command_data)
+        elif command == "fetch_delta": handle_fetch_delta(command_data)
+        elif command == "fetch_quantities_columnar": handle_fetch_quantities_columnar(command_data)
+        elif command == "get_selection": handle_get_selection()
+        elif command == "select_elements": select_elements_by_guids(command_data.get("unique_ids", []))
+        elif command == "invalidate_cache": handle_invalidate_cache(command_data)
+        elif command == "cancel": handle_cancel(command_data)
+        elif command == "subscribe_selection": handle_subscribe_selection(command_data)
+        elif command == "colorize_elements": handle_colorize_elements(command_data)
+        elif command == "reset_colors": handle_reset_colors()
+        elif command == "isolate_elements": handle_isolate_elements(command_data)
+        elif command == "unhide_all": handle_unhide_all()
+    except Exception as e: print(f"명령 처리 중 오류 ({command_data.get('command')}): {e}"); traceback.print_exc()
+
+_FETCH_WAIT = object() # 송신 버퍼가 가득 차 다음 틱까지 쉬어야 함을 뜻하는 표식
+
+class FetchJob:
+    """bpy.app.timers 로 틱마다 FETCH_TICK_BUDGET 초만큼씩 실행되는 재개 가능한 추출·전송 작업.
+
+    블렌더를 멈추지 않도록 요소·관계 하나 단위로 제어를 돌려받고, 시간 예산을 다 쓰면 다음 틱으로 넘어갑니다.
+    연결이 끊어지면 다시 연결될 때까지 기다렸다가 서버가 처리한 다음 메시지부터 이어서 보냅니다. (fetch_session 참고)
+    """
+    resumable = True
+
+    def __init__(self, command_data):
+        self.command_data = command_data
+        self.project_id = command_data.get("project_id")
+        self.request_id = command_data.get("request_id")
+        self.cancelled = False
+        self._ticking = False
+        self.phase = "준비 중"
+        self.source = ""
+        self.extractor = None
+        self.total_elements = 0
+        self.processed_count = 0
+        self.started_at = time.perf_counter()
+        self.send_queue = send_queue # 작업은 시작할 때의 연결에만 보냅니다.
+        self.wire_format = wire_format # 작업 도중 협상이 바뀌어도 한 작업의 메시지는 같은 형식으로 보냅니다.
+        self.element_format = protocol.negotiate_element_format(command_data)
+        self.flow = FlowControl(ACK_WINDOW if command_data.get("flow_control") == "ack" else None)
+        self.parameter_encoding = protocol.negotiate_parameter_encoding(command_data)
+        self.key_encoder = protocol.KeyTableEncoder() if self.parameter_encoding == protocol.PARAMETER_ENCODING_KEY_TABLE else None
+        self.session_id = uuid.uuid4().hex if self.resumable else None
+        self.next_seq = 0
+        # 서버가 확인해 줄 때만(ack 모드 또는 재개 지원) 확인받을 때까지 보관합니다. (fetch_session 참고)
+        self.resend_until_ack = self.flow.uses_ack or server_fetch_resume
+        self.resend = ResendBuffer() if self.resend_until_ack else ResendBuffer(RESEND_BUFFER_UNACKED_BYTES)
+        self.resume_reply = None
+        self._in_sequence = False # hold 프레임을 넣은 뒤 묶음의 마지막 프레임을 아직 넣지 않았으면 True
+        self._steps = self._run()
+        self._last_redraw = 0.0
+        self.timer = self.tick # 등록/해제 시 같은 객체를 쓰도록 바운드 메서드를 보관
+
+    @property
+    def progress(self):
+        return min(self.processed_count / self.total_elements, 1.0) if self.total_elements else 0.0
+
+    def start(self):
+        # 파일을 열어도 타이머가 해제되지 않도록 persistent 로 등록합니다. (파일을 열면 on_load_post 가 취소합니다)
+        bpy.app.timers.register(self.timer, persistent=True)
+
+    def cancel(self):
+        """작업을 멈춥니다. 추출 생성기를 닫으므로 끝나지 않은 디스크 캐시 기록과 작업자 프로세스도 정리됩니다."""
+        self.cancelled = True
+        # 자신의 틱 안에서 취소되면 틱이 None 을 반환해 타이머가 해제됩니다.
+        if not self._ticking and bpy.app.timers.is_registered(self.timer): bpy.app.timers.unregister(self.timer)
+        self._steps.close()
+        self._end_sequence()
+
+    def _end_sequence(self):
+        """끝내지 못한 묶음이 있으면 송신 큐가 따로 둔 다른 메시지를 보내게 합니다."""
+        if self._in_sequence and self.send_queue is not None: self.send_queue.end_sequence(self)
+        self._in_sequence = False
+
+    def _take_seq(self):
+        seq = self.next_seq
+        self.next_seq += 1
+        return seq
+
+    def _connection_lost(self):
+        return self.send_queue is None or self.send_queue.closed
+
+    def _send_frame(self, frame, seq=None, hold=False):
+        """프레임을 송신 큐에 넣습니다. seq 가 있는 세션 메시지는 연결이 끊어져도 다시 연결한 뒤 이어서 보냅니다.
+
+        hold: 바로 뒤의 프레임과 묶어 보내야 해서 사이에 다른 프레임이 끼어들면 안 되는 프레임. (SendQueue 참고)
+        """
+        if seq is not None:
+            if not self.resend_until_ack: self._trim_resend(seq)
+            self.resend.add(seq, frame)
+        sequence = self if hold or self._in_sequence else None
+        while True:
+            try:
+                if self.send_queue is None: raise SendQueueClosed("웹소켓 연결이 없습니다.")
+                if self.send_queue.try_put(frame, hold=hold, sequence=sequence):
+                    self._in_sequence = hold
+                    return
+            except SendQueueClosed:
+                if seq is None: raise
+                yield from self._resume() # 이 프레임도 함께 다시 보냅니다.
+                return
+            yield _FETCH_WAIT
+
+    def _trim_resend(self, seq):
+        """송신 큐가 비었으면 seq 이전 메시지는 모두 소켓에 넘겼으므로 보관하지 않습니다."""
+        try: idle = self.send_queue is not None and self.send_queue.is_idle()
+        except SendQueueClosed: return
+        if idle: self.resend.ack(seq - 1)
+
+    def _send(self, message_dict, hold=False):
+        seq = None
+        if self.session_id:
+            seq = self._take_seq()
+            message_dict = dict(message_dict, payload=dict(message_dict["payload"], seq=seq))
+        yield from self._send_frame(protocol.encode_message(message_dict, self.wire_format), seq, hold)
+
+    def _resume(self):
+        """새 연결을 기다렸다가 재개를 요청하고, 서버가 처리했다고 알린 메시지 다음부터 다시 보냅니다."""
+        global status_message
+        if not self.session_id: raise ResumeError("웹소켓 연결이 끊어졌습니다.")
+        phase, self.phase = self.phase, "재연결 대기 중"
+        deadline = time.perf_counter() + RESUME_TIMEOUT
+        lost_queue = self.send_queue
+        self._redraw_panel(force=True)
+        while True:
+            if not is_connection_alive(): raise ResumeError("웹소켓 연결이 끊어졌고 다시 연결하지 않습니다.")
+            if time.perf_counter() > deadline: raise ResumeError(f"{RESUME_TIMEOUT:.0f}초 안에 다시 연결해 전송을 이어가지 못했습니다.")
+            queue = send_queue
+            if queue is None or queue is lost_queue or queue.closed:
+                yield _FETCH_WAIT
+                continue
+            try:
+                self.send_queue, self.resume_reply = queue, None
+                request = {"type": "fetch_resume_request", "payload": {"project_id": self.project_id, "session_id": self.session_id, "next_seq": self.next_seq}}
+                while not queue.try_put(protocol.encode_message(request, self.wire_format)): yield _FETCH_WAIT
+                while self.resume_reply is None:
+                    if queue.closed: raise SendQueueClosed()
+                    if time.perf_counter() > deadline: raise ResumeError(f"서버가 {RESUME_TIMEOUT:.0f}초 동안 재개 요청에 응답하지 않았습니다.")
+                    yield _FETCH_WAIT
+                frames = self._frames_to_resend(self.resume_reply)
+                for _, frame in frames:
+                    while not queue.try_put(frame): yield _FETCH_WAIT
+            except SendQueueClosed:
+                lost_queue = queue # 재개하는 도중에 또 끊어졌습니다.
+                continue
+            self.phase = phase
+            status_message = f"다시 연결되어 메시지 {len(frames)}개를 다시 보내고 전송을 이어갑니다."
+            print(f"🔄 [Blender] {status_message} (세션 {self.session_id[:8]})")
+            return
+
+    def _frames_to_resend(self, reply):
+        """서버의 resume_fetch 응답으로 다시 보낼 [(seq, 프레임), ...] 을 정합니다. 이어갈 수 없으면 서버에 알리고 ResumeError."""
+        try:
+            if not reply.get("resumable", True): raise ResumeError("서버가 이 전송 세션을 이어갈 수 없다고 응답했습니다.")
+            if wire_format != self.wire_format: raise ResumeError("새 연결의 프레임 형식이 달라 이어서 보낼 수 없습니다.")
+            last_seq = reply.get("last_seq")
+            last_seq = -1 if last_seq is None else int(last_seq)
+            frames = self.resend.frames_after(last_seq)
+        except ResumeError as e:
+            failure = {"type": "fetch_resume_failed", "payload": {"project_id": self.project_id, "session_id": self.session_id, "reason": str(e)}}
+            self.send_queue.try_put(protocol.encode_message(failure, wire_format))
+            raise
+        self.resend.ack(last_seq)
+        self.flow.on_ack(last_seq)
+        self.flow.rearm()
+        return frames
+
+    def _run(self):
+        global status_message
+        command_data = self.command_data
+        project_id = self.project_id
+        # type_table 옵션: 타입 파라미터를 요소마다 반복하지 않고 타입 테이블로 한 번만 전송
+        use_type_table = bool(command_data.get("type_table"))
+        status_message = "IFC 데이터 추출 중..."
+        chunks = yield from self._open_chunks(use_type_table)
+        tracker = DeltaTracker()
+        yield from self._send({"type": "fetch_progress_start", "payload": {"total_elements": self.total_elements, "project_id": project_id, "type_table": use_type_table, "element_format": self.element_format, "parameter_encoding": self.parameter_encoding, "flow_control": "ack" if self.flow.uses_ack else None, "session_id": self.session_id, "request_id": self.request_id}})
+        status_message = f"{self.total_elements}개 객체 전송 중..."
+        self.phase = "추출·전송 중"
+        # 직렬화하면서 목표 바이트 크기만큼 모이면 바로 전송합니다. (전체 직렬화 결과를 메모리에 모으지 않음)
+        pending, pending_bytes = [], 0
+        for item in chunks:
+            if item is None or item is _FETCH_WAIT:
+                yield item
+                continue
+            chunk, new_types, keys, _ = item
+            tracker.add_types(new_types)
+            for element_json, (global_id, type_id) in zip(chunk, keys): tracker.classify(element_json, global_id, type_id)
+            chunk = yield from self._send_tables(chunk, new_types)
+            for element_json in chunk:
+                pending.append(element_json)
+                pending_bytes += len(element_json)
+                if pending_bytes >= self.flow.batch_bytes:
+                    yield from self._send_progress(pending)
+                    pending, pending_bytes = [], 0
+        if pending: yield from self._send_progress(pending)
+        yield from self._send({"type": "fetch_progress_complete", "payload": {"total_sent": self.processed_count}})
+        yield from self._drain()
+        # 서버가 모두 받은 뒤에야 다음 fetch_delta 의 비교 기준으로 삼습니다.
+        sent_fingerprints.set(project_id, {"type_table": use_type_table}, tracker.fingerprints)
+        print(f"✅ [Blender] {self.processed_count}개 객체 전송 완료 ({self.source}, {time.perf_counter() - self.started_at:.2f}초).{self._extractor_stats()} {self.flow.stats()} / {self._queue_stats()}")
+
+    def _send_progress(self, element_jsons):
+        if self.processed_count == 0: print(f"⏱️ [Blender] 첫 청크 준비까지 {time.perf_counter() - self.started_at:.3f}초")
+        self.processed_count += len(element_jsons)
+        yield from self._send_elements("fetch_progress_update", {"project_id": self.project_id, "processed_count": self.processed_count}, element_jsons)
+
+    def _send_elements(self, message_type, payload, element_jsons):
+        """요소 메시지를 보냅니다. ack 모드에서는 송신 창이 빌 때까지 기다립니다."""
+        while True:
+            if self._connection_lost(): yield from self._resume()
+            elif self.flow.can_send(): break
+            else: yield _FETCH_WAIT
+        seq = self._take_seq() if self.session_id else None
+        if seq is not None: payload = dict(payload, seq=seq)
+        frame = protocol.encode_elements_message(message_type, payload, element_jsons, self.element_format, self.wire_format)
+        self.flow.on_send(seq, len(frame))
+        yield from self._send_frame(frame, seq)
+
+    def _drain(self):
+        """보낸 메시지가 모두 전송되고, ack 모드에서는 서버가 모두 확인할 때까지 기다립니다."""
+        self.phase = "전송 마무리 중"
+        while True:
+            if self._connection_lost():
+                yield from self._resume()
+                continue
+            try: idle = self.send_queue.is_idle()
+            except SendQueueClosed: continue
+            if idle:
+                if not self.flow.in_flight: return
+                self.flow.check_timeout()
+            yield _FETCH_WAIT
+
+    def _queue_stats(self):
+        if self.send_queue is None: return ""
+        metrics = self.send_queue.metrics()
+        return f"송신 큐: 최대 {metrics['peak_depth']}개·{metrics['peak_bytes'] // 1024} KB, 가득 참 {metrics['full_count']}회"
+
+    def on_ack(self, command_data):
+        if command_data.get("session_id") not in (None, self.session_id): return # 취소된 이전 작업에 대한 ack
+        seq = int(command_data.get("seq", -1))
+        self.flow.on_ack(seq, command_data.get("window"))
+        self.resend.ack(seq)
+
+    def on_resume(self, command_data):
+        if command_data.get("session_id") == self.session_id: self.resume_reply = command_data
+
+    def _send_tables(self, element_jsons, new_types):
+        """요소보다 먼저 보내야 하는 키 테이블·타입 테이블을 보내고, 보낼 요소 JSON 목록을 반환합니다."""
+        if self.key_encoder:
+            element_jsons = [self.key_encoder.encode_element_json(element_json) for element_json in element_jsons]
+            if new_types: new_types = self.key_encoder.encode_types(new_types)
+            new_keys = self.key_encoder.take_new_keys()
+            if new_keys: yield from self._send({"type": "fetch_key_table", "payload": dict(new_keys, project_id=self.project_id)})
+        if new_types: yield from self._send({"type": "fetch_type_table", "payload": {"project_id": self.project_id, "types": new_types}})
+        return element_jsons
+
+    def _open_chunks(self, use_type_table):
+        """추출 경로(디스크 캐시 / 부분 재추출 / 다중 프로세스 / 단일 추출)를 골라 청크 생성기를 반환합니다. (yield from)
+
+        캐시 키를 구하려고 IFC 파일을 해시하는 동안에는 블록마다 None 을 내보내 틱 예산을 지킵니다.
+        반환하는 생성기는 None·_FETCH_WAIT 또는 (요소 JSON 목록, 새 타입 테이블, (GlobalId, RelatingTypeId) 목록, 원본 지문 목록 또는 None) 을 내보냅니다.
+        """
+        worker_count = int(self.command_data.get("workers") or bpy.context.scene.costestimator_extract_workers)
+        options = {"type_table": use_type_table}
+        cache_path = self._cache_path()
+        cache_key = yield from self._cache_key(cache_path, options)
+        cache_status = extraction_cache.status(cache_key) if cache_key else None
+        self.extractor = None
+        if cache_status and cache_status[1]:
+            # 디스크 캐시가 완전하면 IFC 를 열지 않고 저장된 요소를 그대로 스트리밍합니다.
+            self.total_elements = cache_status[0]
+            self.source = "디스크 캐시"
+            return extraction_cache.iter_chunks(cache_key, FETCH_CHUNK_SIZE)
+        ifc_file, error = get_ifc_file()
+        if error: raise RuntimeError(error)
+        self.total_elements = len(ifc_file.by_type("IfcProduct")) # GlobalId 가 없는 객체는 건너뛰므로 실제 전송 수는 완료 메시지로 알립니다.
+        if cache_status:
+            self.extractor = ElementExtractor(ifc_file, type_table=use_type_table)
+            self.source = "디스크 캐시 + 부분 재추출"
+            return self._store_chunks(self._refill_chunks(self.extractor, cache_key), cache_key, write_through=False)
+        # 파일이 바뀌었으면(저장했거나 Bonsai 에서 편집 중) 같은 경로의 이전 항목에서 바뀌지 않은 요소를 다시 씁니다.
+        previous_key = self._previous_cache_key(cache_path, options, cache_key)
+        if previous_key:
+            self.extractor = ElementExtractor(ifc_file, type_table=use_type_table)
+            self.source = "이전 디스크 캐시 + 바뀐 요소 재추출"
+            chunks = self._refill_chunks(self.extractor, cache_key, previous_key)
+            return self._store_chunks(chunks, cache_key, write_through=False) if cache_key else chunks
+        if worker_count > 1:
+            chunks = self._parallel_chunks(ifc_file, worker_count, use_type_table, source_fingerprints=bool(cache_key))
+            self.source = f"작업자 {worker_count}개"
+        else:
+            self.extractor = ElementExtractor(ifc_file, type_table=use_type_table, source_fingerprints=bool(cache_key))
+            chunks = self._local_chunks(self.extractor, use_type_table)
+            self.source = "추출"
+        return self._store_chunks(chunks, cache_key) if cache_key else chunks
+
+    def _extractor_stats(self):
+        return f" {self.extractor.property_sets.stats} / {self.extractor.type_parameters.stats}" if self.extractor else ""
+
+    def _cache_path(self):
+        """디스크 캐시를 쓸 수 있으면 IFC 파일 경로를, 아니면 None 을 반환합니다."""
+        if not self.command_data.get("use_cache", True) or not bpy.context.scene.costestimator_use_disk_cache: return None
+        ifc_path = bpy.data.scenes["Scene"].BIMProperties.ifc_file
+        return ifc_path if ifc_path and os.path.exists(ifc_path) else None
+
+    def _cache_key(self, cache_path, options):
+        """이번 추출 결과를 저장할 캐시 키. 캐시를 쓸 수 없으면 None. (yield from)"""
+        if cache_path is None: return None
+        try:
+            # 저장되지 않은 편집이 있는 Bonsai 모델은 디스크 파일과 내용이 다를 수 있으므로 이 파일의 키로 저장하지 않습니다.
+            if ifc_model_provider.get_live_file(cache_path) is not None and live_model_has_unsaved_changes(): return None
+            return (yield from extraction_cache.iter_model_key(cache_path, options))
+        except Exception as e:
+            print(f"디스크 캐시를 사용할 수 없습니다: {e}")
+            return None
+
+    def _previous_cache_key(self, cache_path, options, cache_key):
+        """같은 경로·옵션으로 저장된 이전 내용의 캐시 항목. 요소별 원본 지문을 비교해 바뀌지 않은 요소만 다시 씁니다."""
+        if cache_path is None: return None
+        try: return extraction_cache.previous_model_key(cache_path, options, exclude_key=cache_key)
+        except Exception as e:
+            print(f"디스크 캐시를 사용할 수 없습니다: {e}")
+            return None
+
+    def _store_chunks(self, chunks, cache_key, write_through=True):
+        """청크를 그대로 전달하면서 디스크 캐시에 기록합니다. 끝까지 완료되지 않으면 기록을 되돌립니다.
+
+        write_through=False 이면 청크 생성기가 직접 기록하고, 여기서는 항목의 시작·완료만 관리합니다.
+        """
+        extraction_cache.begin(cache_key, bpy.data.scenes["Scene"].BIMProperties.ifc_file)
+        position = 0
+        completed = False
+        try:
+            for item in chunks:
+                if item is not None and item is not _FETCH_WAIT:
+                    chunk, new_types, keys, fingerprints = item
+                    if write_through: extraction_cache.store_chunk(cache_key, position, chunk, keys, new_types, fingerprints)
+                    position += len(chunk)
+                yield item
+            extraction_cache.finish(cache_key, position)
+            completed = True
+        finally:
+            if not completed: extraction_cache.discard()
+
+    def _local_chunks(self, extractor, use_type_table):
+        for chunk in extractor.iter_json_chunks(chunk_size=FETCH_CHUNK_SIZE, cooperative=True):
+            if chunk is None: yield None
+            else: yield chunk, extractor.take_new_types() if use_type_table else None, extractor.chunk_keys, extractor.chunk_fingerprints
+
+    def _refill_chunks(self, extractor, cache_key, previous_key=None):
+        """디스크 캐시에 남은 요소는 다시 쓰고 나머지만 추출합니다.
+
+        previous_key 가 없으면 같은 파일에서 일부 요소만 무효화된 항목(cache_key)의 남은 위치를 읽고, 다시 추출한 요소만 되돌려 기록합니다.
+        previous_key 가 있으면 파일이 바뀐 것이므로, 이전 항목에서 GlobalId 와 원본 지문이 같은 요소만 다시 쓰고
+        cache_key 가 있으면 모든 요소를 새 항목에 기록합니다.
+        """
+        yield from extractor.iter_index_build()
+        products = [element for element in extractor.products() if element.GlobalId]
+        source_key = previous_key or cache_key
+        sent_types = set()
+        reused_count = 0
+        for start in range(0, len(products), FETCH_CHUNK_SIZE):
+            batch = products[start:start + FETCH_CHUNK_SIZE]
+            if previous_key:
+                source_fingerprints = [extractor.source_fingerprint(element) for element in batch]
+                previous = extraction_cache.cached_elements(previous_key, [element.GlobalId for element in batch])
+                cached = {}
+                for offset, (element, fingerprint) in enumerate(zip(batch, source_fingerprints)):
+                    row = previous.get(element.GlobalId)
+                    if row is not None and row[3] == fingerprint: cached[offset] = row
+                yield None
+            else:
+                source_fingerprints = None
+                cached = {position - start: row for position, row in extraction_cache.cached_positions(cache_key, start, start + len(batch)).items()}
+            chunk, keys, fingerprints, fresh = [], [], [], []
+            for offset, element in enumerate(batch):
+                row = cached.get(offset)
+                if row is None:
+                    element_dict = extractor.build_element_dict(element)
+                    fingerprint = source_fingerprints[offset] if source_fingerprints else extractor.source_fingerprint(element)
+                    row = (element_dict["UniqueId"], element_dict.get("RelatingTypeId"), json.dumps(element_dict), fingerprint)
+                    fresh.append(offset)
+                    yield None
+                keys.append(row[:2]); chunk.append(row[2]); fingerprints.append(row[3])
+            reused_count += len(batch) - len(fresh)
+            new_types = None
+            if extractor.type_table:
+                # 새 타입은 처음 참조된 순서로, 다시 추출한 요소의 타입은 추출기에서, 나머지는 캐시에서 가져옵니다.
+                fresh_types = extractor.take_new_types()
+                referenced = list(dict.fromkeys(str(type_id) for _, type_id in keys if type_id is not None and str(type_id) not in sent_types))
+                missing = [int(type_id) for type_id in referenced if type_id not in fresh_types]
+                stored = extraction_cache.types(source_key, missing) if missing else {}
+                new_types = {type_id: fresh_types.get(type_id) or stored[type_id] for type_id in referenced}
+                sent_types.update(new_types)
+            if cache_key:
+                if previous_key: extraction_cache.store_chunk(cache_key, start, chunk, keys, new_types, fingerprints)
+                else:
+                    for offset in fresh: extraction_cache.store_chunk(cache_key, start + offset, [chunk[offset]], [keys[offset]], new_types, [fingerprints[offset]])
+            yield chunk, new_types, keys, fingerprints
+        print(f"♻️ [Blender] 디스크 캐시에서 {reused_count}개 객체를 다시 쓰고 {len(products) - reused_count}개를 추출했습니다.")
+
+    def _parallel_chunks(self, ifc_file, worker_count, use_type_table, source_fingerprints=False):
+        """작업자 프로세스로 추출합니다. 메모리의 모델(Bonsai)에 저장하지 않은 편집이 있으면 그 내용이 반영되도록 임시 사본을 씁니다."""
+        ifc_path = bpy.data.scenes["Scene"].BIMProperties.ifc_file
+        temp_path = None
+        live_dirty = ifc_model_provider.get_live_file(ifc_path) is not None and live_model_has_unsaved_changes()
+        if live_dirty or not os.path.exists(ifc_path):
+            fd, temp_path = tempfile.mkstemp(suffix=".ifc"); os.close(fd)
+            ifc_file.write(temp_path)
+            ifc_path = temp_path
+        extraction = ParallelExtraction(ifc_path, worker_count, FETCH_CHUNK_SIZE, use_type_table, source_fingerprints)
+        try:
+            while True:
+                try: item = extraction.next_chunk(block=False)
+                except StopIteration: return
+                yield _FETCH_WAIT if item is None else (*item, extraction.chunk_keys, extraction.chunk_fingerprints)
+        finally:
+            extraction.close()
+            if temp_path: os.remove(temp_path)
+
+    def tick(self):
+        global status_message
+        self._ticking = True
+        try: dispatch_priority_commands()
+        finally: self._ticking = False
+        if self.cancelled: return None
+        deadline = time.perf_counter() + FETCH_TICK_BUDGET
+        try:
+            while time.perf_counter() < deadline:
+                if next(self._steps) is _FETCH_WAIT:
+                    self._redraw_panel()
+                    return FETCH_WAIT_INTERVAL
+        except StopIteration:
+            status_message = "데이터 전송 완료."
+            self._finish()
+            return None
+        except Exception as e:
+            status_message = f"데이터 전송 실패: {e}"; traceback.print_exc()
+            self._finish()
+            return None
+        self._redraw_panel()
+        return 0.0
+
+    def _finish(self):
+        global active_fetch_job
+        self._end_sequence()
+        if active_fetch_job is self:
+            active_fetch_job = None
+            apply_deferred_cache_invalidations()
+            start_queued_fetch()
+        self._redraw_panel(force=True)
+
+    def _redraw_panel(self, force=False):
+        now = time.perf_counter()
+        if not force and now - self._last_redraw < PANEL_REDRAW_INTERVAL: return
+        self._last_redraw = now
+        tag_panel_redraw()
+
+
+class DeltaFetchJob(FetchJob):
+    """fetch_delta: 마지막으로 보낸 지문과 비교해 추가·수정된 요소와 삭제된 GlobalId 만 보냅니다.
+
+    비교하려면 모든 요소를 추출해야 하지만, 전송·서버 처리량은 변경분 크기로 줄어듭니다.
+    기준 지문이 없으면(첫 동기화, 옵션 변경, 블렌더 재시작) 모든 요소가 추가로 전송됩니다.
+    """
+
+    def _run(self):
+        global status_message
+        command_data = self.command_data
+        project_id = self.project_id
+        use_type_table = bool(command_data.get("type_table"))
+        options = {"type_table": use_type_table}
+        baseline = sent_fingerprints.get(project_id, options)
+        status_message = "변경된 객체를 찾는 중..."
+        chunks = yield from self._open_chunks(use_type_table)
+        tracker = DeltaTracker(baseline)
+        yield from self._send({"type": "fetch_delta_start", "payload": {"total_elements": self.total_elements, "project_id": project_id, "type_table": use_type_table, "element_format": self.element_format, "parameter_encoding": self.parameter_encoding, "flow_control": "ack" if self.flow.uses_ack else None, "baseline": baseline is not None, "session_id": self.session_id, "request_id": self.request_id}})
+        self.phase = "변경분 비교 중"
+        changed, added, modified, changed_type_ids = [], [], [], set()
+        changed_bytes = 0
+        sent_type_ids = set()
+        counts = {DeltaTracker.ADDED: 0, DeltaTracker.MODIFIED: 0}
+        def send_changed():
+            new_types = {type_id: tracker.types[type_id] for type_id in sorted(changed_type_ids - sent_type_ids, key=int)}
+            sent_type_ids.update(new_types)
+            element_jsons = yield from self._send_tables(changed, new_types)
+            yield from self._send_elements("fetch_delta_update", {"project_id": project_id, "processed_count": self.processed_count, "added": added, "modified": modified}, element_jsons)
+
+        # 변경된 요소를 목표 바이트 크기만큼 모아 보내고, 마지막에 남은 것을 모두 보냅니다.
+        for item in chunks:
+            if item is None or item is _FETCH_WAIT:
+                yield item
+                continue
+            chunk, new_types, keys, _ = item
+            tracker.add_types(new_types)
+            for element_json, (global_id, type_id) in zip(chunk, keys):
+                self.processed_count += 1
+                change = tracker.classify(element_json, global_id, type_id)
+                if change is None: continue
+                counts[change] += 1
+                (added if change == DeltaTracker.ADDED else modified).append(global_id)
+                changed.append(element_json)
+                changed_bytes += len(element_json)
+                if type_id is not None: changed_type_ids.add(str(type_id))
+                if changed_bytes >= self.flow.batch_bytes:
+                    yield from send_changed()
+                    changed, added, modified, changed_bytes = [], [], [], 0
+        if changed: yield from send_changed()
+        deleted = tracker.deleted()
+        yield from self._send({"type": "fetch_delta_complete", "payload": {
+            "project_id": project_id, "total_elements": self.processed_count, "deleted": deleted,
+            "added_count": counts[DeltaTracker.ADDED], "modified_count": counts[DeltaTracker.MODIFIED],
+            "deleted_count": len(deleted), "unchanged_count": tracker.unchanged_count,
+        }})
+        yield from self._drain()
+        sent_fingerprints.set(project_id, options, tracker.fingerprints)
+        status_message = f"변경분 동기화: 추가 {counts[DeltaTracker.ADDED]}, 수정 {counts[DeltaTracker.MODIFIED]}, 삭제 {len(deleted)}"
+        print(f"✅ [Blender] {status_message} ({self.source}, {time.perf_counter() - self.started_at:.2f}초).{self._extractor_stats()}")
+
+
+class QuantityFetchJob(FetchJob):
+    """fetch_quantities_columnar: 수량 값만 키별 float64 열 배열로 모아 JSON 헤더 + 원시 바이너리 프레임으로 보냅니다.
+
+    원시 바이너리 프레임에는 seq 를 붙일 수 없으므로 연결이 끊어지면 이어서 보내지 않고 실패합니다.
+    """
+    resumable = False
+
+    def _run(self):
+        global status_message
+        project_id = self.project_id
+        ifc_file, error = get_ifc_file()
+        if error: raise RuntimeError(error)
+        self.extractor = ElementExtractor(ifc_file)
+        self.total_elements = len(ifc_file.by_type("IfcProduct"))
+        self.source = "수량 열 추출"
+        status_message = "수량 데이터 추출 중..."
+        self.phase = "수량 추출 중"
+        columns = QuantityColumns()
+        for row in self.extractor.iter_quantity_rows(cooperative=True):
+            if row is None:
+                yield None
+                continue
+            columns.add(*row)
+            self.processed_count += 1
+        header, frames = encode_quantity_frames(columns)
+        self.phase = "전송 중"
+        # 헤더 뒤의 frame_count 개 바이너리 프레임은 협상된 프레임 형식과 상관없이 항상 원시 배열입니다.
+        # msgpack 으로 보내는 선택 응답 같은 바이너리 우선순위 프레임이 그 사이에 끼어들지 않도록 헤더부터 마지막 배열 프레임까지 묶어 보냅니다.
+        yield from self._send({"type": "fetch_quantities_header", "payload": dict(header, project_id=project_id)}, hold=bool(frames))
+        for i, frame in enumerate(frames): yield from self._send_frame(frame, hold=i < len(frames) - 1)
+        yield from self._send({"type": "fetch_quantities_complete", "payload": {"project_id": project_id, "row_count": header["row_count"]}})
+        yield from self._drain()
+        status_message = f"수량 {len(header['columns'])}개 열 전송 완료."
+        print(f"✅ [Blender] {header['row_count']}개 객체의 수량 {len(header['columns'])}개 열 전송 완료 ({len(frames)}개 프레임, {time.perf_counter() - self.started_at:.2f}초).{self._extractor_stats()}")
+
+
+def tag_panel_redraw():
+    for window in bpy.context.window_manager.windows:
+        for area in window.screen.areas:
+            if area.type == 'VIEW_3D': area.tag_redraw()
+
+
+def handle_fetch_all_elements(command_data, job_class=FetchJob):
+    """전송 작업을 시작합니다. 같은 프로젝트·같은 명령의 작업이 진행 중이면 취소하고 새 요청으로 바꿉니다.
+
+    다른 작업이 진행 중이면 fetch_queued 로 알리고 기다렸다가 그 작업이 끝나면 시작합니다.
+    """
+    global active_fetch_job
     if not websocket_client: return
-    project_id = command_data.get("project_id")
-    status_message = "IFC 데이터 추출 중..."; ifc_file, error = get_ifc_file()
-    if error: status_message = error; return
-    elements_data = serialize_ifc_elements_to_string_list(ifc_file)
-    total_elements = len(elements_data)
-    send_message_to_server({"type": "fetch_progress_start", "payload": {"total_elements": total_elements, "project_id": project_id}})
-    status_message = f"{total_elements}개 객체 전송 중..."
-    chunk_size = 100
-    for i in range(0, total_elements, chunk_size):
-        chunk = elements_data[i:i+chunk_size]
-        processed_count = i + len(chunk)
-        send_message_to_server({"type": "fetch_progress_update", "payload": {"project_id": project_id, "processed_count": processed_count, "elements": chunk}})
-    send_message_to_server({"type": "fetch_progress_complete", "payload": {"total_sent": total_elements}})
-    status_message = "데이터 전송 완료."
+    request_id = command_data.get("request_id")
+    if request_id is not None and request_id in cancelled_request_ids:
+        print(f"⚠️ [Blender] 이미 취소된 요청({request_id})이므로 시작하지 않습니다.")
+        reply_fetch_cancelled(command_data, "취소 요청")
+        return
+    if active_fetch_job:
+        if active_fetch_job.project_id != command_data.get("project_id") or active_fetch_job.command_data.get("command") != command_data.get("command"):
+            queue_fetch(command_data, job_class)
+            return
+        cancel_active_fetch(FETCH_SUPERSEDED)
+    active_fetch_job = job_class(command_data)
+    active_fetch_job.start()
+
+def cancel_active_fetch(reason):
+    """진행 중인 전송 작업을 멈추고, 아직 보내지 않은 요소 메시지를 버린 뒤 서버에 fetch_cancelled 를 보냅니다."""
+    global active_fetch_job, status_message
+    job = active_fetch_job
+    if job is None: return
+    active_fetch_job = None
+    job.cancel() # 기록 중이던 디스크 캐시 항목은 여기서 되돌립니다.
+    apply_deferred_cache_invalidations()
+    queue = send_queue
+    dropped = queue.discard_pending() if queue is not None and queue is job.send_queue else 0
+    # 취소 알림은 일반 통로로 보내 이미 보낸 요소 메시지 뒤에 도착하게 합니다.
+    send_message_to_server({"type": "fetch_cancelled", "payload": {"project_id": job.project_id, "request_id": job.request_id, "session_id": job.session_id, "processed_count": job.processed_count, "reason": reason}})
+    status_message = f"데이터 전송을 취소했습니다: {reason}"
+    print(f"🛑 [Blender] {status_message} ({job.processed_count}/{job.total_elements}, 보내지 않은 메시지 {dropped}개 버림)")
+    tag_panel_redraw()
+
+def queue_fetch(command_data, job_class):
+    """진행 중인 작업이 끝난 뒤 시작할 요청으로 둡니다. 같은 명령·같은 프로젝트의 대기 요청은 새 요청으로 바꿉니다."""
+    request_key = (command_data.get("command"), command_data.get("project_id"))
+    for queued in [entry for entry in queued_fetch_requests if (entry[0].get("command"), entry[0].get("project_id")) == request_key]:
+        queued_fetch_requests.remove(queued)
+        reply_fetch_superseded(queued[0])
+    queued_fetch_requests.append((command_data, job_class))
+    send_message_to_server({"type": "fetch_queued", "payload": {"project_id": command_data.get("project_id"), "request_id": command_data.get("request_id"), "position": len(queued_fetch_requests), "active_request_id": active_fetch_job.request_id}})
+    print(f"⏳ [Blender] 다른 데이터 추출이 진행 중이므로 요청을 대기열에 넣었습니다. ({len(queued_fetch_requests)}번째)")
+
+def start_queued_fetch():
+    """진행 중인 작업이 없으면 대기열의 다음 요청을 시작합니다."""
+    while queued_fetch_requests and active_fetch_job is None:
+        command_data, job_class = queued_fetch_requests.pop(0)
+        handle_fetch_all_elements(command_data, job_class)
+
+def reply_fetch_cancelled(command_data, reason):
+    """시작하지 않은 전송 요청에 fetch_cancelled 로 답합니다."""
+    send_message_to_server({"type": "fetch_cancelled", "payload": {"project_id": command_data.get("project_id"), "request_id": command_data.get("request_id"), "processed_count": 0, "reason": reason}})
+
+def reply_fetch_superseded(command_data):
+    """명령함에서 뒤의 같은 요청에 밀려 시작하지 않은 전송 요청에도 fetch_cancelled 로 답합니다."""
+    reply_fetch_cancelled(command_data, FETCH_SUPERSEDED)
+
+command_inbox.on_superseded = reply_fetch_superseded
+
+def handle_fetch_delta(command_data):
+    handle_fetch_all_elements(command_data, DeltaFetchJob)
+
+def handle_fetch_quantities_columnar(command_data):
+    handle_fetch_all_elements(command_data, QuantityFetchJob)
+
+def handle_invalidate_cache(command_data):
+    """unique_ids 가 있으면 해당 요소만, 없으면 디스크 캐시 전체를 무효화합니다.
+
+    전송 작업이 진행 중이면 그 작업의 캐시 기록(아직 커밋하지 않은 트랜잭션)을 커밋하지 않도록 작업이 끝난 뒤 적용합니다.
+    """
+    global status_message
+    unique_ids = command_data.get("unique_ids") or None
+    if active_fetch_job:
+        deferred_cache_invalidations.append(unique_ids)
+        status_message = "데이터 전송이 끝나면 디스크 캐시를 무효화합니다."
+        return
+    invalidate_extraction_cache(unique_ids)
+
+def apply_deferred_cache_invalidations():
+    while deferred_cache_invalidations: invalidate_extraction_cache(deferred_cache_invalidations.pop(0))
+
+def invalidate_extraction_cache(unique_ids):
+    global status_message
+    if unique_ids:
+        removed = extraction_cache.invalidate_elements(unique_ids)
+        status_message = f"디스크 캐시에서 {removed}개 객체를 무효화했습니다."
+    else:
+        extraction_cache.invalidate_all()
+        status_message = "디스크 캐시를 비웠습니다."
+
+def handle_cancel(command_data):
+    """request_id 가 같은 전송 작업을 취소합니다. request_id 가 없으면 진행 중인 작업만 취소합니다.
+
+    취소할 작업이 없어도 fetch_cancelled(processed_count 0)로 답합니다.
+    """
+    request_id = command_data.get("request_id")
+    matched = False
+    if request_id is not None:
+        cancelled_request_ids.append(request_id)
+        for queued in [entry for entry in queued_fetch_requests if entry[0].get("request_id") == request_id]:
+            queued_fetch_requests.remove(queued)
+            reply_fetch_cancelled(queued[0], "취소 요청")
+            matched = True
+    job = active_fetch_job
+    if job and (request_id is None or job.request_id == request_id):
+        cancel_active_fetch("취소 요청")
+        start_queued_fetch()
+        matched = True
+    if not matched: reply_fetch_cancelled(command_data, "취소할 작업 없음")
+
+def handle_subscribe_selection(command_data):
+    """enabled 이면 현재 선택 전체를 reset 으로 보내고, 이후에는 바뀐 부분만 selection_changed 로 보냅니다."""
+    global status_message
+    if not command_data.get("enabled", True):
+        selection_tracker.unsubscribe()
+        status_message = "선택 변경 알림을 껐습니다."
+        return
+    selected_guids = get_selected_element_guids()
+    selection_tracker.subscribe(selected_guids)
+    send_message_to_server({"type": "selection_changed", "payload": {"added": selected_guids, "removed": [], "reset": True}}, priority=True)
+    status_message = "선택 변경 알림을 켰습니다."
+
+def push_selection_changes():
+    """선택 변경이 멈추면(또는 최대 대기 시간마다) 마지막으로 알린 선택과 비교해 바뀐 GlobalId 만 보냅니다."""
+    if not selection_tracker.subscribed: return None
+    wait = selection_tracker.due_in(time.perf_counter())
+    if wait is None: return None
+    if wait > 0: return wait
+    added, removed = selection_tracker.diff(get_selected_element_guids())
+    if added or removed: send_message_to_server({"type": "selection_changed", "payload": {"added": added, "removed": removed, "reset": False}}, priority=True)
+    return None
+
+def restore_backup_colors(index, colors):
+    """colors(장면 객체 색 배열) 에 색칠하기 전 색을 되돌려 씁니다."""
+    guids = list(color_backup)
+    rows, positions = index.positions_for_guids(guids)
+    if positions: colors[positions] = np.array(list(color_backup.values()), dtype=np.float32)[rows]
+
+def show_object_colors(enabled):
+    """3D 뷰 솔리드 셰이딩이 객체 색을 쓰게 하거나, 원래 color_type 으로 되돌립니다."""
+    global shading_color_type_backup
+    for area in bpy.context.screen.areas:
+        if area.type != 'VIEW_3D': continue
+        shading = area.spaces.active.shading
+        if enabled:
+            if shading_color_type_backup is None: shading_color_type_backup = shading.color_type
+            shading.color_type = 'OBJECT'
+        elif shading_color_type_backup is not None: shading.color_type = shading_color_type_backup
+        area.tag_redraw()
+    if not enabled: shading_color_type_backup = None
+
+def handle_colorize_elements(command_data):
+    """GlobalId -> 값(values) 또는 GlobalId -> 분류(categories) 로 객체 색을 한 번에 칠합니다.
+
+    palette: 값이면 낮은 값부터 높은 값까지의 색 목록, 분류면 색 목록 또는 {분류: 색}. range: [최소, 최대] (값일 때, 선택)
+    장면 전체의 Object.color 를 foreach_get 으로 읽어 NumPy 로 고친 뒤 foreach_set 한 번으로 씁니다.
+    이전 색칠은 지우고 새로 칠하며, 원래 색은 reset_colors 로 되돌립니다.
+    """
+    global status_message
+    values = command_data.get("values")
+    mapping = values if values is not None else command_data.get("categories") or {}
+    index = get_element_index()
+    if index is None: return
+    started = time.perf_counter()
+    guids = list(mapping)
+    if values is not None: new_colors, valid = value_colors(list(mapping.values()), command_data.get("palette"), command_data.get("range"))
+    else:
+        new_colors = category_colors(list(mapping.values()), command_data.get("palette"))
+        valid = np.ones(len(guids), dtype=bool)
+
+    objects = bpy.context.scene.objects
+    colors = np.empty(len(objects) * 4, dtype=np.float32)
+    objects.foreach_get("color", colors)
+    colors = colors.reshape(-1, 4)
+    restore_backup_colors(index, colors)
+    rows, positions = index.positions_for_guids(guids)
+    rows = np.asarray(rows, dtype=np.intp)
+    positions = np.asarray(positions, dtype=np.intp)
+    painted = valid[rows]
+    rows, positions = rows[painted], positions[painted]
+    for row, color in zip(rows.tolist(), colors[positions].tolist()): color_backup.setdefault(guids[row], color)
+    colors[positions] = new_colors[rows]
+    objects.foreach_set("color", colors.reshape(-1))
+    show_object_colors(True)
+    status_message = f"{len(positions)}개 객체에 색을 칠했습니다."
+    if len(positions) < len(guids): status_message += f" ({len(guids) - len(positions)}개는 값이 없거나 장면에 없음)"
+    print(f"🎨 [Blender] {status_message} {(time.perf_counter() - started) * 1000:.0f} ms")
+
+def handle_reset_colors():
+    """colorize_elements 로 칠한 객체를 원래 색으로 되돌리고 3D 뷰 셰이딩을 원래대로 돌립니다."""
+    global status_message
+    if color_backup:
+        index = get_element_index()
+        if index is None: return
+        objects = bpy.context.scene.objects
+        colors = np.empty(len(objects) * 4, dtype=np.float32)
+        objects.foreach_get("color", colors)
+        colors = colors.reshape(-1, 4)
+        restore_backup_colors(index, colors)
+        objects.foreach_set("color", colors.reshape(-1))
+        color_backup.clear()
+    show_object_colors(False)
+    status_message = "객체 색을 원래대로 되돌렸습니다."
+
+def handle_isolate_elements(command_data):
+    """unique_ids 의 객체만 보이게 합니다. unique_ids 가 비어 있으면 unhide_all 과 같습니다.
+
+    대상 객체를 임시 컬렉션에 링크하고 나머지 최상위 컬렉션은 뷰 레이어에서 숨깁니다(LayerCollection.hide_viewport).
+    객체는 보이는 컬렉션에 하나라도 있으면 보이므로, 객체마다 숨기지 않고 이전 대상과 달라진 객체만 링크/언링크합니다.
+    숨긴 객체도 depsgraph 에 남아 있어 다시 보일 때 재계산하지 않습니다.
+    """
+    global status_message
+    guids = command_data.get("unique_ids") or []
+    if not guids: return handle_unhide_all()
+    index = get_element_index()
+    if index is None: return
+    target_objects = index.objects_for_guids(guids)
+    if not target_objects:
+        status_message = "격리할 객체를 장면에서 찾지 못했습니다."
+        return
+    scene = bpy.context.scene
+    view_layer = bpy.context.view_layer
+    collection = bpy.data.collections.get(ISOLATE_COLLECTION_NAME)
+    if collection is None: collection = bpy.data.collections.new(ISOLATE_COLLECTION_NAME)
+    if collection.name not in scene.collection.children: scene.collection.children.link(collection)
+    state = json.loads(collection.get(ISOLATE_STATE_KEY, "{}"))
+    hidden_collections = set(state.get("hidden_collections", ()))
+    hidden_objects = set(state.get("hidden_objects", ()))
+
+    targets = set(target_objects)
+    linked = collection.objects
+    for obj in list(linked):
+        if obj not in targets: linked.unlink(obj)
+    already_linked = set(linked)
+    for obj in target_objects:
+        if obj not in already_linked: linked.link(obj)
+
+    for layer_collection in view_layer.layer_collection.children:
+        if layer_collection.collection == collection:
+            layer_collection.exclude = False
+            layer_collection.hide_viewport = False
+        elif not layer_collection.hide_viewport:
+            layer_collection.hide_viewport = True
+            hidden_collections.add(layer_collection.name)
+    # 장면 컬렉션에 바로 들어 있는 객체는 컬렉션으로 숨길 수 없어 객체마다 숨깁니다. (보통 없거나 몇 개)
+    for obj in scene.collection.objects:
+        if obj in targets:
+            if obj.name in hidden_objects:
+                obj.hide_set(False)
+                hidden_objects.discard(obj.name)
+        elif not obj.hide_get():
+            obj.hide_set(True)
+            hidden_objects.add(obj.name)
+    collection[ISOLATE_STATE_KEY] = json.dumps({"view_layer": view_layer.name, "hidden_collections": sorted(hidden_collections), "hidden_objects": sorted(hidden_objects)})
+    if command_data.get("frame", True): frame_objects_in_view(target_objects)
+    status_message = f"{len(target_objects)}개 객체만 표시합니다."
+
+def handle_unhide_all():
+    """isolate_elements 로 숨긴 컬렉션과 객체를 다시 보이게 하고 임시 컬렉션을 지웁니다."""
+    global status_message
+    collection = bpy.data.collections.get(ISOLATE_COLLECTION_NAME)
+    if collection is None: return
+    state = json.loads(collection.get(ISOLATE_STATE_KEY, "{}"))
+    view_layer = bpy.context.scene.view_layers.get(state.get("view_layer", "")) or bpy.context.view_layer
+    hidden_collections = set(state.get("hidden_collections", ()))
+    for layer_collection in view_layer.layer_collection.children:
+        if layer_collection.name in hidden_collections: layer_collection.hide_viewport = False
+    for name in state.get("hidden_objects", ()):
+        obj = bpy.data.objects.get(name)
+        if obj is not None: obj.hide_set(False, view_layer=view_layer)
+    bpy.data.collections.remove(collection)
+    status_message = "숨긴 객체를 모두 다시 표시합니다."
 
 def handle_get_selection():
     selected_guids = get_selected_element_guids()
-    send_message_to_server({"type": "revit_selection_response", "payload": selected_guids})
+    send_message_to_server({"type": "revit_selection_response", "payload": selected_guids}, priority=True)
     global status_message; status_message = f"{len(selected_guids)}개 객체 선택 정보 전송."
 
 
@@ -347,7 +1324,7 @@ class COSTESTIMATOR_OT_Connect(bpy.types.Operator):
     
     def execute(self, context):
         global status_message
-        if websocket_client:
+        if is_connection_alive():
             self.report({'WARNING'}, "이미 연결되어 있습니다.")
             return {'CANCELLED'}
         
@@ -368,13 +1345,10 @@ class COSTESTIMATOR_OT_Disconnect(bpy.types.Operator):
     bl_description = "웹소켓 연결을 끊고, 실행 중인 로컬 서버도 함께 종료합니다."
 
     def execute(self, context):
-        global websocket_client, status_message, websocket_thread_loop
+        global status_message
         
-        if websocket_client:
-            if websocket_thread_loop:
-                asyncio.run_coroutine_threadsafe(websocket_client.close(), websocket_thread_loop)
-            websocket_client = None
-            websocket_thread_loop = None
+        if is_connection_alive():
+            stop_websocket() # 다시 연결을 기다리는 중이어도 멈춥니다.
             status_message = "연결이 끊어졌습니다."
         else:
             self.report({'INFO'}, "웹소켓이 연결되어 있지 않습니다.")
@@ -412,13 +1386,23 @@ class COSTESTIMATOR_PT_Panel(bpy.types.Panel):
         split = box.split(factor=0.5, align=True)
         
         col1 = split.column()
-        col1.active = server_status == "실행 중" and websocket_client is None
+        col1.active = server_status == "실행 중" and not is_connection_alive()
         col1.operator("costestimator.connect", text="연결 및 브라우저 열기", icon='LINKED')
         
         col2 = split.column()
         col2.operator("costestimator.disconnect", text="연결 끊기 & 서버 종료", icon='UNLINKED')
         
         box.label(text=f"웹소켓 상태: {status_message}")
+        box.prop(scene, "costestimator_extract_workers")
+        box.prop(scene, "costestimator_use_disk_cache")
+
+        queue = send_queue
+        if queue:
+            metrics = queue.metrics()
+            box.label(text=f"송신 큐: {metrics['depth']}개 / {metrics['bytes_pending'] // 1024} KB (보냄 {metrics['sent_frames']}개)")
+        job = active_fetch_job
+        if job:
+            box.progress(factor=job.progress, type='BAR', text=f"{job.phase} {job.processed_count}/{job.total_elements}")
 
 
 classes = (
@@ -435,21 +1419,43 @@ def register():
     bpy.types.Scene.costestimator_server_url = bpy.props.StringProperty(
         name="서버 주소", default="ws://127.0.0.1:8000/ws/blender-connector/"
     )
-    bpy.app.timers.register(process_event_queue_timer)
+    bpy.types.Scene.costestimator_use_disk_cache = bpy.props.BoolProperty(
+        name="디스크 캐시 사용", default=True,
+        description="IFC 파일이 바뀌지 않았으면 이전에 추출한 데이터를 디스크에서 바로 전송합니다."
+    )
+    bpy.types.Scene.costestimator_extract_workers = bpy.props.IntProperty(
+        name="추출 프로세스 수", default=1, min=1, max=16,
+        description="2 이상이면 여러 프로세스로 IFC 데이터를 나눠 추출합니다. (대용량 모델용)"
+    )
+    for handler_name, handler in INDEX_HANDLERS:
+        getattr(bpy.app.handlers, handler_name).append(handler)
 
 def unregister():
     stop_server_process()
+    global active_fetch_job
+    queued_fetch_requests.clear()
+    if active_fetch_job:
+        active_fetch_job.cancel()
+        active_fetch_job = None
+    for handler_name, handler in INDEX_HANDLERS:
+        handlers = getattr(bpy.app.handlers, handler_name)
+        if handler in handlers: handlers.remove(handler)
+    ifc_model_provider.invalidate()
+    element_index.invalidate()
+    extraction_cache.close()
 
-    if bpy.app.timers.is_registered(process_event_queue_timer):
-        bpy.app.timers.unregister(process_event_queue_timer)
+    for timer in (process_command_inbox_timer, push_selection_changes):
+        if bpy.app.timers.is_registered(timer): bpy.app.timers.unregister(timer)
+    selection_tracker.unsubscribe()
+    command_inbox.clear()
     
-    global websocket_client, websocket_thread_loop
-    if websocket_client and websocket_thread_loop:
-        asyncio.run_coroutine_threadsafe(websocket_client.close(), websocket_thread_loop)
+    stop_websocket()
 
     for cls in reversed(classes):
         bpy.utils.unregister_class(cls)
     del bpy.types.Scene.costestimator_server_url
+    del bpy.types.Scene.costestimator_extract_workers
+    del bpy.types.Scene.costestimator_use_disk_cache
 
 if __name__ == "__main__":
     register()
\ No newline at end of file
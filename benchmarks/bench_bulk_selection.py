@@ -0,0 +1,117 @@
+#
+# 대량 선택 적용 벤치마크: select_elements 로 1천/1만/5만 개의 GlobalId 를 받았을 때
+#
+# 블렌더 없이 측정할 수 있는 부분을 잽니다. 장면 객체는 BIMObjectProperties 와 select_set 만 흉내 낸 가짜 객체이고,
+# matrix_world/bound_box 는 foreach_get 으로 읽은 것과 같은 모양의 float32 배열입니다.
+#   - 선택 변경: 직전 선택(다른 요소 묶음)에서 새 선택으로 바꿀 때의 select_set 호출 수와 시간
+#     (기존: select_all 연산자로 장면 전체 해제 후 대상마다 select_set)
+#   - 경계 상자: 대상의 월드 공간 합집합 경계 상자를 객체별 파이썬 반복으로 구할 때와 NumPy 로 구할 때
+# 실제 블렌더의 select_set 은 가짜 객체보다 느리므로 호출 수를 함께 표시합니다.
+#
+# 사용법: python benchmarks/bench_bulk_selection.py [장면 요소 수]
+#
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+import synthetic_model
+
+from element_index import ElementIndex
+from viewport_batch import union_bounds
+
+SIZES = (1000, 10000, 50000)
+UNIT_BOX = [(x, y, z) for x in (0.0, 1.0) for y in (0.0, 1.0) for z in (0.0, 1.0)]
+
+
+class FakeObject:
+    def __init__(self, step_id):
+        self.BIMObjectProperties = SimpleNamespace(ifc_definition_id=step_id)
+        self.selected = False
+
+    def select_set(self, state):
+        self.selected = state
+
+
+def python_union_bounds(matrices, corners, positions):
+    """객체마다 matrix_world @ 꼭짓점을 계산하는 파이썬 반복 (mathutils 없이 같은 연산)."""
+    minimum = [float("inf")] * 3
+    maximum = [float("-inf")] * 3
+    for position in positions:
+        m = matrices[position * 16:position * 16 + 16]
+        for corner in range(8):
+            x, y, z = corners[position * 24 + corner * 3:position * 24 + corner * 3 + 3]
+            world = (m[0] * x + m[4] * y + m[8] * z + m[12], m[1] * x + m[5] * y + m[9] * z + m[13], m[2] * x + m[6] * y + m[10] * z + m[14])
+            for axis in range(3):
+                if world[axis] < minimum[axis]: minimum[axis] = world[axis]
+                if world[axis] > maximum[axis]: maximum[axis] = world[axis]
+    return minimum, maximum
+
+
+def measure(function, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000, result
+
+
+def main():
+    element_count = int(sys.argv[1]) if len(sys.argv) > 1 else max(SIZES)
+    print(f"[합성 모델 {element_count}개 요소 생성 중...]")
+    ifc_file = synthetic_model.build_synthetic_model(element_count)
+    products = ifc_file.by_type("IfcProduct")
+    objects = [FakeObject(element.id()) for element in products]
+    index = ElementIndex()
+    index.ensure(ifc_file, objects)
+    guids = [element.GlobalId for element in products]
+
+    rng = np.random.default_rng(0)
+    count = len(objects)
+    matrices = np.zeros((count, 4, 4), dtype=np.float32)
+    matrices[:, [0, 1, 2, 3], [0, 1, 2, 3]] = 1.0
+    matrices[:, 3, :3] = rng.uniform(-500, 500, (count, 3)) # 열 우선 저장: 이동량은 마지막 네 값 중 앞 세 개
+    matrices = matrices.reshape(-1)
+    corners = (np.array(UNIT_BOX, dtype=np.float32)[None] * rng.uniform(0.2, 10, (count, 1, 3)).astype(np.float32)).reshape(-1)
+    matrix_list = matrices.tolist()
+    corner_list = corners.tolist()
+
+    print(f"[장면 객체 {count}개, 시간은 3회 중 최솟값]")
+    print(f"  {'대상':>6}  {'색인 조회':>9}  {'선택 변경':>9}  {'select_set 호출(기존 → 변경)':>24}  {'경계 상자 파이썬':>14}  {'NumPy':>8}")
+    for size in SIZES:
+        if size > count: break
+        picked = random.Random(size).sample(range(count), size)
+        previous = [objects[i] for i in random.Random(size + 1).sample(range(count), size)]
+        target_guids = [guids[i] for i in picked]
+
+        lookup_ms, target_objects = measure(lambda: index.objects_for_guids(target_guids))
+
+        calls = {"count": 0}
+        def apply():
+            calls["count"] = 0
+            targets = set(target_objects)
+            for obj in previous:
+                if obj not in targets:
+                    obj.select_set(False)
+                    calls["count"] += 1
+            already_selected = set(previous)
+            for obj in target_objects:
+                if obj in already_selected: continue
+                obj.select_set(True)
+                calls["count"] += 1
+        select_ms, _ = measure(apply)
+        legacy_calls = len(target_objects)
+
+        positions = index.positions_for_objects(target_objects)
+        python_ms, expected = measure(lambda: python_union_bounds(matrix_list, corner_list, positions), repeat=1)
+        numpy_ms, (minimum, maximum) = measure(lambda: union_bounds(matrices, corners, positions))
+        assert np.allclose(minimum, expected[0], atol=1e-3) and np.allclose(maximum, expected[1], atol=1e-3)
+        call_counts = f"전체 해제 + {legacy_calls} → {calls['count']}"
+        print(f"  {size:>6}  {lookup_ms:7.1f} ms  {select_ms:7.1f} ms  {call_counts:>24}  {python_ms:11.1f} ms  {numpy_ms:5.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#
+# 프레임 코덱 마이크로벤치마크: json vs msgpack_lite (순수 파이썬 MessagePack)
+#
+# 일반적인 100개 요소 청크(fetch_progress_update), 선택 응답(revit_selection_response),
+# 수신 명령(select_elements)의 인코딩/디코딩 시간과 크기를 비교합니다.
+# 서버 쪽에 C 확장 msgpack 패키지가 설치되어 있으면 참고용으로 함께 측정합니다.
+#
+# 사용법: python benchmarks/bench_codec.py [반복 횟수]
+#
+import json
+import sys
+import timeit
+
+from synthetic_model import build_synthetic_model
+
+import ifc_extractor
+import msgpack_lite
+import protocol
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+CHUNK_SIZE = 100
+
+
+def sample_messages():
+    model = build_synthetic_model(element_count=CHUNK_SIZE)
+    element_jsons = ifc_extractor.serialize_ifc_elements_to_string_list(model)[:CHUNK_SIZE]
+    guids = [json.loads(element_json)["UniqueId"] for element_json in element_jsons]
+    return {
+        "fetch_progress_update": {"type": "fetch_progress_update", "payload": {"project_id": 1, "processed_count": CHUNK_SIZE, "elements": [json.loads(e) for e in element_jsons]}},
+        "revit_selection_response": {"type": "revit_selection_response", "payload": guids},
+        "select_elements (수신)": {"command": "select_elements", "unique_ids": guids},
+    }
+
+
+def codecs():
+    yield "json", json.dumps, json.loads
+    yield "msgpack_lite", msgpack_lite.packb, msgpack_lite.unpackb
+    if msgpack: yield "msgpack (C, 참고)", msgpack.packb, msgpack.unpackb
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    for name, message in sample_messages().items():
+        print(f"\n[{name}]")
+        for codec_name, encode, decode in codecs():
+            frame = encode(message)
+            assert decode(frame) == message, f"{codec_name} 왕복 결과가 다릅니다."
+            encode_time = min(timeit.repeat(lambda: encode(message), number=repeat, repeat=3)) / repeat
+            decode_time = min(timeit.repeat(lambda: decode(frame), number=repeat, repeat=3)) / repeat
+            size = len(frame.encode("utf-8")) if isinstance(frame, str) else len(frame)
+            print(f"  {codec_name:<18} {size / 1024:8.1f} KB   인코딩 {encode_time * 1e6:9.1f} µs   디코딩 {decode_time * 1e6:9.1f} µs")
+    # 실제 전송 경로: 이미 직렬화된 요소 JSON 에서 프레임을 만드는 비용
+    element_jsons = [json.dumps(element) for element in sample_messages()["fetch_progress_update"]["payload"]["elements"]]
+    print("\n[encode_elements_message, object 형식]")
+    for wire_format in protocol.SUPPORTED_WIRE_FORMATS:
+        build = lambda: protocol.encode_elements_message("fetch_progress_update", {"project_id": 1, "processed_count": CHUNK_SIZE}, element_jsons, protocol.ELEMENT_FORMAT_OBJECT, wire_format)
+        elapsed = min(timeit.repeat(build, number=repeat, repeat=3)) / repeat
+        print(f"  {wire_format:<18} {len(build() if wire_format == protocol.WIRE_FORMAT_MSGPACK else build().encode('utf-8')) / 1024:8.1f} KB   인코딩 {elapsed * 1e6:9.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#
+# 색칠(colorize_elements) 벤치마크: 10만 개 요소에 값/분류 색을 칠할 때
+#
+# 블렌더 없이 측정할 수 있는 부분을 잽니다. 장면 객체는 BIMObjectProperties 만 흉내 낸 가짜 객체이고,
+# Object.color 는 foreach_get 으로 읽은 것과 같은 (객체 수 * 4) float32 배열입니다.
+#   - GlobalId -> 배열 행 번호 (색인)
+#   - 값/분류 -> 색 (NumPy)
+#   - 배열 갱신 (원래 색 되돌리기 + 새 색 쓰기)
+# 실제 블렌더에서는 여기에 foreach_get/foreach_set 두 번(C 반복)이 더해집니다.
+#
+# 사용법: python benchmarks/bench_colorize.py [요소 수]
+#
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+import synthetic_model
+
+from element_index import ElementIndex
+from viewport_batch import category_colors, value_colors
+
+
+class FakeObject:
+    def __init__(self, step_id):
+        self.BIMObjectProperties = SimpleNamespace(ifc_definition_id=step_id)
+
+
+def main():
+    element_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    print(f"[합성 모델 {element_count}개 요소 생성 중...]")
+    ifc_file = synthetic_model.build_synthetic_model(element_count)
+    products = ifc_file.by_type("IfcProduct")
+    objects = [FakeObject(element.id()) for element in products]
+    index = ElementIndex()
+    index.ensure(ifc_file, objects)
+    rng = random.Random(0)
+    values = {element.GlobalId: rng.uniform(0, 1e6) for element in products}
+    categories = {element.GlobalId: f"공종 {rng.randrange(40)}" for element in products}
+    backup = {}
+
+    print(f"[장면 객체 {len(objects)}개, 색칠 대상 {len(values)}개]")
+    for label, mapping in (("값(values)", values), ("분류(categories)", categories)):
+        colors = np.full((len(objects), 4), 0.8, dtype=np.float32)
+        started = time.perf_counter()
+        guids = list(mapping)
+        rows, positions = index.positions_for_guids(guids)
+        located = time.perf_counter()
+        if mapping is values: new_colors, valid = value_colors(list(mapping.values()))
+        else:
+            new_colors = category_colors(list(mapping.values()))
+            valid = np.ones(len(guids), dtype=bool)
+        mapped = time.perf_counter()
+        backup_rows, backup_positions = index.positions_for_guids(list(backup))
+        if backup_positions: colors[backup_positions] = np.array(list(backup.values()), dtype=np.float32)[backup_rows]
+        rows = np.asarray(rows, dtype=np.intp)
+        positions = np.asarray(positions, dtype=np.intp)
+        painted = valid[rows]
+        rows, positions = rows[painted], positions[painted]
+        for row, color in zip(rows.tolist(), colors[positions].tolist()): backup.setdefault(guids[row], color)
+        colors[positions] = new_colors[rows]
+        finished = time.perf_counter()
+        print(f"  {label:<16} 행 번호 {(located - started) * 1000:6.1f} ms  색 계산 {(mapped - located) * 1000:6.1f} ms  배열 갱신 {(finished - mapped) * 1000:6.1f} ms  합계 {(finished - started) * 1000:6.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#
+# 명령 지연 벤치마크: 서버가 명령을 보낸 시각 -> 블렌더 메인 스레드에서 처리한 시각
+#
+# 로컬 스텁 서버가 불규칙한 간격으로 명령을 보내고, 웹소켓 스레드가 받아 명령함에 넣으면
+# 메인 스레드의 타이머 루프(블렌더 타이머를 흉내냄)가 꺼내 처리합니다.
+#   1) 기존: wait_for(recv, 1.0) 폴링 + 0.1초 고정 타이머
+#   2) wait_for(recv, 1.0) 폴링 + 적응형 명령함 타이머
+#   3) 현재: async for 수신 + 적응형 명령함 타이머
+#
+# 사용법: python benchmarks/bench_command_latency.py [명령 수]
+#
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+
+ADDON_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (ADDON_DIR, os.path.join(ADDON_DIR, "lib")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+import websockets
+
+import protocol
+from command_inbox import INBOX_FIRST_IDLE_INTERVAL, INBOX_IDLE_INTERVAL, CommandInbox
+
+BLENDER_TICK = 0.001 # 간격 0 인 타이머도 블렌더 이벤트 루프 한 바퀴는 기다린다고 봅니다.
+
+
+async def legacy_receive(inbox, websocket):
+    while True:
+        try:
+            frame = await asyncio.wait_for(websocket.recv(), timeout=1.0)
+            inbox.put(protocol.decode_message(frame))
+        except asyncio.TimeoutError: continue
+        except websockets.exceptions.ConnectionClosed: break
+
+
+async def event_receive(inbox, websocket):
+    try: await inbox.receive(websocket, protocol.decode_message)
+    except websockets.exceptions.ConnectionClosed: pass
+
+
+def run_case(label, receive, adaptive, command_count):
+    inbox = CommandInbox()
+    ready = threading.Event()
+    port = {}
+
+    async def stub_server(websocket):
+        rng = random.Random(0)
+        for index in range(command_count):
+            await asyncio.sleep(rng.uniform(0.002, 0.05))
+            await websocket.send(json.dumps({"command": "get_selection", "index": index, "sent_at": time.perf_counter()}))
+        await websocket.close()
+
+    def websocket_thread():
+        async def main():
+            async with websockets.serve(stub_server, "127.0.0.1", 0) as server:
+                port["value"] = server.sockets[0].getsockname()[1]
+                ready.set()
+                async with websockets.connect(f"ws://127.0.0.1:{port['value']}") as websocket:
+                    await receive(inbox, websocket)
+        asyncio.run(main())
+
+    thread = threading.Thread(target=websocket_thread, daemon=True)
+    thread.start()
+    ready.wait()
+    latencies = []
+    interval = INBOX_FIRST_IDLE_INTERVAL
+    while len(latencies) < command_count:
+        time.sleep(max(interval, BLENDER_TICK))
+        commands = inbox.drain()
+        now = time.perf_counter()
+        latencies.extend(now - command_data["sent_at"] for command_data in commands)
+        interval = inbox.next_interval(bool(commands)) if adaptive else INBOX_IDLE_INTERVAL
+    thread.join()
+    latencies = sorted(latency * 1000 for latency in latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"  {label:<40} 평균 {statistics.mean(latencies):6.1f} ms  중앙값 {statistics.median(latencies):6.1f} ms  p95 {p95:6.1f} ms  최대 {latencies[-1]:6.1f} ms")
+
+
+def main():
+    command_count = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    print(f"[명령 {command_count}개, 간격 2~50 ms]")
+    run_case("기존: wait_for 폴링 + 0.1초 타이머", legacy_receive, False, command_count)
+    run_case("wait_for 폴링 + 적응형 명령함", legacy_receive, True, command_count)
+    run_case("async for 수신 + 적응형 명령함", event_receive, True, command_count)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#
+# 직렬화 엔진 벤치마크: 기존(요소별 역참조 순회) 방식 vs 관계 인덱스 방식
+#
+# 사용법: python benchmarks/bench_extraction.py [요소 수]
+#
+import json
+import sys
+import time
+import tracemalloc
+
+from synthetic_model import build_synthetic_model
+
+import ifc_extractor
+
+
+def legacy_serialize(ifc_file):
+    """1.2.0 버전의 serialize_ifc_elements_to_string_list (비교 기준)."""
+    elements_data = []
+    for element in ifc_file.by_type("IfcProduct"):
+        if not element.GlobalId: continue
+        element_dict = { "Name": element.Name or "이름 없음", "IfcClass": element.is_a(), "ElementId": element.id(), "UniqueId": element.GlobalId, "Parameters": {}, "TypeParameters": {}, "RelatingType": None, "SpatialContainer": None, "Aggregates": None, "Nests": None, }
+        is_spatial_element = element.is_a("IfcSpatialStructureElement")
+        try:
+            if hasattr(element, 'IsDefinedBy') and element.IsDefinedBy:
+                for definition in element.IsDefinedBy:
+                    if definition.is_a("IfcRelDefinesByProperties"):
+                        prop_set = definition.RelatingPropertyDefinition
+                        if prop_set and prop_set.is_a("IfcPropertySet"):
+                            if hasattr(prop_set, 'HasProperties') and prop_set.HasProperties:
+                                for prop in prop_set.HasProperties:
+                                    if prop.is_a("IfcPropertySingleValue"):
+                                        element_dict["Parameters"][f"{prop_set.Name}__{prop.Name}"] = prop.NominalValue.wrappedValue if prop.NominalValue else None
+            if not is_spatial_element:
+                if hasattr(element, 'IsDefinedBy') and element.IsDefinedBy:
+                    for definition in element.IsDefinedBy:
+                        if definition.is_a("IfcRelDefinesByProperties"):
+                            prop_set = definition.RelatingPropertyDefinition
+                            if prop_set and prop_set.is_a("IfcElementQuantity"):
+                                if hasattr(prop_set, 'Quantities') and prop_set.Quantities:
+                                    for quantity in prop_set.Quantities:
+                                        prop_value = ifc_extractor.get_quantity_value(quantity)
+                                        if prop_value is not None:
+                                            element_dict["Parameters"][f"{prop_set.Name}__{quantity.Name}"] = prop_value
+                if hasattr(element, 'IsTypedBy') and element.IsTypedBy:
+                    type_definition = element.IsTypedBy[0]
+                    if type_definition and type_definition.is_a("IfcRelDefinesByType"):
+                        relating_type = type_definition.RelatingType
+                        if relating_type:
+                            element_dict["RelatingType"] = relating_type.Name
+                            if hasattr(relating_type, 'HasPropertySets') and relating_type.HasPropertySets:
+                                for prop_set in relating_type.HasPropertySets:
+                                    if prop_set and prop_set.is_a("IfcPropertySet"):
+                                        if hasattr(prop_set, 'HasProperties') and prop_set.HasProperties:
+                                            for prop in prop_set.HasProperties:
+                                                if prop.is_a("IfcPropertySingleValue"):
+                                                    element_dict["TypeParameters"][f"{prop_set.Name}__{prop.Name}"] = prop.NominalValue.wrappedValue if prop.NominalValue else None
+                if hasattr(element, 'ContainedInStructure') and element.ContainedInStructure: element_dict["SpatialContainer"] = f"{element.ContainedInStructure[0].RelatingStructure.is_a()}: {element.ContainedInStructure[0].RelatingStructure.Name}"
+            if hasattr(element, 'Decomposes') and element.Decomposes: element_dict["Aggregates"] = f"{element.Decomposes[0].RelatingObject.is_a()}: {element.Decomposes[0].RelatingObject.Name}"
+            if hasattr(element, 'Nests') and element.Nests: element_dict["Nests"] = f"{element.Nests[0].RelatingObject.is_a()}: {element.Nests[0].RelatingObject.Name}"
+        except (AttributeError, IndexError, TypeError): pass
+        elements_data.append(json.dumps(element_dict))
+    return elements_data
+
+
+def timed(label, func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<24} {elapsed:8.3f} s")
+    return result, elapsed
+
+
+def main():
+    element_count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    print(f"합성 모델 생성 중... (요소 {element_count}개)")
+    model = build_synthetic_model(element_count=element_count)
+
+    legacy, legacy_time = timed("legacy", legacy_serialize, model)
+    current, current_time = timed("extractor", ifc_extractor.serialize_ifc_elements_to_string_list, model)
+    assert legacy == current, "직렬화 결과가 기존과 다릅니다."
+    print(f"출력 동일 ({len(current)}개 요소), 속도 향상 x{legacy_time / current_time:.2f}")
+
+    extractor = ifc_extractor.ElementExtractor(model, type_table=True)
+    table_mode, _ = timed("extractor + type table", ifc_extractor.serialize_ifc_elements_to_string_list, model, extractor)
+    types_json = json.dumps(extractor.take_new_types())
+    inline_bytes = sum(len(e) for e in current)
+    table_bytes = sum(len(e) for e in table_mode) + len(types_json)
+    print(f"페이로드: 타입 인라인 {inline_bytes / 1e6:.2f} MB -> 타입 테이블 {table_bytes / 1e6:.2f} MB ({table_bytes / inline_bytes:.1%})")
+
+    measure_streaming(model)
+
+
+def measure_streaming(model):
+    """스트리밍 추출의 첫 청크 시간과, 전체 목록 방식 대비 최대 메모리 사용량을 측정합니다."""
+    reference = ifc_extractor.serialize_ifc_elements_to_string_list(model)
+    extractor = ifc_extractor.ElementExtractor(model)
+    assert [e for chunk in extractor.iter_json_chunks(chunk_size=100) for e in chunk] == reference, "스트리밍 결과가 다릅니다."
+
+    tracemalloc.start()
+    ifc_extractor.serialize_ifc_elements_to_string_list(model)
+    list_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    extractor = ifc_extractor.ElementExtractor(model)
+    first_chunk_time = None
+    for chunk in extractor.iter_json_chunks(extractor.products(), 100):
+        if first_chunk_time is None: first_chunk_time = time.perf_counter() - start
+    stream_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"스트리밍: 첫 청크 {first_chunk_time * 1000:.0f} ms, 최대 메모리 {stream_peak / 1e6:.1f} MB (전체 목록 방식 {list_peak / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#
+# 파라미터 인코딩 벤치마크: 기존 JSON 객체 vs 키 테이블([[키 번호, 값], ...])
+#
+# 전송 바이트, 애드온 인코딩 시간, 서버 파싱(+키 테이블 복원) 시간을 비교합니다.
+#
+# 사용법: python benchmarks/bench_key_table.py [요소 수]
+#
+import json
+import sys
+import time
+
+from synthetic_model import build_synthetic_model
+
+import ifc_extractor
+import protocol
+
+CHUNK_SIZE = 100
+
+
+def encode_chunks(element_jsons, element_format, key_table):
+    encoder = protocol.KeyTableEncoder() if key_table else None
+    messages = []
+    for i in range(0, len(element_jsons), CHUNK_SIZE):
+        chunk = element_jsons[i:i + CHUNK_SIZE]
+        if encoder:
+            chunk = [encoder.encode_element_json(element_json) for element_json in chunk]
+            new_keys = encoder.take_new_keys()
+            if new_keys: messages.append(protocol.encode_message({"type": "fetch_key_table", "payload": dict(new_keys, project_id=1)}))
+        payload = {"project_id": 1, "processed_count": i + len(chunk)}
+        messages.append(protocol.encode_elements_message("fetch_progress_update", payload, chunk, element_format))
+    return messages
+
+
+def decode_chunks(messages, element_format):
+    """서버 측 처리: 메시지 파싱 후 요소를 기존과 같은 딕셔너리 모양으로 복원합니다."""
+    decoder = protocol.KeyTableDecoder()
+    elements = []
+    for message in messages:
+        message = json.loads(message)
+        payload = message["payload"]
+        if message["type"] == "fetch_key_table":
+            decoder.add_keys(payload)
+            continue
+        chunk = payload["elements"]
+        if element_format == protocol.ELEMENT_FORMAT_JSON_STRING: chunk = [json.loads(element) for element in chunk]
+        if decoder.keys: chunk = [decoder.decode_element(element) for element in chunk]
+        elements.extend(chunk)
+    return elements
+
+
+def measure(label, element_jsons, element_format, key_table):
+    start = time.perf_counter()
+    messages = encode_chunks(element_jsons, element_format, key_table)
+    encode_time = time.perf_counter() - start
+    start = time.perf_counter()
+    elements = decode_chunks(messages, element_format)
+    decode_time = time.perf_counter() - start
+    size = sum(len(message.encode("utf-8")) for message in messages)
+    print(f"{label:<24} {size / 1e6:8.2f} MB   인코딩 {encode_time * 1000:8.1f} ms   서버 파싱 {decode_time * 1000:8.1f} ms")
+    return size, elements
+
+
+def main():
+    element_count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    model = build_synthetic_model(element_count=element_count)
+    element_jsons = ifc_extractor.serialize_ifc_elements_to_string_list(model)
+    _, reference = measure("json_string", element_jsons, protocol.ELEMENT_FORMAT_JSON_STRING, False)
+    object_size, object_elements = measure("object", element_jsons, protocol.ELEMENT_FORMAT_OBJECT, False)
+    keyed_size, keyed_elements = measure("object + key_table", element_jsons, protocol.ELEMENT_FORMAT_OBJECT, True)
+    _, keyed_string_elements = measure("json_string + key_table", element_jsons, protocol.ELEMENT_FORMAT_JSON_STRING, True)
+    assert reference == object_elements == keyed_elements == keyed_string_elements, "디코딩 결과가 서로 다릅니다."
+    print(f"key_table 크기: object 대비 {keyed_size / object_size:.1%}")
+
+
+if __name__ == "__main__":
+    main()
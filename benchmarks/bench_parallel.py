@@ -0,0 +1,37 @@
+#
+# 다중 프로세스 추출 확장성 벤치마크 (작업자 1, 2, 4, 8개)
+#
+# 사용법: python benchmarks/bench_parallel.py [요소 수]
+#
+import os
+import sys
+import tempfile
+import time
+
+from synthetic_model import write_synthetic_model
+
+import ifcopenshell
+
+import ifc_extractor
+import parallel_extract
+
+
+def main():
+    element_count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = write_synthetic_model(os.path.join(temp_dir, "model.ifc"), element_count=element_count)
+        start = time.perf_counter()
+        reference = ifc_extractor.serialize_ifc_elements_to_string_list(ifcopenshell.open(path))
+        baseline = time.perf_counter() - start
+        print(f"단일 프로세스 (열기 포함)  {baseline:8.2f} s")
+        for worker_count in (1, 2, 4, 8):
+            start = time.perf_counter()
+            extraction = parallel_extract.ParallelExtraction(path, worker_count)
+            merged = [element for elements, _ in extraction for element in elements]
+            elapsed = time.perf_counter() - start
+            assert merged == reference, f"작업자 {worker_count}개 결과가 단일 프로세스와 다릅니다."
+            print(f"작업자 {worker_count}개               {elapsed:8.2f} s   x{baseline / elapsed:.2f}")
+
+
+if __name__ == "__main__":
+    main()
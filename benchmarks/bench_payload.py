@@ -0,0 +1,60 @@
+#
+# 요소 전송 형식 벤치마크: json_string(이중 인코딩) vs object(단일 인코딩)
+#
+# 사용법: python benchmarks/bench_payload.py [요소 수]
+#
+import json
+import sys
+import time
+
+from synthetic_model import build_synthetic_model
+
+import ifc_extractor
+import protocol
+
+CHUNK_SIZE = 100
+
+
+def encode_chunks(element_jsons, element_format):
+    messages = []
+    for i in range(0, len(element_jsons), CHUNK_SIZE):
+        chunk = element_jsons[i:i + CHUNK_SIZE]
+        payload = {"project_id": 1, "processed_count": i + len(chunk)}
+        messages.append(protocol.encode_elements_message("fetch_progress_update", payload, chunk, element_format))
+    return messages
+
+
+def decode_chunks(messages, element_format):
+    """서버 측 파싱 비용: json_string 형식은 요소마다 한 번 더 json.loads 해야 합니다."""
+    elements = []
+    for message in messages:
+        payload = json.loads(message)["payload"]
+        if element_format == protocol.ELEMENT_FORMAT_OBJECT: elements.extend(payload["elements"])
+        else: elements.extend(json.loads(element) for element in payload["elements"])
+    return elements
+
+
+def measure(element_jsons, element_format):
+    start = time.perf_counter()
+    messages = encode_chunks(element_jsons, element_format)
+    encode_time = time.perf_counter() - start
+    start = time.perf_counter()
+    elements = decode_chunks(messages, element_format)
+    decode_time = time.perf_counter() - start
+    size = sum(len(message.encode("utf-8")) for message in messages)
+    print(f"{element_format:<12} {size / 1e6:8.2f} MB   인코딩 {encode_time * 1000:8.1f} ms   서버 파싱 {decode_time * 1000:8.1f} ms")
+    return size, elements
+
+
+def main():
+    element_count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    model = build_synthetic_model(element_count=element_count)
+    element_jsons = ifc_extractor.serialize_ifc_elements_to_string_list(model)
+    legacy_size, legacy_elements = measure(element_jsons, protocol.ELEMENT_FORMAT_JSON_STRING)
+    object_size, object_elements = measure(element_jsons, protocol.ELEMENT_FORMAT_OBJECT)
+    assert legacy_elements == object_elements, "두 형식의 디코딩 결과가 다릅니다."
+    print(f"object 형식 크기: json_string 대비 {object_size / legacy_size:.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#
+# 수량 전송 벤치마크: 요소별 JSON(fetch_progress_update) vs 열 단위 바이너리(fetch_quantities_columnar)
+#
+# 1) 합성 모델에서 추출 + 인코딩 + 서버 디코딩까지의 수량 값 처리량
+# 2) 수량 값 100만 개의 인코딩/디코딩 처리량 (추출 제외)
+#
+# 사용법: python benchmarks/bench_quantities.py [요소 수]
+#
+import json
+import math
+import sys
+import time
+
+import numpy as np
+
+from synthetic_model import build_synthetic_model
+
+import ifc_extractor
+import protocol
+from quantity_columns import QuantityColumns, decode_quantity_frames, encode_quantity_frames
+
+CHUNK_SIZE = 100
+VALUE_COUNT = 1_000_000
+
+
+def json_path(element_jsons):
+    """기존 경로: 요소 JSON 메시지를 만들고 서버가 파싱해 수량 값만 꺼냅니다."""
+    messages = [protocol.encode_elements_message("fetch_progress_update", {"project_id": 1}, element_jsons[i:i + CHUNK_SIZE], protocol.ELEMENT_FORMAT_OBJECT)
+                for i in range(0, len(element_jsons), CHUNK_SIZE)]
+    size = sum(len(message.encode("utf-8")) for message in messages)
+    values = {}
+    for message in messages:
+        for element in json.loads(message)["payload"]["elements"]:
+            for key, value in element["Parameters"].items():
+                if key.startswith("Qto_"): values.setdefault(key, {})[element["UniqueId"]] = value
+    return size, values
+
+
+def columnar_path(columns):
+    header, frames = encode_quantity_frames(columns)
+    header_text = json.dumps(header)
+    size = len(header_text) + sum(len(frame) for frame in frames)
+    global_ids, arrays = decode_quantity_frames(json.loads(header_text), frames)
+    return size, global_ids, arrays
+
+
+def timed(label, function, *args, value_count):
+    start = time.perf_counter()
+    result = function(*args)
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<28} {elapsed * 1000:9.1f} ms   {value_count / elapsed / 1e6:8.2f} M값/초   {result[0] / 1e6:8.2f} MB")
+    return result
+
+
+def model_benchmark(element_count):
+    model = build_synthetic_model(element_count=element_count)
+    extractor = ifc_extractor.ElementExtractor(model)
+    extractor.index # 인덱스 구축은 두 경로가 같으므로 측정에서 뺍니다.
+    start = time.perf_counter()
+    element_jsons = [json.dumps(element_dict) for element_dict in extractor.iter_element_dicts()]
+    json_extract = time.perf_counter() - start
+    start = time.perf_counter()
+    columns = QuantityColumns()
+    for global_id, quantities in extractor.iter_quantity_rows(): columns.add(global_id, quantities)
+    columnar_extract = time.perf_counter() - start
+    value_count = sum(int(np.count_nonzero(~np.isnan(array))) for array in columns.arrays().values())
+    print(f"[합성 모델] 요소 {len(columns)}개, 수량 값 {value_count}개")
+    print(f"  추출: 요소 JSON {json_extract * 1000:.1f} ms / 수량 행 {columnar_extract * 1000:.1f} ms")
+    _, json_values = timed("JSON 인코딩+서버 파싱", json_path, element_jsons, value_count=value_count)
+    _, global_ids, arrays = timed("열 바이너리 인코딩+디코딩", columnar_path, columns, value_count=value_count)
+    row_of = {global_id: row for row, global_id in enumerate(global_ids)}
+    for key, values in json_values.items():
+        assert all(arrays[key][row_of[global_id]] == value for global_id, value in values.items()), f"{key} 값이 다릅니다."
+    assert sum(len(values) for values in json_values.values()) == value_count
+
+
+def transport_benchmark():
+    """추출 없이 수량 값 100만 개(요소 ~33만 개 x 수량 3개)의 전송 형식만 비교합니다."""
+    keys = ("Qto_WallBaseQuantities__Length", "Qto_WallBaseQuantities__NetSideArea", "Qto_WallBaseQuantities__NetVolume")
+    row_count = math.ceil(VALUE_COUNT / len(keys))
+    rng = np.random.default_rng(0)
+    values = rng.random((row_count, len(keys))) * 100
+    global_ids = [f"{row:022d}" for row in range(row_count)]
+    element_jsons = [json.dumps({"UniqueId": global_id, "Parameters": dict(zip(keys, row))}) for global_id, row in zip(global_ids, values.tolist())]
+    columns = QuantityColumns()
+    for global_id, row in zip(global_ids, values.tolist()): columns.add(global_id, dict(zip(keys, row)))
+    print(f"[전송만] 수량 값 {row_count * len(keys)}개")
+    timed("JSON 인코딩+서버 파싱", json_path, element_jsons, value_count=row_count * len(keys))
+    timed("열 바이너리 인코딩+디코딩", columnar_path, columns, value_count=row_count * len(keys))
+
+
+def main():
+    element_count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    model_benchmark(element_count)
+    transport_benchmark()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+#
+# 대량 전송 중 선택 왕복 지연 벤치마크
+#
+# 메인 스레드는 블렌더 타이머(추출 작업 틱 + 명령함 타이머)를 흉내 내며 256 KB 요소 메시지를 계속 송신 큐에 넣고,
+# 로컬 스텁 서버는 50 ms 마다 get_selection 을 보내 응답이 돌아오기까지의 시간을 잽니다.
+# 서버보다 네트워크가 느린 상황을 만들기 위해 송신 작업이 쓰는 웹소켓의 전송 속도를 LINK_BYTES_PER_SECOND 로 제한합니다.
+#   1) 우선순위 없음: 선택 명령은 명령함 타이머에서만 처리, 응답은 대량 메시지 뒤에 줄을 섭니다.
+#   2) 우선순위 통로: 추출 틱마다 선택 명령을 먼저 처리, 응답은 송신 큐의 우선순위 통로로 보냅니다.
+#
+# 사용법: python benchmarks/bench_selection_latency.py [전송할 MB]
+#
+import asyncio
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+
+ADDON_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (ADDON_DIR, os.path.join(ADDON_DIR, "lib")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+import websockets
+
+import protocol
+from command_inbox import CommandInbox
+from send_queue import SendQueue, SendQueueClosed
+
+LINK_BYTES_PER_SECOND = 20 * 1024 * 1024
+FRAME_BYTES = 256 * 1024
+EXTRACT_SECONDS_PER_FRAME = 0.004 # 추출 속도(약 64 MB/초)가 링크보다 빨라 송신 큐가 가득 차는 상황
+FETCH_TICK_BUDGET = 0.008
+FETCH_WAIT_INTERVAL = 0.005
+BLENDER_TICK = 0.001
+SELECTION_INTERVAL = 0.05
+LATENCY_GOAL = 0.05
+
+
+class ThrottledWebSocket:
+    """send 가 프레임 크기만큼 링크 시간을 쓰도록 늦추는 래퍼."""
+
+    def __init__(self, websocket):
+        self.websocket = websocket
+
+    async def send(self, frame):
+        await asyncio.sleep(len(frame) / LINK_BYTES_PER_SECOND)
+        await self.websocket.send(frame)
+
+
+def run_timers(timers, finished):
+    """bpy.app.timers 처럼 등록된 함수를 반환한 간격마다 호출합니다."""
+    due = {timer: time.perf_counter() for timer in timers}
+    while due and not finished():
+        timer = min(due, key=due.get)
+        wait = due[timer] - time.perf_counter()
+        if wait > 0: time.sleep(wait)
+        interval = timer()
+        if interval is None: del due[timer]
+        else: due[timer] = time.perf_counter() + max(interval, BLENDER_TICK)
+
+
+def run_case(label, priority, total_bytes):
+    inbox = CommandInbox(protocol.INTERACTIVE_COMMANDS if priority else ())
+    latencies = []
+    state = {"done": False}
+    connected = threading.Event()
+    frame = json.dumps({"type": "fetch_progress_update", "payload": {"elements": ["x" * (FRAME_BYTES - 100)]}})
+    frame_count = total_bytes // FRAME_BYTES
+
+    async def stub_server(websocket):
+        async def ask_selection():
+            while True:
+                await asyncio.sleep(SELECTION_INTERVAL)
+                await websocket.send(json.dumps({"command": "get_selection", "sent_at": time.perf_counter()}))
+        ask_task = asyncio.create_task(ask_selection())
+        async for message in websocket:
+            if message.startswith('{"type": "revit_selection_response"'):
+                latencies.append(time.perf_counter() - json.loads(message)["sent_at"])
+            elif message.startswith('{"type": "fetch_progress_complete"'): break
+        ask_task.cancel()
+        state["done"] = True
+
+    def websocket_thread():
+        async def main():
+            async with websockets.serve(stub_server, "127.0.0.1", 0, max_size=None) as server:
+                port = server.sockets[0].getsockname()[1]
+                async with websockets.connect(f"ws://127.0.0.1:{port}", max_size=None) as websocket:
+                    state["queue"] = queue = SendQueue(asyncio.get_running_loop())
+                    send_task = asyncio.create_task(queue.run(ThrottledWebSocket(websocket)))
+                    connected.set()
+                    try: await inbox.receive(websocket, json.loads)
+                    except websockets.exceptions.ConnectionClosed: pass
+                    send_task.cancel()
+        asyncio.run(main())
+
+    thread = threading.Thread(target=websocket_thread, daemon=True)
+    thread.start()
+    connected.wait()
+    queue = state["queue"]
+
+    def handle(command_data):
+        response = json.dumps({"type": "revit_selection_response", "payload": [], "sent_at": command_data["sent_at"]})
+        try: queue.put(response, timeout=30, priority=priority)
+        except SendQueueClosed: pass # 전송이 끝나 서버가 연결을 닫은 뒤 도착한 요청
+
+    produced = {"count": 0, "pending": None}
+    def fetch_tick():
+        if priority:
+            for command_data in inbox.drain(priority_only=True): handle(command_data)
+        deadline = time.perf_counter() + FETCH_TICK_BUDGET
+        while time.perf_counter() < deadline:
+            if produced["count"] == frame_count:
+                queue.put(json.dumps({"type": "fetch_progress_complete", "payload": {}}), timeout=30)
+                return None
+            if produced["pending"] is None:
+                busy_until = time.perf_counter() + EXTRACT_SECONDS_PER_FRAME
+                while time.perf_counter() < busy_until: pass
+                produced["pending"] = frame
+            if not queue.try_put(produced["pending"]): return FETCH_WAIT_INTERVAL
+            produced["pending"] = None
+            produced["count"] += 1
+        return 0.0
+
+    def inbox_timer():
+        commands = inbox.drain()
+        for command_data in commands: handle(command_data)
+        return inbox.next_interval(bool(commands))
+
+    started = time.perf_counter()
+    run_timers((fetch_tick, inbox_timer), lambda: state["done"])
+    elapsed = time.perf_counter() - started
+    thread.join(5)
+    latencies = sorted(latency * 1000 for latency in latencies)
+    p95 = latencies[max(int(len(latencies) * 0.95) - 1, 0)]
+    verdict = "달성" if latencies[-1] <= LATENCY_GOAL * 1000 else "미달"
+    print(f"  {label:<16} 전송 {elapsed:5.2f}초, 선택 {len(latencies)}회  평균 {statistics.mean(latencies):6.1f} ms  p95 {p95:6.1f} ms  최대 {latencies[-1]:6.1f} ms  (목표 {LATENCY_GOAL * 1000:.0f} ms {verdict})")
+
+
+def main():
+    total_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    print(f"[요소 메시지 {total_mb} MB, 링크 {LINK_BYTES_PER_SECOND // (1024 * 1024)} MB/초, 선택 요청 {SELECTION_INTERVAL * 1000:.0f} ms 간격]")
+    run_case("우선순위 없음", False, total_mb * 1024 * 1024)
+    run_case("우선순위 통로", True, total_mb * 1024 * 1024)
+
+
+if __name__ == "__main__":
+    main()
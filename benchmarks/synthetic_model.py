@@ -0,0 +1,92 @@
+#
+# 벤치마크용 합성 IFC4 모델 생성기
+#
+# 실제 내보내기 파일처럼 속성 세트/수량 세트/타입 객체를 여러 요소가 공유하도록 만듭니다.
+#
+import os
+import sys
+
+import ifcopenshell
+import ifcopenshell.guid
+
+ADDON_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (ADDON_DIR, os.path.join(ADDON_DIR, "lib")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+
+def build_synthetic_model(element_count=20000, type_count=50, storey_count=10, shared_pset_count=200):
+    """element_count 개의 벽/슬래브/기둥을 가진 IFC4 모델을 만듭니다."""
+    f = ifcopenshell.file(schema="IFC4")
+    new = ifcopenshell.guid.new
+    project = f.createIfcProject(new(), Name="Benchmark")
+    site = f.createIfcSite(new(), Name="Site")
+    building = f.createIfcBuilding(new(), Name="Building")
+    f.createIfcRelAggregates(new(), RelatingObject=project, RelatedObjects=[site])
+    f.createIfcRelAggregates(new(), RelatingObject=site, RelatedObjects=[building])
+    storeys = [f.createIfcBuildingStorey(new(), Name=f"{i + 1}층") for i in range(storey_count)]
+    f.createIfcRelAggregates(new(), RelatingObject=building, RelatedObjects=storeys)
+
+    classes = ("IfcWall", "IfcSlab", "IfcColumn")
+    type_classes = {"IfcWall": "IfcWallType", "IfcSlab": "IfcSlabType", "IfcColumn": "IfcColumnType"}
+    types = []
+    for i in range(type_count):
+        ifc_class = classes[i % len(classes)]
+        type_pset = f.createIfcPropertySet(new(), Name=f"{ifc_class[3:]}Type_Common", HasProperties=[
+            f.createIfcPropertySingleValue("FireRating", None, f.createIfcLabel(f"{i % 4}HR"), None),
+            f.createIfcPropertySingleValue("ThermalTransmittance", None, f.createIfcThermalTransmittanceMeasure(0.25 + i / 100), None),
+            f.createIfcPropertySingleValue("Manufacturer", None, f.createIfcLabel(f"제조사 {i}"), None),
+        ])
+        types.append(f.create_entity(type_classes[ifc_class], new(), Name=f"{ifc_class[3:]} Type {i}", HasPropertySets=[type_pset]))
+
+    shared_psets = []
+    for i in range(shared_pset_count):
+        shared_psets.append(f.createIfcPropertySet(new(), Name="Pset_Shared", HasProperties=[
+            f.createIfcPropertySingleValue("IsExternal", None, f.createIfcBoolean(i % 2 == 0), None),
+            f.createIfcPropertySingleValue("LoadBearing", None, f.createIfcBoolean(i % 3 == 0), None),
+            f.createIfcPropertySingleValue("Reference", None, f.createIfcIdentifier(f"REF-{i}"), None),
+        ]))
+
+    types_by_class = {ifc_class: [t for t in types if t.is_a() == type_classes[ifc_class]] for ifc_class in classes}
+    elements_by_type = {t.id(): [] for t in types}
+    elements_by_storey = {s.id(): [] for s in storeys}
+    elements_by_pset = {p.id(): [] for p in shared_psets}
+    for i in range(element_count):
+        ifc_class = classes[i % len(classes)]
+        element = f.create_entity(ifc_class, new(), Name=f"{ifc_class[3:]} {i}")
+        common = f.createIfcPropertySet(new(), Name=f"Pset_{ifc_class[3:]}Common", HasProperties=[
+            f.createIfcPropertySingleValue("IsExternal", None, f.createIfcBoolean(i % 2 == 0), None),
+            f.createIfcPropertySingleValue("Status", None, f.createIfcLabel("New"), None),
+        ])
+        quantities = f.createIfcElementQuantity(new(), Name=f"Qto_{ifc_class[3:]}BaseQuantities", Quantities=[
+            f.createIfcQuantityLength("Length", None, None, 1.0 + i % 17),
+            f.createIfcQuantityArea("NetSideArea", None, None, 3.5 + i % 11),
+            f.createIfcQuantityVolume("NetVolume", None, None, 0.7 + i % 5),
+        ])
+        f.createIfcRelDefinesByProperties(new(), RelatedObjects=[element], RelatingPropertyDefinition=common)
+        f.createIfcRelDefinesByProperties(new(), RelatedObjects=[element], RelatingPropertyDefinition=quantities)
+        elements_by_pset[shared_psets[i % shared_pset_count].id()].append(element)
+        candidates = types_by_class[ifc_class]
+        type_object = candidates[(i // len(classes)) % len(candidates)]
+        elements_by_type[type_object.id()].append(element)
+        elements_by_storey[storeys[i % storey_count].id()].append(element)
+        if i % 50 == 0:
+            port = f.createIfcDistributionPort(new(), Name=f"Port {i}")
+            f.createIfcRelNests(new(), RelatingObject=element, RelatedObjects=[port])
+
+    for pset in shared_psets:
+        if elements_by_pset[pset.id()]:
+            f.createIfcRelDefinesByProperties(new(), RelatedObjects=elements_by_pset[pset.id()], RelatingPropertyDefinition=pset)
+    for type_object in types:
+        if elements_by_type[type_object.id()]:
+            f.createIfcRelDefinesByType(new(), RelatedObjects=elements_by_type[type_object.id()], RelatingType=type_object)
+    for storey in storeys:
+        if elements_by_storey[storey.id()]:
+            f.createIfcRelContainedInSpatialStructure(new(), RelatedElements=elements_by_storey[storey.id()], RelatingStructure=storey)
+    return f
+
+
+def write_synthetic_model(path, **kwargs):
+    model = build_synthetic_model(**kwargs)
+    model.write(path)
+    return path
@@ -0,0 +1,137 @@
+#
+# 수신 명령함
+#
+# 웹소켓 스레드가 받은 프레임을 그 자리에서 디코딩해 넣고(receive), 블렌더 메인 스레드의 타이머가 꺼내 처리합니다.
+# 타이머 간격은 명령이 들어오는 동안에는 0 에 가깝게, 조용해지면 점점 늘려 INBOX_IDLE_INTERVAL 까지 둡니다.
+# 선택처럼 사용자가 기다리는 명령(priority_commands)은 따로 모아, 긴 작업이 틱 사이에 먼저 꺼내 처리할 수 있게 합니다.
+# 한 번에 꺼낸 명령 중 뒤의 명령에 덮어써지는 것은 처리하지 않습니다. (coalesce_commands)
+# 이렇게 빠진 전송 요청은 on_superseded 로 알려, 서버가 답을 기다리지 않게 합니다.
+# bpy 에 의존하지 않습니다.
+#
+import collections
+import heapq
+import threading
+import time
+
+
+INBOX_ACTIVE_INTERVAL = 0.0 # 명령을 처리한 직후: 다음 이벤트 루프에서 바로 다시 확인
+INBOX_FIRST_IDLE_INTERVAL = 0.002
+INBOX_IDLE_INTERVAL = 0.1 # 오래 조용할 때의 최대 간격 (= 명령 처리 지연의 상한)
+
+FETCH_COMMANDS = frozenset({"fetch_all_elements_chunked", "fetch_delta", "fetch_quantities_columnar"})
+COLOR_COMMANDS = frozenset({"colorize_elements", "reset_colors"}) # 각각 이전 색칠을 모두 바꾸므로 마지막 것만 적용하면 됩니다.
+VISIBILITY_COMMANDS = frozenset({"isolate_elements", "unhide_all"}) # 마찬가지로 이전 격리를 모두 바꿉니다.
+
+
+def coalesce_commands(commands, superseded=None):
+    """뒤의 명령에 덮어써지는 명령을 뺀 목록을 반환합니다.
+
+    - select_elements: 뒤에 다른 select_elements 가 있으면 마지막 선택만 적용합니다. 사이에 get_selection 이 있으면 둘 다 적용합니다.
+    - 전송 요청: 같은 명령·같은 프로젝트의 요청이 뒤에 또 있으면 마지막 요청만 시작합니다.
+      (fetch_delta 나 fetch_quantities_columnar 는 전체 전송을 대신하지 않습니다.) 빠진 요청은 superseded 목록에 넣습니다.
+    - colorize_elements/reset_colors, isolate_elements/unhide_all: 각각 마지막 것만 적용합니다.
+    """
+    kept = []
+    selection_replaced = False
+    colors_replaced = False
+    visibility_replaced = False
+    requested_projects = set()
+    for command_data in reversed(commands):
+        command = command_data.get("command")
+        if command == "select_elements":
+            if selection_replaced: continue
+            selection_replaced = True
+        elif command == "get_selection": selection_replaced = False
+        elif command in FETCH_COMMANDS:
+            request_key = (command, command_data.get("project_id"))
+            if request_key in requested_projects:
+                if superseded is not None: superseded.append(command_data)
+                continue
+            requested_projects.add(request_key)
+        elif command in COLOR_COMMANDS:
+            if colors_replaced: continue
+            colors_replaced = True
+        elif command in VISIBILITY_COMMANDS:
+            if visibility_replaced: continue
+            visibility_replaced = True
+        kept.append(command_data)
+    kept.reverse()
+    return kept
+
+
+class CommandInbox:
+    """스레드 안전 명령함. put 은 어느 스레드에서나, drain/next_interval 은 메인 스레드에서 호출합니다."""
+
+    def __init__(self, priority_commands=(), on_superseded=None):
+        self.priority_commands = frozenset(priority_commands)
+        self.on_superseded = on_superseded # 병합으로 빠진 전송 요청마다 drain 에서(메인 스레드) 호출합니다.
+        self._commands = collections.deque()
+        self._priority_commands = collections.deque()
+        self._lock = threading.Lock()
+        self._interval = INBOX_IDLE_INTERVAL
+        self.dispatched = 0
+        self.decode_errors = 0
+        self.coalesced = 0
+        self.max_latency = 0.0
+        self.total_latency = 0.0
+
+    def __len__(self):
+        return len(self._commands) + len(self._priority_commands)
+
+    def put(self, command_data):
+        priority = command_data.get("command") in self.priority_commands
+        with self._lock:
+            (self._priority_commands if priority else self._commands).append((time.perf_counter(), command_data))
+
+    def drain(self, priority_only=False):
+        """쌓인 명령을 받은 순서대로 꺼내 덮어써진 명령을 빼고 반환하며, 명령이 대기한 시간을 집계합니다.
+
+        priority_only 이면 우선순위 명령만 꺼냅니다. (server_hello 처럼 순서가 중요한 명령을 앞지르지 않도록 평소에는 섞어 꺼냅니다.)
+        """
+        with self._lock:
+            if priority_only: entries = list(self._priority_commands)
+            else: entries = list(heapq.merge(self._priority_commands, self._commands, key=lambda entry: entry[0]))
+            self._priority_commands.clear()
+            if not priority_only: self._commands.clear()
+        if not entries: return []
+        now = time.perf_counter()
+        for queued_at, _ in entries:
+            latency = now - queued_at
+            self.total_latency += latency
+            self.max_latency = max(self.max_latency, latency)
+        superseded = []
+        commands = coalesce_commands([command_data for _, command_data in entries], superseded)
+        self.coalesced += len(entries) - len(commands)
+        self.dispatched += len(commands)
+        if self.on_superseded:
+            for command_data in superseded: self.on_superseded(command_data)
+        return commands
+
+    async def receive(self, websocket, decode):
+        """웹소켓 이벤트 루프에서 호출합니다. 연결이 닫힐 때까지 프레임이 도착하는 즉시 decode 해 넣습니다.
+
+        형식이 잘못된 프레임은 연결을 끊지 않고 건너뜁니다. 비정상 종료는 ConnectionClosed 로 전달됩니다.
+        """
+        async for frame in websocket:
+            try: command_data = decode(frame)
+            except ValueError as e:
+                self.decode_errors += 1
+                print(f"⚠️ [Blender] 해석할 수 없는 메시지를 건너뜁니다: {e}")
+                continue
+            if isinstance(command_data, dict): self.put(command_data)
+
+    def clear(self):
+        with self._lock:
+            self._commands.clear()
+            self._priority_commands.clear()
+
+    def next_interval(self, active):
+        """이번 틱에 명령을 처리했으면(active) 바로, 아니면 직전 간격의 두 배(최대 INBOX_IDLE_INTERVAL) 뒤에 다시 확인합니다."""
+        if active: self._interval = INBOX_ACTIVE_INTERVAL
+        else: self._interval = min(max(self._interval * 2, INBOX_FIRST_IDLE_INTERVAL), INBOX_IDLE_INTERVAL)
+        return self._interval
+
+    def stats(self):
+        drained = self.dispatched + self.coalesced
+        average = self.total_latency / drained if drained else 0.0
+        return f"명령 {self.dispatched}개 처리 (병합 {self.coalesced}개), 대기 평균 {average * 1000:.1f} ms / 최대 {self.max_latency * 1000:.1f} ms"
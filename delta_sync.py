@@ -0,0 +1,76 @@
+#
+# 변경분(델타) 동기화
+#
+# 마지막으로 서버에 보낸 요소별 지문(fingerprint)을 기억해 두었다가,
+# fetch_delta 요청 때 추가·수정·삭제된 GlobalId 만 골라 보냅니다. bpy 에 의존하지 않습니다.
+#
+# 지문 = 요소 JSON (+ type_table 모드에서는 참조하는 타입 정보 JSON) 의 blake2b 해시.
+# 타입 파라미터만 바뀌어도 그 타입을 쓰는 요소는 수정된 것으로 분류됩니다.
+#
+import hashlib
+import json
+
+
+FINGERPRINT_SIZE = 8 # 바이트
+
+
+def element_fingerprint(element_json, type_info=None):
+    digest = hashlib.blake2b(element_json.encode("utf-8"), digest_size=FINGERPRINT_SIZE)
+    if type_info is not None: digest.update(json.dumps(type_info).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class DeltaTracker:
+    """한 번의 추출에서 요소 지문을 계산하고, 기준(baseline) 지문과 비교해 변경 종류를 판정합니다.
+
+    baseline 이 None 이면 모든 요소를 추가된 것으로 봅니다.
+    """
+
+    ADDED = "added"
+    MODIFIED = "modified"
+
+    def __init__(self, baseline=None):
+        self.baseline = baseline or {}
+        self.fingerprints = {}
+        self.types = {}
+        self.unchanged_count = 0
+
+    def add_types(self, new_types):
+        if new_types: self.types.update(new_types)
+
+    def classify(self, element_json, global_id, type_id=None):
+        """요소 지문을 기록하고 "added", "modified" 또는 변경이 없으면 None 을 반환합니다."""
+        type_info = self.types.get(str(type_id)) if type_id is not None else None
+        fingerprint = element_fingerprint(element_json, type_info)
+        self.fingerprints[global_id] = fingerprint
+        previous = self.baseline.get(global_id)
+        if previous is None: return self.ADDED
+        if previous == fingerprint:
+            self.unchanged_count += 1
+            return None
+        return self.MODIFIED
+
+    def deleted(self):
+        """기준에는 있었지만 이번 추출에서 나오지 않은 GlobalId 목록."""
+        return [global_id for global_id in self.baseline if global_id not in self.fingerprints]
+
+
+class FingerprintStore:
+    """프로젝트별로 서버에 마지막으로 보낸 요소 지문을 보관합니다. 블렌더 세션 동안만 유지됩니다.
+
+    추출 옵션(type_table 등)이 다르면 지문을 비교할 수 없으므로 기준이 없는 것으로 취급합니다.
+    """
+
+    def __init__(self):
+        self._baselines = {}
+
+    def get(self, project_id, options):
+        entry = self._baselines.get(project_id)
+        return entry[1] if entry and entry[0] == options else None
+
+    def set(self, project_id, options, fingerprints):
+        self._baselines[project_id] = (options, fingerprints)
+
+    def clear(self, project_id=None):
+        if project_id is None: self._baselines.clear()
+        else: self._baselines.pop(project_id, None)
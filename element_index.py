@@ -0,0 +1,146 @@
+#
+# GlobalId <-> IFC step id <-> 블렌더 객체 색인
+#
+# 선택 명령마다 by_guid/by_id 를 부르고 장면의 모든 객체를 훑지 않도록, 한 번 만든 색인을 유지합니다.
+#  - IFC 쪽(GlobalId <-> step id)은 IFC 파일 객체가 바뀔 때까지 유지하고, 색인에 없는 요소는 파일에서 찾아 채웁니다.
+#  - 객체 쪽(step id <-> 객체)은 depsgraph_update_post 에서 바뀐 객체만 고치고,
+#    객체 수나 컬렉션 링크가 바뀌었거나 파일을 열었거나 실행 취소(undo/redo)로 객체 참조가 무효가 되면 다시 만듭니다.
+#    객체 위치(foreach_get 배열의 행 번호)도 함께 만들므로 객체 쪽이 유효하면 위치도 장면 객체 순서와 맞습니다.
+# 객체 목록은 호출하는 쪽에서 넘겨주므로 bpy 에 의존하지 않습니다. 블렌더 메인 스레드에서만 호출해야 합니다.
+#
+
+
+def object_step_id(obj):
+    """Bonsai 가 객체에 기록한 IFC step id. IFC 요소가 아니면 0."""
+    props = getattr(obj, "BIMObjectProperties", None)
+    if props is None: return 0
+    return getattr(props, "ifc_definition_id", 0) or 0
+
+
+class ElementIndex:
+    """GlobalId, IFC step id, 블렌더 객체를 서로 찾는 색인."""
+
+    def __init__(self):
+        self._ifc_file = None
+        self._guid_to_step = {}
+        self._step_to_guid = {}
+        self._step_to_object = {}
+        self._object_to_step = {}
+        self._object_position = {} # 객체 -> 장면 객체 목록에서의 위치 (foreach_get 배열의 행 번호)
+        self._objects_valid = False
+        self.object_count = -1 # 색인을 만들 때의 장면 객체 수 (객체 추가·삭제 감지용)
+        self.rebuilds = 0
+
+    def invalidate(self):
+        """파일을 열었을 때: IFC 쪽과 객체 쪽을 모두 버립니다."""
+        self._ifc_file = None
+        self._guid_to_step.clear()
+        self._step_to_guid.clear()
+        self.invalidate_objects()
+
+    @property
+    def objects_valid(self):
+        """객체 쪽 색인이 만들어져 있으면 True. False 이면 다음 ensure 에서 다시 만듭니다."""
+        return self._objects_valid
+
+    def invalidate_objects(self):
+        """객체가 추가·삭제되었거나 undo 로 객체 참조가 무효가 되었을 때: 객체 쪽만 버립니다."""
+        self._objects_valid = False
+        self._step_to_object.clear()
+        self._object_to_step.clear()
+        self._object_position.clear()
+
+    def ensure(self, ifc_file, objects):
+        """색인이 ifc_file 과 objects(장면의 객체 목록) 기준으로 최신이 되게 합니다."""
+        if ifc_file is not self._ifc_file:
+            self._ifc_file = ifc_file
+            # GlobalId 는 IfcRoot 의 첫 번째 속성입니다. element.GlobalId 보다 get_argument(0) 이 몇 배 빠릅니다.
+            self._guid_to_step = {}
+            for element in ifc_file.by_type("IfcProduct"):
+                global_id = element.wrapped_data.get_argument(0)
+                if global_id: self._guid_to_step[global_id] = element.id()
+            self._step_to_guid = {step_id: global_id for global_id, step_id in self._guid_to_step.items()}
+        if not self._objects_valid or len(objects) != self.object_count:
+            self.invalidate_objects()
+            for position, obj in enumerate(objects):
+                step_id = object_step_id(obj)
+                if step_id:
+                    self._step_to_object[step_id] = obj
+                    self._object_to_step[obj] = step_id
+                    self._object_position[obj] = position
+            self.object_count = len(objects)
+            self._objects_valid = True
+            self.rebuilds += 1
+
+    def update_object(self, obj):
+        """depsgraph 가 알려 준 객체의 step id 가 바뀌었으면 색인을 고칩니다."""
+        if not self._objects_valid: return
+        step_id = object_step_id(obj)
+        old_step_id = self._object_to_step.get(obj, 0)
+        if step_id == old_step_id: return
+        if old_step_id and self._step_to_object.get(old_step_id) is obj: del self._step_to_object[old_step_id]
+        if step_id:
+            self._step_to_object[step_id] = obj
+            self._object_to_step[obj] = step_id
+        else: self._object_to_step.pop(obj, None)
+        # 위치는 객체가 추가·삭제될 때만 바뀌고, 그때는 색인을 다시 만듭니다. 새로 IFC 요소가 된 객체의 위치는 모릅니다.
+
+    def step_id_for_guid(self, global_id):
+        step_id = self._guid_to_step.get(global_id)
+        if step_id is None and self._ifc_file is not None:
+            # 색인을 만든 뒤 Bonsai 에서 추가된 요소
+            try: step_id = self._ifc_file.by_guid(global_id).id()
+            except RuntimeError: return None
+            self._guid_to_step[global_id] = step_id
+            self._step_to_guid[step_id] = global_id
+        return step_id
+
+    def guid_for_step_id(self, step_id):
+        global_id = self._step_to_guid.get(step_id)
+        if global_id is None and self._ifc_file is not None:
+            try: element = self._ifc_file.by_id(step_id)
+            except RuntimeError: return None
+            global_id = getattr(element, "GlobalId", None)
+            if global_id is None: return None
+            self._step_to_guid[step_id] = global_id
+            self._guid_to_step[global_id] = step_id
+        return global_id
+
+    def objects_for_guids(self, guids):
+        """GlobalId 목록에 해당하는 객체 목록. 객체가 없는 GlobalId 는 건너뜁니다."""
+        step_to_object = self._step_to_object
+        objects = []
+        for global_id in guids:
+            obj = step_to_object.get(self.step_id_for_guid(global_id))
+            if obj is not None: objects.append(obj)
+        return objects
+
+    def positions_for_objects(self, objects):
+        """색인을 만들 때의 장면 객체 목록 기준 위치 목록. 위치를 모르는 객체가 있으면 None."""
+        object_position = self._object_position
+        try: return [object_position[obj] for obj in objects]
+        except KeyError: return None
+
+    def positions_for_guids(self, guids):
+        """GlobalId 목록 중 장면 객체가 있는 것의 (guids 안의 번호 목록, 장면 객체 목록 기준 위치 목록)."""
+        step_to_object = self._step_to_object
+        object_position = self._object_position
+        rows = []
+        positions = []
+        for row, global_id in enumerate(guids):
+            position = object_position.get(step_to_object.get(self.step_id_for_guid(global_id)))
+            if position is not None:
+                rows.append(row)
+                positions.append(position)
+        return rows, positions
+
+    def guid_for_object(self, obj):
+        step_id = self._object_to_step.get(obj) or object_step_id(obj)
+        return self.guid_for_step_id(step_id) if step_id else None
+
+    def guids_for_objects(self, objects):
+        guids = []
+        for obj in objects:
+            global_id = self.guid_for_object(obj)
+            if global_id: guids.append(global_id)
+        return guids
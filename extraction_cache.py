@@ -0,0 +1,262 @@
+#
+# 디스크 추출 캐시
+#
+# 직렬화된 요소 JSON 을 SQLite 파일에 저장해, IFC 파일이 바뀌지 않았다면 다음 "전체 가져오기" 때
+# IFC 를 다시 추출하지 않고 디스크에서 바로 스트리밍합니다. bpy 에 의존하지 않습니다.
+#
+# 캐시 키 = 파일 내용 해시 + 추출기 버전(EXTRACTOR_VERSION) + 추출 옵션.
+# 경로·크기·수정 시각이 같으면 저장된 해시를 재사용하고, 다를 때만 파일 내용을 다시 해시합니다.
+#
+# 파일이 바뀌어 키가 달라지면, 같은 경로·같은 옵션의 이전 항목(previous_model_key)에서
+# GlobalId 와 원본 지문(ElementExtractor.source_fingerprint)이 같은 요소는 다시 쓰고 나머지만 추출합니다.
+# invalidate_elements 로 지운 요소는 이전 항목에도 없으므로 다시 추출됩니다.
+#
+import hashlib
+import json
+import os
+import platform
+import sqlite3
+import time
+
+try: from .ifc_extractor import EXTRACTOR_VERSION
+except ImportError: from ifc_extractor import EXTRACTOR_VERSION
+
+
+CACHE_FILE_NAME = "extraction_cache.sqlite3"
+MAX_CACHED_MODELS = 5 # 이보다 오래된 모델 항목은 자동으로 지웁니다.
+HASH_BLOCK_SIZE = 1 << 20
+SCHEMA_VERSION = 2 # 테이블 구조가 바뀌면 올립니다. 이전 버전의 캐시 파일은 비우고 다시 만듭니다.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS models (
+    model_key TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    content_hash TEXT NOT NULL,
+    element_count INTEGER NOT NULL DEFAULT 0,
+    complete INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS elements (
+    model_key TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    global_id TEXT NOT NULL,
+    type_id INTEGER,
+    element_json TEXT NOT NULL,
+    source_fingerprint TEXT,
+    PRIMARY KEY (model_key, position)
+);
+CREATE INDEX IF NOT EXISTS elements_by_guid ON elements (model_key, global_id);
+CREATE TABLE IF NOT EXISTS types (
+    model_key TEXT NOT NULL,
+    type_id INTEGER NOT NULL,
+    type_json TEXT NOT NULL,
+    PRIMARY KEY (model_key, type_id)
+);
+"""
+
+
+def default_cache_dir():
+    """운영체제별 사용자 캐시 폴더 아래의 CostEstimator 폴더."""
+    if platform.system() == "Windows":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~\\AppData\\Local")
+    elif platform.system() == "Darwin":
+        base = os.path.expanduser("~/Library/Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "CostEstimator")
+
+
+def iter_hash_file(path):
+    """파일을 HASH_BLOCK_SIZE 블록씩 해시하며 블록마다 None 을 내보냅니다. 해시는 생성기의 반환값입니다. (yield from)"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+            yield
+    return digest.hexdigest()
+
+
+def hash_file(path):
+    steps = iter_hash_file(path)
+    while True:
+        try: next(steps)
+        except StopIteration as done: return done.value
+
+
+def _key_suffix(options):
+    """캐시 키에서 파일 내용 해시 뒤의 부분: 추출기 버전 + 추출 옵션."""
+    return f"{EXTRACTOR_VERSION}:{json.dumps(options, sort_keys=True, separators=(',', ':'))}"
+
+
+class ExtractionCache:
+    """모델별 요소 JSON 을 위치(position) 순서로 저장하는 SQLite 캐시. 한 스레드에서만 사용해야 합니다."""
+
+    def __init__(self, cache_dir=None):
+        self.path = os.path.join(cache_dir or default_cache_dir(), CACHE_FILE_NAME)
+        self._connection = None
+
+    @property
+    def connection(self):
+        if self._connection is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._connection = sqlite3.connect(self.path)
+            if self._connection.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+                self._connection.executescript("DROP TABLE IF EXISTS elements; DROP TABLE IF EXISTS types; DROP TABLE IF EXISTS models;")
+                self._connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            self._connection.executescript(SCHEMA)
+        return self._connection
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    # --- 키 계산 ---
+
+    def cached_content_hash(self, ifc_path, stat=None):
+        """경로·크기·수정 시각이 같은 기존 항목의 해시. 없으면 None."""
+        stat = stat or os.stat(ifc_path)
+        row = self.connection.execute(
+            "SELECT content_hash FROM models WHERE path = ? AND size = ? AND mtime_ns = ? LIMIT 1",
+            (os.path.abspath(ifc_path), stat.st_size, stat.st_mtime_ns)).fetchone()
+        return row[0] if row else None
+
+    def content_hash(self, ifc_path):
+        """경로·크기·수정 시각이 같은 기존 항목이 있으면 그 해시를, 없으면 파일을 해시해 반환합니다."""
+        return self.cached_content_hash(ifc_path) or hash_file(ifc_path)
+
+    def model_key(self, ifc_path, options):
+        """options: 출력에 영향을 주는 추출 옵션 딕셔너리 (예: type_table, chunk_size)."""
+        return f"{self.content_hash(ifc_path)}:{_key_suffix(options)}"
+
+    def iter_model_key(self, ifc_path, options):
+        """model_key 와 같지만 파일을 해시해야 하면 블록마다 None 을 내보냅니다. 키는 생성기의 반환값입니다.
+
+        해시하는 동안 파일이 바뀌면 RuntimeError 를 발생시킵니다.
+        """
+        stat = os.stat(ifc_path)
+        content_hash = self.cached_content_hash(ifc_path, stat)
+        if content_hash is None:
+            content_hash = yield from iter_hash_file(ifc_path)
+            after = os.stat(ifc_path)
+            if (after.st_size, after.st_mtime_ns) != (stat.st_size, stat.st_mtime_ns): raise RuntimeError("해시하는 동안 IFC 파일이 바뀌었습니다.")
+        return f"{content_hash}:{_key_suffix(options)}"
+
+    # --- 조회 ---
+
+    def status(self, model_key):
+        """(요소 수, 완전 여부) 를 반환합니다. 항목이 없으면 None."""
+        row = self.connection.execute("SELECT element_count, complete FROM models WHERE model_key = ?", (model_key,)).fetchone()
+        return (row[0], bool(row[1])) if row else None
+
+    def previous_model_key(self, ifc_path, options, exclude_key=None):
+        """같은 경로·같은 추출기 버전·같은 옵션으로 저장된 항목 중 exclude_key 가 아닌 가장 최근 것. 없으면 None."""
+        suffix = _key_suffix(options)
+        rows = self.connection.execute("SELECT model_key FROM models WHERE path = ? ORDER BY updated_at DESC", (os.path.abspath(ifc_path),))
+        return next((key for key, in rows if key != exclude_key and key.split(":", 1)[1] == suffix), None)
+
+    def cached_positions(self, model_key, start, stop):
+        """[start, stop) 위치 중 캐시에 남아 있는 요소들의 {position: (global_id, type_id, element_json, source_fingerprint)}."""
+        rows = self.connection.execute(
+            "SELECT position, global_id, type_id, element_json, source_fingerprint FROM elements WHERE model_key = ? AND position >= ? AND position < ?",
+            (model_key, start, stop))
+        return {row[0]: row[1:] for row in rows}
+
+    def cached_elements(self, model_key, global_ids):
+        """global_ids 중 캐시에 남아 있는 요소들의 {global_id: (global_id, type_id, element_json, source_fingerprint)}."""
+        global_ids = list(global_ids)
+        found = {}
+        for i in range(0, len(global_ids), 500):
+            batch = global_ids[i:i + 500]
+            rows = self.connection.execute(
+                f"SELECT global_id, type_id, element_json, source_fingerprint FROM elements WHERE model_key = ? AND global_id IN ({','.join('?' * len(batch))})",
+                (model_key, *batch))
+            for row in rows: found[row[0]] = row
+        return found
+
+    def types(self, model_key, type_ids):
+        placeholders = ",".join("?" * len(type_ids))
+        rows = self.connection.execute(f"SELECT type_id, type_json FROM types WHERE model_key = ? AND type_id IN ({placeholders})", (model_key, *type_ids))
+        return {str(type_id): json.loads(type_json) for type_id, type_json in rows}
+
+    def iter_chunks(self, model_key, chunk_size):
+        """완전한 항목의 요소 JSON 을 청크 단위로 디스크에서 바로 읽어 (요소 JSON 목록, 새 타입 테이블, 키 목록, 원본 지문 목록) 을 생성합니다."""
+        sent_types = set()
+        cursor = self.connection.execute("SELECT global_id, type_id, element_json, source_fingerprint FROM elements WHERE model_key = ? ORDER BY position", (model_key,))
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows: return
+            # 새 타입은 추출할 때와 같이 처음 참조된 순서로 내보냅니다.
+            new_type_ids = list(dict.fromkeys(type_id for _, type_id, _, _ in rows if type_id is not None and type_id not in sent_types))
+            sent_types.update(new_type_ids)
+            stored = self.types(model_key, new_type_ids) if new_type_ids else None
+            new_types = {str(type_id): stored[str(type_id)] for type_id in new_type_ids} if stored else None
+            yield [row[2] for row in rows], new_types, [row[:2] for row in rows], [row[3] for row in rows]
+
+    # --- 저장 ---
+
+    def begin(self, model_key, ifc_path):
+        """새 항목을 만들거나 기존 항목을 미완료 상태로 되돌립니다."""
+        stat = os.stat(ifc_path)
+        content_hash = model_key.split(":", 1)[0]
+        self.connection.execute(
+            "INSERT INTO models (model_key, path, size, mtime_ns, content_hash, complete, updated_at) VALUES (?, ?, ?, ?, ?, 0, ?) "
+            "ON CONFLICT(model_key) DO UPDATE SET path = excluded.path, size = excluded.size, mtime_ns = excluded.mtime_ns, complete = 0, updated_at = excluded.updated_at",
+            (model_key, os.path.abspath(ifc_path), stat.st_size, stat.st_mtime_ns, content_hash, time.time()))
+
+    def store_chunk(self, model_key, start_position, element_jsons, keys, new_types=None, fingerprints=None):
+        """keys: 요소별 (GlobalId, RelatingTypeId). new_types: 이 청크에서 처음 나온 타입 테이블.
+
+        fingerprints: 요소별 원본 지문. 없으면 파일이 바뀐 뒤 이 요소들을 다시 쓰지 못하고 다시 추출합니다.
+        """
+        fingerprints = fingerprints or [None] * len(element_jsons)
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO elements (model_key, position, global_id, type_id, element_json, source_fingerprint) VALUES (?, ?, ?, ?, ?, ?)",
+            [(model_key, start_position + offset, global_id, type_id, element_json, fingerprint)
+             for offset, ((global_id, type_id), element_json, fingerprint) in enumerate(zip(keys, element_jsons, fingerprints))])
+        if new_types:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO types (model_key, type_id, type_json) VALUES (?, ?, ?)",
+                [(model_key, int(type_id), json.dumps(info)) for type_id, info in new_types.items()])
+
+    def finish(self, model_key, element_count):
+        self.connection.execute("UPDATE models SET element_count = ?, complete = 1, updated_at = ? WHERE model_key = ?", (element_count, time.time(), model_key))
+        self.connection.commit()
+        self.prune()
+
+    def discard(self):
+        """추출이 중간에 취소되었을 때 begin() 이후 커밋되지 않은 변경을 모두 되돌립니다."""
+        self.connection.rollback()
+
+    # --- 무효화 ---
+
+    def invalidate_elements(self, global_ids, model_key=None):
+        """지정한 GlobalId 의 요소만 캐시에서 지웁니다. 다음 가져오기 때 이 요소들만 다시 추출합니다."""
+        global_ids = list(global_ids)
+        where, params = ("model_key = ? AND ", [model_key]) if model_key else ("", [])
+        removed = 0
+        for i in range(0, len(global_ids), 500):
+            batch = global_ids[i:i + 500]
+            cursor = self.connection.execute(f"DELETE FROM elements WHERE {where}global_id IN ({','.join('?' * len(batch))})", (*params, *batch))
+            removed += cursor.rowcount
+        if removed:
+            self.connection.execute("UPDATE models SET complete = 0 WHERE element_count > (SELECT COUNT(*) FROM elements WHERE elements.model_key = models.model_key)")
+        self.connection.commit()
+        return removed
+
+    def invalidate_all(self):
+        self.connection.execute("DELETE FROM elements")
+        self.connection.execute("DELETE FROM types")
+        self.connection.execute("DELETE FROM models")
+        self.connection.commit()
+
+    def prune(self, keep=MAX_CACHED_MODELS):
+        stale = [row[0] for row in self.connection.execute("SELECT model_key FROM models ORDER BY updated_at DESC LIMIT -1 OFFSET ?", (keep,))]
+        for model_key in stale: self._delete(model_key)
+        self.connection.commit()
+
+    def _delete(self, model_key):
+        for table in ("elements", "types", "models"):
+            self.connection.execute(f"DELETE FROM {table} WHERE model_key = ?", (model_key,))
@@ -0,0 +1,96 @@
+#
+# 재연결과 전송 세션 재개
+#
+# 연결이 끊어지면 웹소켓 스레드는 지수 백오프로 다시 연결하고, 진행 중이던 전송 작업은 새 연결을 기다렸다가
+# 서버가 마지막으로 확인한 메시지 다음부터 이어서 보냅니다. 이미 보낸 요소를 다시 추출하지 않습니다.
+# bpy 에 의존하지 않습니다.
+#
+# 세션 메시지
+#   - 재개할 수 있는 작업은 세션 id 를 만들어 시작 메시지(payload "session_id")로 알리고,
+#     세션의 모든 메시지 payload 에 0 부터 증가하는 "seq" 를 붙입니다.
+#   - 다시 연결되면 작업이 {"type": "fetch_resume_request", "payload": {"session_id", "project_id", "next_seq"}} 를 보내고,
+#     서버는 {"command": "resume_fetch", "session_id", "last_seq": n} 으로 n 번까지 처리했음을 알립니다.
+#     (받은 것이 없으면 -1, 세션을 모르거나 재개할 수 없으면 "resumable": false)
+#   - 작업은 n 보다 큰 seq 의 메시지를 그대로 다시 보내고 이어서 진행합니다.
+#   - 서버의 ack(누적 확인)는 다시 보낼 필요가 없는 메시지를 버리는 데에도 쓰입니다.
+#     ack 에 "session_id" 를 붙이면 취소된 이전 작업에 대한 ack 를 새 작업이 잘못 받지 않습니다.
+#
+# 다시 보낼 메시지 보관 (ResendBuffer)
+#   - 작업이 ack 모드이거나 서버가 server_hello 에 "fetch_resume": true 를 보냈으면, 확인받을 때까지 RESEND_BUFFER_BYTES 까지 보관합니다.
+#   - 그렇지 않으면 서버가 확인해 주지 않으므로 RESEND_BUFFER_UNACKED_BYTES 까지만 보관하고, 송신 큐가 비면(모두 소켓에 넘겼으면) 버립니다.
+#     이때는 소켓에 넘긴 뒤 연결이 끊겨 서버가 받지 못한 메시지를 다시 보낼 수 없어, 재개가 fetch_resume_failed 로 실패하고
+#     서버가 전송을 다시 요청해야 합니다.
+#
+import collections
+import random
+
+
+RECONNECT_INITIAL_DELAY = 0.5
+RECONNECT_MAX_DELAY = 30.0
+RECONNECT_MAX_ATTEMPTS = 20 # 연결이 끊어진 뒤 연속으로 실패할 수 있는 재연결 시도 횟수
+RESUME_TIMEOUT = 120.0 # 작업이 새 연결과 재개 응답을 기다리는 최대 시간(초)
+RESEND_BUFFER_BYTES = 64 * 1024 * 1024 # ack 를 받지 못한 메시지를 보관하는 최대 크기
+RESEND_BUFFER_UNACKED_BYTES = 4 * 1024 * 1024 # 서버가 ack·재개를 지원하지 않을 때 송신 큐에 남은 메시지를 보관하는 최대 크기
+
+
+class ResumeError(ConnectionError):
+    pass
+
+
+class Backoff:
+    """재연결 대기 시간: RECONNECT_INITIAL_DELAY 부터 두 배씩 늘려 RECONNECT_MAX_DELAY 까지. 동시에 재연결하지 않도록 절반까지 무작위로 줄입니다."""
+
+    def __init__(self, initial=RECONNECT_INITIAL_DELAY, maximum=RECONNECT_MAX_DELAY, max_attempts=RECONNECT_MAX_ATTEMPTS):
+        self.initial = initial
+        self.maximum = maximum
+        self.max_attempts = max_attempts
+        self.attempt = 0
+
+    @property
+    def exhausted(self):
+        return self.attempt >= self.max_attempts
+
+    def next_delay(self):
+        delay = min(self.initial * (2 ** self.attempt), self.maximum)
+        self.attempt += 1
+        return random.uniform(delay / 2, delay)
+
+    def reset(self):
+        self.attempt = 0
+
+
+class ResendBuffer:
+    """보낸 세션 메시지 프레임을 seq 순서로 보관합니다. 서버가 확인한 메시지는 버리고, max_bytes 를 넘으면 오래된 것부터 버립니다."""
+
+    def __init__(self, max_bytes=RESEND_BUFFER_BYTES):
+        self.max_bytes = max_bytes
+        self._frames = collections.OrderedDict() # seq -> 프레임
+        self.bytes = 0
+        self.floor = 0 # 다시 보낼 수 있는 가장 작은 seq
+
+    def __len__(self):
+        return len(self._frames)
+
+    def _pop_oldest(self):
+        seq, frame = self._frames.popitem(last=False)
+        self.bytes -= len(frame)
+        self.floor = seq + 1
+
+    def add(self, seq, frame):
+        self._frames[seq] = frame
+        self.bytes += len(frame)
+        while self.bytes > self.max_bytes and len(self._frames) > 1: self._pop_oldest()
+
+    def ack(self, seq):
+        """seq 번까지 서버가 처리했으므로 버립니다."""
+        while self._frames and next(iter(self._frames)) <= seq: self._pop_oldest()
+        self.floor = max(self.floor, seq + 1)
+
+    def frames_after(self, seq):
+        """seq 보다 큰 메시지 [(seq, 프레임), ...]. 이미 버린 메시지가 필요하면 ResumeError."""
+        if seq + 1 < self.floor: raise ResumeError(f"메시지 {seq + 1}~{self.floor - 1} 을(를) 더 이상 보관하고 있지 않아 이어서 보낼 수 없습니다.")
+        return [(frame_seq, frame) for frame_seq, frame in self._frames.items() if frame_seq > seq]
+
+    def clear(self):
+        self._frames.clear()
+        self.bytes = 0
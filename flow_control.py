@@ -0,0 +1,94 @@
+#
+# 전송 흐름 제어
+#
+# 요소 메시지를 요소 개수가 아닌 목표 바이트 크기로 묶고, 서버가 ack 로 확인하지 않은 메시지 수를
+# 송신 창(credit window) 크기로 제한합니다. 왕복 시간(RTT)을 재서 목표 바이트 크기를 자동으로 조정합니다.
+# bpy 에 의존하지 않습니다.
+#
+# ack 모드 (명령에 "flow_control": "ack")
+#   - 메시지 payload 의 "seq" (fetch_session 참고) 로 서버가 {"command": "ack", "seq": n} 을 보내 n 번까지 처리했음을 누적 확인합니다.
+#     "window" 를 함께 보내면 송신 창 크기를 바꿀 수 있습니다.
+#   - 송신 창은 요소 메시지만 셉니다. 타입·키 테이블 같은 작은 메시지는 기다리지 않고 보냅니다.
+# ack 모드가 아니면 목표 바이트 크기로만 묶습니다.
+#
+# 첫 메시지는 FIRST_CHUNK_BYTES 로 작게 보내 서버가 바로 표시를 시작할 수 있게 하고,
+# 메시지마다 두 배씩 키워 목표 바이트 크기에 이릅니다. (batch_bytes)
+#
+import time
+
+
+CHUNK_TARGET_BYTES = 256 * 1024
+CHUNK_MIN_BYTES = 32 * 1024
+CHUNK_MAX_BYTES = 768 * 1024 # 서버 웹소켓의 기본 최대 메시지 크기(1 MiB)보다 작게 유지합니다.
+FIRST_CHUNK_BYTES = 16 * 1024
+ACK_WINDOW = 4
+ACK_WINDOW_MAX = 64
+ACK_TIMEOUT = 30.0
+TARGET_RTT = 0.25 # 이보다 충분히 빠르면 청크를 키우고, 많이 느리면 줄입니다.
+RTT_SMOOTHING = 0.125
+
+
+class FlowControl:
+    """목표 청크 바이트 크기와 ack 송신 창을 관리합니다. ack_window 가 None 이면 ack 를 기다리지 않습니다."""
+
+    def __init__(self, ack_window=None, target_bytes=CHUNK_TARGET_BYTES):
+        self.ack_window = ack_window
+        self.target_bytes = target_bytes
+        self.sent_at = {} # seq -> (보낸 시각, 바이트 수)
+        self.smoothed_rtt = None
+        self.acked_bytes = 0
+        self.sent_messages = 0
+
+    @property
+    def uses_ack(self):
+        return self.ack_window is not None
+
+    @property
+    def in_flight(self):
+        return len(self.sent_at)
+
+    @property
+    def batch_bytes(self):
+        """다음 요소 메시지를 보낼 바이트 크기. 처음에는 작게 시작해 메시지마다 두 배씩 target_bytes 까지 키웁니다."""
+        return min(self.target_bytes, FIRST_CHUNK_BYTES << min(self.sent_messages, 16))
+
+    def can_send(self):
+        """송신 창에 여유가 있으면 True."""
+        if not self.uses_ack or len(self.sent_at) < self.ack_window: return True
+        self.check_timeout()
+        return False
+
+    def check_timeout(self):
+        """가장 오래된 메시지가 ACK_TIMEOUT 동안 확인되지 않았으면 TimeoutError 를 발생시킵니다."""
+        if not self.sent_at: return
+        oldest = min(self.sent_at)
+        if time.perf_counter() - self.sent_at[oldest][0] > ACK_TIMEOUT:
+            raise TimeoutError(f"서버가 {ACK_TIMEOUT:.0f}초 동안 메시지 {oldest} 을(를) 확인하지 않았습니다.")
+
+    def on_send(self, seq, frame_bytes):
+        """요소 메시지를 보낼 때 호출합니다. ack 모드이면 payload 에 붙인 seq 를 등록합니다."""
+        self.sent_messages += 1
+        if not self.uses_ack: return
+        self.sent_at[seq] = (time.perf_counter(), frame_bytes)
+
+    def rearm(self):
+        """다시 연결해 확인되지 않은 메시지를 다시 보낼 때 호출합니다. 끊어져 있던 시간은 ack 시간 초과와 RTT 에 넣지 않습니다."""
+        now = time.perf_counter()
+        self.sent_at = {seq: (now, frame_bytes) for seq, (_, frame_bytes) in self.sent_at.items()}
+
+    def on_ack(self, seq, window=None):
+        """seq 번까지의 메시지를 확인 처리하고 RTT 에 맞춰 목표 청크 크기를 조정합니다."""
+        if window: self.ack_window = max(1, min(int(window), ACK_WINDOW_MAX))
+        sample = None
+        for acked_seq in [s for s in self.sent_at if s <= seq]:
+            sent_time, frame_bytes = self.sent_at.pop(acked_seq)
+            self.acked_bytes += frame_bytes
+            if acked_seq == seq: sample = time.perf_counter() - sent_time
+        if sample is None: return
+        self.smoothed_rtt = sample if self.smoothed_rtt is None else self.smoothed_rtt + RTT_SMOOTHING * (sample - self.smoothed_rtt)
+        if self.smoothed_rtt < TARGET_RTT / 2: self.target_bytes = min(int(self.target_bytes * 1.25), CHUNK_MAX_BYTES)
+        elif self.smoothed_rtt > TARGET_RTT * 2: self.target_bytes = max(self.target_bytes // 2, CHUNK_MIN_BYTES)
+
+    def stats(self):
+        rtt = f"{self.smoothed_rtt * 1000:.0f} ms" if self.smoothed_rtt is not None else "-"
+        return f"흐름 제어: 청크 목표 {self.target_bytes // 1024} KB, RTT {rtt}, 송신 창 {self.ack_window or '-'}"
@@ -0,0 +1,471 @@
+#
+# IFC 객체 데이터 추출 엔진
+#
+# bpy 에 의존하지 않으므로 블렌더 밖(벤치마크, 워커 프로세스)에서도 import 할 수 있습니다.
+#
+import hashlib
+import json
+
+
+# 요소 JSON 형식이 바뀌면 올립니다. 디스크 캐시 등 저장된 추출 결과의 무효화 기준으로 쓰입니다.
+EXTRACTOR_VERSION = 2
+
+SOURCE_FINGERPRINT_SIZE = 8 # 바이트
+
+# 수량 클래스별 값 속성 이름 (get_quantity_value 의 빠른 경로)
+QUANTITY_VALUE_ATTRIBUTES = {
+    "IfcQuantityArea": "AreaValue",
+    "IfcQuantityLength": "LengthValue",
+    "IfcQuantityVolume": "VolumeValue",
+    "IfcQuantityCount": "CountValue",
+    "IfcQuantityWeight": "WeightValue",
+}
+
+# IFC2X3 에서는 Decomposes 역참조가 IfcRelDecomposes 전체(Aggregates + Nests)를 가리킵니다.
+DECOMPOSES_RELATIONSHIPS = {"IFC2X3": ("IfcRelAggregates", "IfcRelNests")}
+
+
+def get_quantity_value(quantity):
+    if quantity.is_a("IfcQuantityArea"): return quantity.AreaValue
+    if quantity.is_a("IfcQuantityLength"): return quantity.LengthValue
+    if quantity.is_a("IfcQuantityVolume"): return quantity.VolumeValue
+    if quantity.is_a("IfcQuantityCount"): return quantity.CountValue
+    if quantity.is_a("IfcQuantityWeight"): return quantity.WeightValue
+    return None
+
+
+def _fast_quantity_value(quantity):
+    attribute = QUANTITY_VALUE_ATTRIBUTES.get(quantity.is_a())
+    if attribute: return getattr(quantity, attribute)
+    return get_quantity_value(quantity)
+
+
+def _object_label(obj):
+    """'IfcBuildingStorey: 1층' 형식의 라벨. 대상이 없으면 None 을 반환합니다."""
+    if obj is None: return None
+    return f"{obj.is_a()}: {obj.Name}"
+
+
+_MISSING = object()
+
+
+def _require_label(label):
+    # 기존 코드는 RelatingStructure/RelatingObject 가 비어 있으면 AttributeError 로 중단되었습니다.
+    if label is None: raise AttributeError("관계의 대상 객체가 없습니다.")
+    return label
+
+
+class RelationshipIndex:
+    """IfcRel* 관계를 by_type 으로 한 번만 순회하여 객체 step id 별 조회 맵을 구성합니다.
+
+    각 맵은 기존 역참조(IsDefinedBy, IsTypedBy, ContainedInStructure, Decomposes, Nests)와
+    같은 순서·같은 첫 번째 항목을 돌려주도록 만들어집니다.
+    """
+
+    def __init__(self, ifc_file, build=True):
+        self.ifc_file = ifc_file
+        self.property_definitions = {}  # step id -> [RelatingPropertyDefinition, ...]
+        self.relating_types = {}        # step id -> 첫 번째 IfcRelDefinesByType 의 RelatingType
+        self.spatial_containers = {}    # step id -> 컨테이너 라벨
+        self.aggregates = {}            # step id -> 상위 집합 객체 라벨
+        self.nests = {}                 # step id -> 상위 중첩 객체 라벨
+        if build:
+            for _ in self.iter_build(): pass
+
+    def iter_build(self):
+        """관계마다 None 을 생성하며 맵을 채웁니다. 시분할 실행 시 중간에 멈췄다가 이어갈 수 있습니다."""
+        ifc_file = self.ifc_file
+        property_definitions = self.property_definitions
+        for rel in ifc_file.by_type("IfcRelDefinesByProperties"):
+            definition = rel.RelatingPropertyDefinition
+            for obj in rel.RelatedObjects or ():
+                property_definitions.setdefault(obj.id(), []).append(definition)
+            yield
+
+        if ifc_file.schema != "IFC2X3":
+            for rel in ifc_file.by_type("IfcRelDefinesByType"):
+                relating_type = rel.RelatingType
+                for obj in rel.RelatedObjects or ():
+                    self.relating_types.setdefault(obj.id(), relating_type)
+                yield
+
+        yield from self._index_first(("IfcRelContainedInSpatialStructure",), "RelatedElements", "RelatingStructure", self.spatial_containers)
+        decomposes = DECOMPOSES_RELATIONSHIPS.get(ifc_file.schema, ("IfcRelAggregates",))
+        yield from self._index_first(decomposes, "RelatedObjects", "RelatingObject", self.aggregates)
+        if "IfcRelNests" not in decomposes:
+            yield from self._index_first(("IfcRelNests",), "RelatedObjects", "RelatingObject", self.nests)
+
+    def _index_first(self, rel_types, related_attribute, relating_attribute, target):
+        # 관계 유형은 rel_types 순서대로 봅니다. (IFC2X3 에서 IfcRelAggregates 가 IfcRelNests 보다 먼저)
+        for rel in (rel for rel_type in rel_types for rel in self.ifc_file.by_type(rel_type)):
+            label = _object_label(getattr(rel, relating_attribute))
+            for obj in getattr(rel, related_attribute) or ():
+                target.setdefault(obj.id(), label)
+            yield
+
+
+class _InverseLookup:
+    """RelationshipIndex 의 맵과 같은 get() 인터페이스를 요소 역참조로 구현합니다."""
+    __slots__ = ("ifc_file", "resolve")
+
+    def __init__(self, ifc_file, resolve):
+        self.ifc_file = ifc_file
+        self.resolve = resolve
+
+    def get(self, step_id, default=None):
+        return self.resolve(self.ifc_file.by_id(step_id), default)
+
+
+def _inverse_property_definitions(element, default):
+    definitions = [rel.RelatingPropertyDefinition for rel in element.IsDefinedBy if rel.is_a("IfcRelDefinesByProperties")]
+    return definitions or default
+
+
+def _inverse_relating_type(element, default):
+    return element.IsTypedBy[0].RelatingType if element.IsTypedBy else default
+
+
+def _inverse_label(attribute, relating_attribute):
+    def resolve(element, default):
+        rels = getattr(element, attribute)
+        return _object_label(getattr(rels[0], relating_attribute)) if rels else default
+    return resolve
+
+
+class InverseRelationshipIndex:
+    """관계 인덱스를 만들기 전에 소수의 요소를 역참조로 바로 처리할 때 쓰는 RelationshipIndex 대체 구현."""
+
+    def __init__(self, ifc_file):
+        self.property_definitions = _InverseLookup(ifc_file, _inverse_property_definitions)
+        self.relating_types = _InverseLookup(ifc_file, _inverse_relating_type)
+        self.spatial_containers = _InverseLookup(ifc_file, _inverse_label("ContainedInStructure", "RelatingStructure"))
+        self.aggregates = _InverseLookup(ifc_file, _inverse_label("Decomposes", "RelatingObject"))
+        self.nests = _InverseLookup(ifc_file, _inverse_label("Nests", "RelatingObject"))
+
+
+class _ClassTraits:
+    __slots__ = ("is_spatial", "defined_by", "typed_by", "contained", "decomposes", "nests")
+
+    def __init__(self, element):
+        try: inverses = set(element.wrapped_data.get_inverse_attribute_names())
+        except AttributeError:
+            inverses = {name for name in ("IsDefinedBy", "IsTypedBy", "ContainedInStructure", "Decomposes", "Nests") if hasattr(element, name)}
+        self.is_spatial = element.is_a("IfcSpatialStructureElement")
+        self.defined_by = "IsDefinedBy" in inverses
+        self.typed_by = "IsTypedBy" in inverses
+        self.contained = "ContainedInStructure" in inverses
+        self.decomposes = "Decomposes" in inverses
+        self.nests = "Nests" in inverses
+
+
+PROPERTY_SET = "pset"
+QUANTITY_SET = "qto"
+
+
+def flatten_property_set(prop_set):
+    """IfcPropertySet 의 단일 값 속성을 '{pset}__{prop}' 키의 딕셔너리로 펼칩니다."""
+    values = {}
+    properties = prop_set.HasProperties
+    if properties:
+        set_name = prop_set.Name
+        for prop in properties:
+            if prop.is_a("IfcPropertySingleValue"):
+                nominal_value = prop.NominalValue
+                values[f"{set_name}__{prop.Name}"] = nominal_value.wrappedValue if nominal_value else None
+    return values
+
+
+def flatten_quantity_set(prop_set):
+    """IfcElementQuantity 의 수량 값을 '{qto}__{quantity}' 키의 딕셔너리로 펼칩니다."""
+    values = {}
+    quantities = prop_set.Quantities
+    if quantities:
+        set_name = prop_set.Name
+        for quantity in quantities:
+            prop_value = _fast_quantity_value(quantity)
+            if prop_value is not None:
+                values[f"{set_name}__{quantity.Name}"] = prop_value
+    return values
+
+
+class CacheStats:
+    """캐시 적중/미스 횟수를 집계합니다."""
+
+    def __init__(self, name):
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def lookups(self):
+        return self.hits + self.misses
+
+    @property
+    def hit_rate(self):
+        return self.hits / self.lookups if self.lookups else 0.0
+
+    def as_dict(self):
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": round(self.hit_rate, 4)}
+
+    def __str__(self):
+        return f"{self.name}: 조회 {self.lookups}회, 적중 {self.hits}회, 미스 {self.misses}회 (적중률 {self.hit_rate:.1%})"
+
+
+class PropertySetCache:
+    """속성 세트/수량 세트 step id 별로 펼친 키/값 딕셔너리를 저장하는 추출 단위 캐시.
+
+    하나의 IfcPropertySet 이 여러 RelatedObjects 에 연결된 경우 한 번만 펼칩니다.
+    반환된 딕셔너리는 공유되므로 호출 측에서 수정하면 안 됩니다.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self.stats = CacheStats("속성 세트 캐시")
+
+    def lookup(self, prop_set):
+        """(종류, 값 딕셔너리) 를 반환합니다. 종류는 PROPERTY_SET, QUANTITY_SET 또는 None 입니다."""
+        step_id = prop_set.id()
+        entry = self._entries.get(step_id)
+        if entry is not None:
+            self.stats.hits += 1
+            return entry
+        self.stats.misses += 1
+        if prop_set.is_a("IfcPropertySet"): entry = (PROPERTY_SET, flatten_property_set(prop_set))
+        elif prop_set.is_a("IfcElementQuantity"): entry = (QUANTITY_SET, flatten_quantity_set(prop_set))
+        else: entry = (None, None)
+        self._entries[step_id] = entry
+        return entry
+
+
+class TypeParameterCache:
+    """IfcTypeObject step id 별로 (step id, 이름, 펼친 타입 파라미터) 를 저장하는 추출 단위 캐시."""
+
+    def __init__(self, property_sets):
+        self.property_sets = property_sets
+        self._entries = {}
+        self.stats = CacheStats("타입 파라미터 캐시")
+
+    def lookup(self, relating_type):
+        step_id = relating_type.id()
+        entry = self._entries.get(step_id)
+        if entry is not None:
+            self.stats.hits += 1
+            return entry
+        self.stats.misses += 1
+        values = {}
+        property_sets = relating_type.HasPropertySets
+        if property_sets:
+            for prop_set in property_sets:
+                if prop_set:
+                    kind, set_values = self.property_sets.lookup(prop_set)
+                    if kind == PROPERTY_SET: values.update(set_values)
+        entry = self._entries[step_id] = (step_id, relating_type.Name, values)
+        return entry
+
+
+class ElementExtractor:
+    """관계 인덱스를 이용해 IfcProduct 별 요소 딕셔너리를 만듭니다.
+
+    출력은 기존 serialize_ifc_elements_to_string_list 와 바이트 단위로 동일합니다.
+    type_table=True 이면 요소에는 TypeParameters 대신 RelatingTypeId 만 담고,
+    타입 정보는 take_new_types() 로 한 번씩만 가져갑니다.
+    """
+
+    def __init__(self, ifc_file, type_table=False, source_fingerprints=False):
+        self.ifc_file = ifc_file
+        self.type_table = type_table
+        self.source_fingerprints = source_fingerprints # True 이면 iter_json_chunks 가 청크 요소의 원본 지문도 chunk_fingerprints 에 남깁니다.
+        self._index = None  # 관계 인덱스는 처음 필요할 때 만듭니다.
+        self.property_sets = PropertySetCache()
+        self.type_parameters = TypeParameterCache(self.property_sets)
+        self._traits = {}
+        self._sent_types = set()
+        self._new_types = {}
+        self.chunk_keys = []
+        self.chunk_fingerprints = None
+        self._entity_hashes = {}
+
+    def products(self):
+        return self.ifc_file.by_type("IfcProduct")
+
+    def _class_traits(self, element):
+        ifc_class = element.is_a()
+        traits = self._traits.get(ifc_class)
+        if traits is None:
+            traits = self._traits[ifc_class] = _ClassTraits(element)
+        return ifc_class, traits
+
+    @property
+    def index(self):
+        if self._index is None: self._index = RelationshipIndex(self.ifc_file)
+        return self._index
+
+    def build_element_dict(self, element, index=None):
+        ifc_class, traits = self._class_traits(element)
+        element_id = element.id()
+        index = index or self.index
+        type_id = None
+        element_dict = { "Name": element.Name or "이름 없음", "IfcClass": ifc_class, "ElementId": element_id, "UniqueId": element.GlobalId, "Parameters": {}, "TypeParameters": {}, "RelatingType": None, "SpatialContainer": None, "Aggregates": None, "Nests": None, }
+        parameters = element_dict["Parameters"]
+        try:
+            definitions = index.property_definitions.get(element_id) if traits.defined_by else None
+            quantity_sets = []
+            if definitions:
+                lookup = self.property_sets.lookup
+                for prop_set in definitions:
+                    if not prop_set: continue
+                    kind, set_values = lookup(prop_set)
+                    if kind == PROPERTY_SET: parameters.update(set_values)
+                    elif kind == QUANTITY_SET: quantity_sets.append(set_values)
+            if not traits.is_spatial:
+                for set_values in quantity_sets:
+                    parameters.update(set_values)
+                relating_type = index.relating_types.get(element_id) if traits.typed_by else None
+                if relating_type:
+                    type_id, type_name, type_parameters = self.type_parameters.lookup(relating_type)
+                    element_dict["RelatingType"] = type_name
+                    if self.type_table: self._referenced_type(type_id, relating_type, type_name, type_parameters)
+                    else: element_dict["TypeParameters"].update(type_parameters)
+                label = index.spatial_containers.get(element_id, _MISSING) if traits.contained else _MISSING
+                if label is not _MISSING: element_dict["SpatialContainer"] = _require_label(label)
+            label = index.aggregates.get(element_id, _MISSING) if traits.decomposes else _MISSING
+            if label is not _MISSING: element_dict["Aggregates"] = _require_label(label)
+            label = index.nests.get(element_id, _MISSING) if traits.nests else _MISSING
+            if label is not _MISSING: element_dict["Nests"] = _require_label(label)
+        except (AttributeError, IndexError, TypeError): pass
+        if self.type_table:
+            del element_dict["TypeParameters"]
+            element_dict["RelatingTypeId"] = type_id
+        return element_dict
+
+    def source_fingerprint(self, element, index=None):
+        """요소 JSON 을 결정하는 원본(요소, 속성·수량 세트, 타입, 공간·집합 관계 라벨)의 해시.
+
+        지문이 같으면 추출 결과도 같으므로, IFC 파일이 바뀌었을 때 이전 추출 결과를 다시 쓸 수 있는지 판단하는 데 씁니다.
+        엔티티의 STEP 문자열을 그대로 해시하므로 결과에 쓰이지 않는 속성(배치 등)이 바뀌어도 달라질 수 있습니다.
+        """
+        _, traits = self._class_traits(element)
+        element_id = element.id()
+        index = index or self.index
+        parts = [str(element)]
+        definitions = index.property_definitions.get(element_id) if traits.defined_by else None
+        for prop_set in definitions or (): parts.append(self._entity_hash(prop_set))
+        if not traits.is_spatial:
+            relating_type = index.relating_types.get(element_id) if traits.typed_by else None
+            if relating_type: parts.append(self._entity_hash(relating_type))
+            if traits.contained: parts.append(str(index.spatial_containers.get(element_id, "\0")))
+        if traits.decomposes: parts.append(str(index.aggregates.get(element_id, "\0")))
+        if traits.nests: parts.append(str(index.nests.get(element_id, "\0")))
+        return hashlib.blake2b("\n".join(parts).encode("utf-8"), digest_size=SOURCE_FINGERPRINT_SIZE).hexdigest()
+
+    def _entity_hash(self, entity):
+        """속성·수량 세트나 타입 객체와 그 하위 속성·수량·속성 세트의 STEP 문자열 해시. step id 별로 한 번만 계산합니다."""
+        if not entity: return "-"
+        step_id = entity.id()
+        entity_hash = self._entity_hashes.get(step_id)
+        if entity_hash is None:
+            digest = hashlib.blake2b(str(entity).encode("utf-8"), digest_size=SOURCE_FINGERPRINT_SIZE)
+            for attribute in ("HasProperties", "Quantities"):
+                for child in getattr(entity, attribute, None) or (): digest.update(str(child).encode("utf-8"))
+            for prop_set in getattr(entity, "HasPropertySets", None) or (): digest.update(self._entity_hash(prop_set).encode("ascii"))
+            entity_hash = self._entity_hashes[step_id] = digest.hexdigest()
+        return entity_hash
+
+    def _referenced_type(self, type_id, relating_type, type_name, type_parameters):
+        if type_id in self._sent_types: return
+        self._sent_types.add(type_id)
+        self._new_types[str(type_id)] = {"Name": type_name, "IfcClass": relating_type.is_a(), "TypeParameters": type_parameters}
+
+    def take_new_types(self):
+        """마지막 호출 이후 처음 참조된 타입들의 테이블(step id 문자열 -> 타입 정보)을 반환합니다."""
+        new_types, self._new_types = self._new_types, {}
+        return new_types
+
+    def iter_index_build(self):
+        """관계 인덱스를 조금씩 만들며 None 을 생성합니다. 이미 만들어져 있으면 아무것도 하지 않습니다."""
+        if self._index is not None: return
+        index = RelationshipIndex(self.ifc_file, build=False)
+        yield from index.iter_build()
+        self._index = index
+
+    def iter_element_dicts(self, products=None, direct_count=0, cooperative=False):
+        """요소 딕셔너리를 순서대로 생성합니다.
+
+        관계 인덱스가 아직 없으면 처음 direct_count 개 요소는 인덱스를 만들지 않고 역참조로 바로 만들어,
+        모델 크기와 상관없이 첫 결과가 빨리 나오도록 합니다.
+        cooperative=True 이면 인덱스 구축 중에도 None 을 생성해 호출 측이 중간에 제어를 돌려받을 수 있습니다.
+        """
+        for item in self._iter_products(products, direct_count, cooperative):
+            yield None if item is None else self.build_element_dict(*item)
+
+    def _iter_products(self, products, direct_count, cooperative):
+        """iter_element_dicts 의 요소 순회: (요소, 쓸 관계 인덱스 또는 None) 또는 인덱스 구축 중의 None 을 생성합니다."""
+        direct_index = InverseRelationshipIndex(self.ifc_file) if direct_count and self._index is None else None
+        if cooperative and direct_index is None: yield from self.iter_index_build()
+        for element in self.products() if products is None else products:
+            if not element.GlobalId: continue
+            if direct_index is not None:
+                if direct_count <= 0:
+                    direct_index = None
+                    if cooperative: yield from self.iter_index_build()
+                direct_count -= 1
+            yield element, direct_index
+
+    def iter_json_chunks(self, products=None, chunk_size=100, cooperative=False):
+        """요소 JSON 문자열을 chunk_size 개씩 묶어 순서대로 생성합니다. 전체 결과를 메모리에 모으지 않습니다.
+
+        첫 청크는 관계 인덱스를 만들기 전에 역참조로 만들어 바로 내보냅니다.
+        cooperative=True 이면 요소·관계 하나를 처리할 때마다 None 을 함께 생성합니다.
+        마지막으로 생성한 청크의 (GlobalId, RelatingTypeId) 목록은 chunk_keys 에,
+        source_fingerprints 이면 요소별 원본 지문 목록은 chunk_fingerprints 에 남습니다.
+        """
+        chunk, keys, fingerprints = [], [], []
+        for item in self._iter_products(products, chunk_size, cooperative):
+            if item is None:
+                yield None
+                continue
+            element_dict = self.build_element_dict(*item)
+            chunk.append(json.dumps(element_dict))
+            keys.append((element_dict["UniqueId"], element_dict.get("RelatingTypeId")))
+            if self.source_fingerprints: fingerprints.append(self.source_fingerprint(*item))
+            if len(chunk) >= chunk_size:
+                self.chunk_keys, self.chunk_fingerprints = keys, fingerprints if self.source_fingerprints else None
+                yield chunk
+                chunk, keys, fingerprints = [], [], []
+            elif cooperative:
+                yield None
+        if chunk:
+            self.chunk_keys, self.chunk_fingerprints = keys, fingerprints if self.source_fingerprints else None
+            yield chunk
+
+    def iter_quantity_rows(self, products=None, cooperative=False):
+        """(GlobalId, {'{qto}__{quantity}': 값}) 을 순서대로 생성합니다. 값은 build_element_dict 의 Parameters 에 들어가는 수량 값과 같습니다.
+
+        cooperative=True 이면 인덱스 구축 중과 요소마다 None 을 함께 생성합니다.
+        """
+        if cooperative: yield from self.iter_index_build()
+        index = self.index
+        lookup = self.property_sets.lookup
+        for element in self.products() if products is None else products:
+            if not element.GlobalId: continue
+            _, traits = self._class_traits(element)
+            quantities = {}
+            definitions = index.property_definitions.get(element.id()) if traits.defined_by and not traits.is_spatial else None
+            for prop_set in definitions or ():
+                if not prop_set: continue
+                try: kind, set_values = lookup(prop_set)
+                except (AttributeError, IndexError, TypeError): break
+                if kind == QUANTITY_SET: quantities.update(set_values)
+            yield element.GlobalId, quantities
+            if cooperative: yield None
+
+
+def serialize_ifc_elements_to_string_list(ifc_file, extractor=None):
+    extractor = extractor or ElementExtractor(ifc_file)
+    products = extractor.products()
+    print(f"🔍 [Blender] {len(products)}개의 IFC 객체 데이터 직렬화를 시작합니다.") # 디버깅 추가
+    elements_data = [json.dumps(element_dict) for element_dict in extractor.iter_element_dicts(products)]
+    print(f"✅ [Blender] 객체 데이터 직렬화 완료.") # 디버깅 추가
+    print(f"📊 [Blender] {extractor.property_sets.stats}")
+    print(f"📊 [Blender] {extractor.type_parameters.stats}")
+    return elements_data
@@ -0,0 +1,70 @@
+#
+# IFC 모델 제공자
+#
+# 명령마다 ifcopenshell.open 으로 파일을 다시 읽지 않도록,
+# 1) Bonsai(구 BlenderBIM)가 메모리에 올려 둔 IFC 파일을 우선 재사용하고
+# 2) 없으면 경로·수정 시각·크기가 같은 동안 한 번 연 ifcopenshell.file 을 캐시해 재사용합니다.
+#
+import os
+
+import ifcopenshell
+
+
+# Bonsai 와 이전 이름인 BlenderBIM 의 IfcStore 모듈 경로
+IFC_STORE_MODULES = ("bonsai.bim.ifc", "blenderbim.bim.ifc")
+
+
+def _normalize_path(path):
+    return os.path.normcase(os.path.abspath(path)) if path else ""
+
+
+def get_ifc_store():
+    """설치된 Bonsai/BlenderBIM 의 IfcStore 클래스를 반환합니다. 없으면 None."""
+    for module_name in IFC_STORE_MODULES:
+        try:
+            module = __import__(module_name, fromlist=["IfcStore"])
+            return module.IfcStore
+        except (ImportError, AttributeError):
+            continue
+    return None
+
+
+def file_signature(path):
+    """캐시 무효화 판단에 쓰는 (정규화 경로, mtime_ns, 크기) 튜플."""
+    stat = os.stat(path)
+    return (_normalize_path(path), stat.st_mtime_ns, stat.st_size)
+
+
+class IfcModelProvider:
+    """IFC 모델을 재사용해 제공합니다. 블렌더 메인 스레드에서만 호출해야 합니다."""
+
+    def __init__(self):
+        self._cached_file = None
+        self._cached_signature = None
+
+    def get_live_file(self, path=None):
+        """Bonsai 가 메모리에 올려 둔 파일을 반환합니다. 경로가 주어지면 같은 파일일 때만 반환합니다."""
+        ifc_store = get_ifc_store()
+        if ifc_store is None: return None
+        try: live_file = ifc_store.get_file()
+        except Exception: return None
+        if live_file is None: return None
+        live_path = getattr(ifc_store, "path", "") or ""
+        if path and live_path and _normalize_path(live_path) != _normalize_path(path): return None
+        return live_file
+
+    def get_file(self, path):
+        """(ifc_file, 출처) 를 반환합니다. 출처는 "live", "cache", "disk" 중 하나입니다."""
+        live_file = self.get_live_file(path)
+        if live_file is not None: return live_file, "live"
+        signature = file_signature(path)
+        if self._cached_file is not None and self._cached_signature == signature:
+            return self._cached_file, "cache"
+        self.invalidate()
+        self._cached_file = ifcopenshell.open(path)
+        self._cached_signature = signature
+        return self._cached_file, "disk"
+
+    def invalidate(self):
+        self._cached_file = None
+        self._cached_signature = None
@@ -0,0 +1,181 @@
+#
+# 순수 파이썬 MessagePack 코덱 (애드온 전송용 최소 구현)
+#
+# 블렌더 번들 파이썬에 C 확장을 설치하지 않고 쓸 수 있도록 표준 라이브러리만 사용합니다.
+# nil / bool / int(64비트) / float / str / bin / array / map 을 지원하며, 서버의 msgpack 패키지와 호환됩니다.
+# ext 형식은 지원하지 않습니다.
+#
+#   packb(obj) -> bytes
+#   unpackb(data) -> obj
+#
+import struct
+
+__all__ = ["packb", "unpackb", "PackError", "UnpackError"]
+
+
+class PackError(TypeError):
+    pass
+
+
+class UnpackError(ValueError):
+    pass
+
+
+_FIXINT = [bytes([n]) for n in range(128)]
+_NEG_FIXINT = [bytes([n & 0xFF]) for n in range(-32, 0)]
+_FIXSTR = [bytes([0xA0 | n]) for n in range(32)]
+_FIXARRAY = [bytes([0x90 | n]) for n in range(16)]
+_FIXMAP = [bytes([0x80 | n]) for n in range(16)]
+_NIL, _FALSE, _TRUE = b"\xc0", b"\xc2", b"\xc3"
+
+_pack_float = struct.Struct(">Bd").pack
+_pack_u8 = struct.Struct(">BB").pack
+_pack_u16 = struct.Struct(">BH").pack
+_pack_u32 = struct.Struct(">BI").pack
+_pack_u64 = struct.Struct(">BQ").pack
+_pack_i8 = struct.Struct(">Bb").pack
+_pack_i16 = struct.Struct(">Bh").pack
+_pack_i32 = struct.Struct(">Bi").pack
+_pack_i64 = struct.Struct(">Bq").pack
+
+
+def _pack_int(value):
+    if value >= 0:
+        if value < 128: return _FIXINT[value]
+        if value <= 0xFF: return _pack_u8(0xCC, value)
+        if value <= 0xFFFF: return _pack_u16(0xCD, value)
+        if value <= 0xFFFFFFFF: return _pack_u32(0xCE, value)
+        if value <= 0xFFFFFFFFFFFFFFFF: return _pack_u64(0xCF, value)
+    else:
+        if value >= -32: return _NEG_FIXINT[value + 32]
+        if value >= -0x80: return _pack_i8(0xD0, value)
+        if value >= -0x8000: return _pack_i16(0xD1, value)
+        if value >= -0x80000000: return _pack_i32(0xD2, value)
+        if value >= -0x8000000000000000: return _pack_i64(0xD3, value)
+    raise PackError(f"64비트 범위를 벗어난 정수입니다: {value}")
+
+
+def _header(size, fixed, code8, code16, code32):
+    if fixed is not None and size < len(fixed): return fixed[size]
+    if code8 is not None and size <= 0xFF: return _pack_u8(code8, size)
+    if size <= 0xFFFF: return _pack_u16(code16, size)
+    if size <= 0xFFFFFFFF: return _pack_u32(code32, size)
+    raise PackError(f"너무 큰 객체입니다: {size}")
+
+
+def _pack(obj, append):
+    # 가장 흔한 타입부터 검사합니다. bool 은 int 의 하위 클래스이므로 type() 으로 구분합니다.
+    obj_type = type(obj)
+    if obj_type is str:
+        data = obj.encode("utf-8")
+        size = len(data)
+        append(_FIXSTR[size] if size < 32 else _header(size, None, 0xD9, 0xDA, 0xDB))
+        append(data)
+    elif obj_type is float: append(_pack_float(0xCB, obj))
+    elif obj_type is int: append(_pack_int(obj))
+    elif obj is None: append(_NIL)
+    elif obj is True: append(_TRUE)
+    elif obj is False: append(_FALSE)
+    elif obj_type is dict:
+        size = len(obj)
+        append(_FIXMAP[size] if size < 16 else _header(size, None, None, 0xDE, 0xDF))
+        for key, value in obj.items():
+            _pack(key, append)
+            _pack(value, append)
+    elif obj_type is list or obj_type is tuple:
+        size = len(obj)
+        append(_FIXARRAY[size] if size < 16 else _header(size, None, None, 0xDC, 0xDD))
+        for value in obj: _pack(value, append)
+    elif obj_type is bytes or obj_type is bytearray or obj_type is memoryview:
+        data = bytes(obj)
+        append(_header(len(data), None, 0xC4, 0xC5, 0xC6))
+        append(data)
+    elif isinstance(obj, int): append(_pack_int(int(obj)))
+    elif isinstance(obj, float): append(_pack_float(0xCB, float(obj)))
+    elif isinstance(obj, str): _pack(str(obj), append)
+    elif isinstance(obj, dict): _pack(dict(obj), append)
+    elif isinstance(obj, (list, tuple)): _pack(list(obj), append)
+    else: raise PackError(f"MessagePack 으로 인코딩할 수 없는 타입입니다: {obj_type.__name__}")
+
+
+def packb(obj):
+    parts = []
+    _pack(obj, parts.append)
+    return b"".join(parts)
+
+
+_unpack_u16 = struct.Struct(">H").unpack_from
+_unpack_u32 = struct.Struct(">I").unpack_from
+_unpack_u64 = struct.Struct(">Q").unpack_from
+_unpack_i8 = struct.Struct(">b").unpack_from
+_unpack_i16 = struct.Struct(">h").unpack_from
+_unpack_i32 = struct.Struct(">i").unpack_from
+_unpack_i64 = struct.Struct(">q").unpack_from
+_unpack_f32 = struct.Struct(">f").unpack_from
+_unpack_f64 = struct.Struct(">d").unpack_from
+
+# 고정 길이 헤더 뒤의 길이 필드: 코드 -> (읽는 함수, 길이 필드 바이트 수)
+_SIZED = {
+    0xC4: (None, 1), 0xC5: (_unpack_u16, 2), 0xC6: (_unpack_u32, 4),  # bin
+    0xD9: (None, 1), 0xDA: (_unpack_u16, 2), 0xDB: (_unpack_u32, 4),  # str
+    0xDC: (_unpack_u16, 2), 0xDD: (_unpack_u32, 4),                    # array
+    0xDE: (_unpack_u16, 2), 0xDF: (_unpack_u32, 4),                    # map
+}
+_SCALARS = {
+    0xCA: (_unpack_f32, 4), 0xCB: (_unpack_f64, 8),
+    0xCD: (_unpack_u16, 2), 0xCE: (_unpack_u32, 4), 0xCF: (_unpack_u64, 8),
+    0xD0: (_unpack_i8, 1), 0xD1: (_unpack_i16, 2), 0xD2: (_unpack_i32, 4), 0xD3: (_unpack_i64, 8),
+}
+
+
+def _unpack(data, position):
+    code = data[position]
+    position += 1
+    if code <= 0x7F: return code, position
+    if code >= 0xE0: return code - 0x100, position
+    if 0xA0 <= code <= 0xBF:
+        end = position + (code & 0x1F)
+        return data[position:end].decode("utf-8"), end
+    if 0x90 <= code <= 0x9F: return _unpack_array(data, position, code & 0x0F)
+    if 0x80 <= code <= 0x8F: return _unpack_map(data, position, code & 0x0F)
+    if code == 0xC0: return None, position
+    if code == 0xC2: return False, position
+    if code == 0xC3: return True, position
+    if code == 0xCC: return data[position], position + 1
+    scalar = _SCALARS.get(code)
+    if scalar: return scalar[0](data, position)[0], position + scalar[1]
+    sized = _SIZED.get(code)
+    if sized is None: raise UnpackError(f"지원하지 않는 MessagePack 형식입니다: 0x{code:02x}")
+    read, width = sized
+    size = data[position] if read is None else read(data, position)[0]
+    position += width
+    if code <= 0xC6: return bytes(data[position:position + size]), position + size
+    if code <= 0xDB: return data[position:position + size].decode("utf-8"), position + size
+    if code <= 0xDD: return _unpack_array(data, position, size)
+    return _unpack_map(data, position, size)
+
+
+def _unpack_array(data, position, size):
+    items = []
+    append = items.append
+    for _ in range(size):
+        value, position = _unpack(data, position)
+        append(value)
+    return items, position
+
+
+def _unpack_map(data, position, size):
+    result = {}
+    for _ in range(size):
+        key, position = _unpack(data, position)
+        value, position = _unpack(data, position)
+        result[key] = value
+    return result, position
+
+
+def unpackb(data):
+    if isinstance(data, memoryview): data = data.tobytes()
+    try: value, position = _unpack(data, 0)
+    except (IndexError, struct.error) as e: raise UnpackError(f"MessagePack 데이터가 잘렸습니다: {e}") from None
+    if position != len(data): raise UnpackError(f"MessagePack 데이터 뒤에 {len(data) - position}바이트가 더 있습니다.")
+    return value
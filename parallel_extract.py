@@ -0,0 +1,172 @@
+#
+# 다중 프로세스 IFC 추출
+#
+# 작업자 프로세스 N 개가 각자 IFC 파일을 열어 청크 번호 기준으로 나눈 샤드(청크 i % N == k)를 직렬화하고,
+# 결과를 표준 출력으로 스트리밍합니다. 부모는 청크 순서대로 병합하므로 결과는 단일 프로세스와 같습니다.
+#
+# 작업자는 bpy 없이 실행됩니다:  python parallel_extract.py <ifc 경로> <샤드 번호> <샤드 수> <청크 크기> [--type-table] [--fingerprints]
+#
+# 작업자 출력 형식 (한 줄 = 한 레코드)
+#   {...}       요소 JSON (serialize_ifc_elements_to_string_list 의 항목과 동일)
+#   T{...}      이 청크에서 처음 참조된 타입 테이블
+#   K[...]      청크 요소들의 [GlobalId, RelatingTypeId] 목록 (디스크 캐시 저장용)
+#   F[...]      청크 요소들의 원본 지문 목록 (--fingerprints 일 때, 디스크 캐시 저장용)
+#   (빈 줄)     청크 끝
+#
+import json
+import os
+import queue
+import subprocess
+import sys
+import tempfile
+import threading
+
+
+CHUNK_QUEUE_SIZE = 4 # 작업자별로 미리 읽어 둘 수 있는 최대 청크 수
+READER_PUT_INTERVAL = 0.1 # 큐가 가득 찼을 때 읽기 스레드가 중단 요청을 확인하는 간격(초)
+_END = object()
+
+
+def worker_environment():
+    """작업자가 부모와 같은 경로에서 ifcopenshell 을 찾도록 sys.path 를 PYTHONPATH 로 넘깁니다."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(path for path in sys.path if path)
+    return env
+
+
+def python_executable():
+    # 블렌더 안에서 sys.executable 은 번들 파이썬 인터프리터입니다.
+    return sys.executable
+
+
+class WorkerError(RuntimeError):
+    pass
+
+
+class _Worker:
+    def __init__(self, ifc_path, shard_index, shard_count, chunk_size, type_table, source_fingerprints):
+        command = [python_executable(), os.path.abspath(__file__), ifc_path, str(shard_index), str(shard_count), str(chunk_size)]
+        if type_table: command.append("--type-table")
+        if source_fingerprints: command.append("--fingerprints")
+        # stderr 를 파이프로 받으면 아무도 읽지 않을 때 작업자가 멈출 수 있으므로 임시 파일로 받습니다.
+        self.stderr = tempfile.TemporaryFile(mode="w+", encoding="utf-8")
+        self.process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=self.stderr, env=worker_environment(), text=True, encoding="utf-8", bufsize=1 << 20)
+        self.chunks = queue.Queue(maxsize=CHUNK_QUEUE_SIZE)
+        self.stopped = threading.Event() # close 가 설정합니다. 읽기 스레드는 가득 찬 큐에서 기다리지 않고 끝납니다.
+        self.reader = threading.Thread(target=self._read, daemon=True)
+        self.reader.start()
+
+    def _put(self, item):
+        """큐에 자리가 날 때까지 기다렸다가 넣습니다. 그 사이 close 가 호출되면 넣지 않고 False."""
+        while not self.stopped.is_set():
+            try:
+                self.chunks.put(item, timeout=READER_PUT_INTERVAL)
+                return True
+            except queue.Full: pass
+        return False
+
+    def _read(self):
+        elements, types, keys, fingerprints = [], {}, [], None
+        try:
+            for line in self.process.stdout:
+                line = line.rstrip("\n")
+                if not line:
+                    if not self._put((elements, types, keys, fingerprints)): return
+                    elements, types, keys, fingerprints = [], {}, [], None
+                elif line[0] == "T": types.update(json.loads(line[1:]))
+                elif line[0] == "K": keys = [tuple(key) for key in json.loads(line[1:])]
+                elif line[0] == "F": fingerprints = json.loads(line[1:])
+                else: elements.append(line)
+        finally:
+            self._put(_END)
+
+    def error(self):
+        return_code = self.process.wait()
+        if return_code == 0: return None
+        self.stderr.seek(0)
+        return WorkerError(f"추출 작업자가 오류로 종료되었습니다 (코드 {return_code}): {self.stderr.read().strip()[-500:]}")
+
+    def _drain(self):
+        try:
+            while True: self.chunks.get_nowait()
+        except queue.Empty: pass
+
+    def close(self):
+        """작업자를 끝내고 읽기 스레드가 끝날 때까지 기다립니다. 취소된 추출의 읽어 둔 청크도 버립니다."""
+        self.stopped.set()
+        if self.process.poll() is None: self.process.kill()
+        self.process.wait()
+        self._drain() # 가득 찬 큐에서 기다리던 읽기 스레드를 바로 깨웁니다.
+        self.reader.join()
+        self._drain()
+        self.process.stdout.close()
+        self.stderr.close()
+
+
+class ParallelExtraction:
+    """작업자 프로세스들의 출력을 청크 순서대로 병합해 (요소 JSON 목록, 새 타입 테이블) 을 내보냅니다."""
+
+    def __init__(self, ifc_path, worker_count, chunk_size=100, type_table=False, source_fingerprints=False):
+        self.worker_count = worker_count
+        self.workers = [_Worker(ifc_path, k, worker_count, chunk_size, type_table, source_fingerprints) for k in range(worker_count)]
+        self.next_chunk_index = 0
+        self.finished = False
+        self.chunk_keys = []
+        self.chunk_fingerprints = None
+        self._sent_types = set()
+
+    def next_chunk(self, block=True, timeout=None):
+        """다음 청크를 반환합니다. block=False 이고 아직 준비되지 않았으면 None, 끝났으면 StopIteration 을 발생시킵니다.
+
+        반환한 청크의 (GlobalId, RelatingTypeId) 목록은 chunk_keys 에, 원본 지문 목록은 chunk_fingerprints 에 남습니다.
+        """
+        if self.finished: raise StopIteration
+        worker = self.workers[self.next_chunk_index % self.worker_count]
+        try: item = worker.chunks.get(block=block, timeout=timeout)
+        except queue.Empty: return None
+        if item is _END:
+            self.finished = True
+            for other in self.workers:
+                error = other.error() if other is worker or other.process.poll() is not None else None
+                if error: raise error
+            self.close()
+            raise StopIteration
+        self.next_chunk_index += 1
+        elements, types, self.chunk_keys, self.chunk_fingerprints = item
+        new_types = {type_id: info for type_id, info in types.items() if type_id not in self._sent_types}
+        self._sent_types.update(new_types)
+        return elements, new_types
+
+    def __iter__(self):
+        while True:
+            try: yield self.next_chunk()
+            except StopIteration: return
+
+    def close(self):
+        for worker in self.workers: worker.close()
+
+
+def run_worker(ifc_path, shard_index, shard_count, chunk_size, type_table, source_fingerprints=False):
+    import ifcopenshell
+    from ifc_extractor import ElementExtractor
+
+    ifc_file = ifcopenshell.open(ifc_path)
+    extractor = ElementExtractor(ifc_file, type_table=type_table)
+    products = [element for element in extractor.products() if element.GlobalId]
+    write = sys.stdout.write
+    for chunk_index in range(shard_index, (len(products) + chunk_size - 1) // chunk_size, shard_count):
+        chunk_products = products[chunk_index * chunk_size:(chunk_index + 1) * chunk_size]
+        element_dicts = list(extractor.iter_element_dicts(chunk_products))
+        if type_table:
+            new_types = extractor.take_new_types()
+            if new_types: write("T" + json.dumps(new_types) + "\n")
+        write("K" + json.dumps([[element_dict["UniqueId"], element_dict.get("RelatingTypeId")] for element_dict in element_dicts]) + "\n")
+        if source_fingerprints: write("F" + json.dumps([extractor.source_fingerprint(element) for element in chunk_products]) + "\n")
+        if element_dicts: write("\n".join(json.dumps(element_dict) for element_dict in element_dicts) + "\n")
+        write("\n")
+    sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    sys.stdout.reconfigure(encoding="utf-8")
+    run_worker(sys.argv[1], int(sys.argv[2]), int(sys.argv[3]), int(sys.argv[4]), "--type-table" in sys.argv[5:], "--fingerprints" in sys.argv[5:])
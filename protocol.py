@@ -0,0 +1,147 @@
+#
+# 웹소켓 메시지 프로토콜
+#
+# 서버와 협상하는 요소 전송 형식과 메시지 인코딩을 담당합니다. bpy 에 의존하지 않습니다.
+# msgpack_lite 는 애드온의 lib 폴더에 있으므로 lib 가 sys.path 에 있어야 합니다.
+#
+import json
+
+import msgpack_lite
+
+
+PROTOCOL_VERSION = 2
+
+# 요소 전송 형식
+#  - json_string: (기존) 요소마다 JSON 문자열로 만든 뒤, 메시지 전체를 다시 json.dumps 합니다.
+#  - object:      요소를 JSON 객체 그대로 메시지에 넣어 전체를 한 번만 인코딩합니다.
+ELEMENT_FORMAT_JSON_STRING = "json_string"
+ELEMENT_FORMAT_OBJECT = "object"
+SUPPORTED_ELEMENT_FORMATS = (ELEMENT_FORMAT_JSON_STRING, ELEMENT_FORMAT_OBJECT)
+
+# 파라미터 인코딩
+#  - object:    (기존) Parameters/TypeParameters 를 {"Pset__속성": 값} 객체로 보냅니다.
+#  - key_table: 키를 fetch_key_table 메시지로 한 번만 보내고, 파라미터는 [[키 번호, 값], ...] 배열로 보냅니다.
+PARAMETER_ENCODING_OBJECT = "object"
+PARAMETER_ENCODING_KEY_TABLE = "key_table"
+SUPPORTED_PARAMETER_ENCODINGS = (PARAMETER_ENCODING_OBJECT, PARAMETER_ENCODING_KEY_TABLE)
+PARAMETER_FIELDS = ("Parameters", "TypeParameters")
+
+# 프레임 형식 (연결 단위로 협상)
+#  - json:    (기존) JSON 텍스트 프레임
+#  - msgpack: MessagePack 바이너리 프레임. 서버가 server_hello 로 선택하면 이후 모든 송신 메시지에 씁니다.
+WIRE_FORMAT_JSON = "json"
+WIRE_FORMAT_MSGPACK = "msgpack"
+SUPPORTED_WIRE_FORMATS = (WIRE_FORMAT_JSON, WIRE_FORMAT_MSGPACK)
+
+# 사용자가 결과를 기다리는 명령(과 긴 작업의 취소). 수신 시 먼저 처리하고, 응답은 송신 큐의 우선순위 통로로 보냅니다.
+INTERACTIVE_COMMANDS = frozenset({"get_selection", "select_elements", "cancel", "colorize_elements", "reset_colors", "isolate_elements", "unhide_all"})
+
+
+def client_hello():
+    """연결 직후 서버에 보내는 기능 안내 메시지."""
+    return {"type": "client_hello", "payload": {"protocol_version": PROTOCOL_VERSION, "element_formats": list(SUPPORTED_ELEMENT_FORMATS), "parameter_encodings": list(SUPPORTED_PARAMETER_ENCODINGS), "wire_formats": list(SUPPORTED_WIRE_FORMATS), "fetch_resume": True}}
+
+
+def negotiate_element_format(command_data):
+    """명령이 요청한 요소 형식 중 지원하는 것을 고릅니다. 요청이 없거나 모르는 형식이면 기존 형식을 씁니다."""
+    requested = command_data.get("element_format")
+    return requested if requested in SUPPORTED_ELEMENT_FORMATS else ELEMENT_FORMAT_JSON_STRING
+
+
+def negotiate_parameter_encoding(command_data):
+    requested = command_data.get("parameter_encoding")
+    return requested if requested in SUPPORTED_PARAMETER_ENCODINGS else PARAMETER_ENCODING_OBJECT
+
+
+def negotiate_wire_format(command_data):
+    requested = command_data.get("wire_format")
+    return requested if requested in SUPPORTED_WIRE_FORMATS else WIRE_FORMAT_JSON
+
+
+def encode_message(message_dict, wire_format=WIRE_FORMAT_JSON):
+    """json 이면 텍스트(str), msgpack 이면 바이너리(bytes) 프레임을 반환합니다."""
+    if wire_format == WIRE_FORMAT_MSGPACK: return msgpack_lite.packb(message_dict)
+    return json.dumps(message_dict)
+
+
+def decode_message(frame):
+    """수신 프레임을 딕셔너리로 바꿉니다. 바이너리 프레임은 MessagePack 으로 봅니다."""
+    if isinstance(frame, (bytes, bytearray, memoryview)): return msgpack_lite.unpackb(bytes(frame))
+    return json.loads(frame)
+
+
+def encode_elements_message(message_type, payload, element_jsons, element_format, wire_format=WIRE_FORMAT_JSON):
+    """payload 와 요소별로 이미 인코딩된 JSON 문자열 목록으로 메시지 프레임을 만듭니다.
+
+    object 형식에서는 요소 JSON 을 다시 인코딩하지 않고 "elements" 배열에 그대로 이어 붙이므로
+    이스케이프된 JSON-in-JSON 이 생기지 않고, 서버도 한 번만 파싱하면 됩니다.
+    msgpack 프레임에서 object 형식이면 요소를 객체로 풀어 MessagePack 맵으로 넣습니다.
+    """
+    if wire_format == WIRE_FORMAT_MSGPACK:
+        elements = [json.loads(element_json) for element_json in element_jsons] if element_format == ELEMENT_FORMAT_OBJECT else list(element_jsons)
+        return encode_message({"type": message_type, "payload": dict(payload, elements=elements)}, wire_format)
+    if element_format != ELEMENT_FORMAT_OBJECT:
+        return encode_message({"type": message_type, "payload": dict(payload, elements=list(element_jsons))})
+    head = encode_message({"type": message_type, "payload": payload})[:-2]
+    separator = ", " if payload else ""
+    return f'{head}{separator}"elements": [{", ".join(element_jsons)}]}}}}'
+
+
+class KeyTableEncoder:
+    """한 fetch 세션 동안 파라미터 키에 0 부터 차례로 번호를 붙여 [[키 번호, 값], ...] 으로 바꿉니다.
+
+    새로 번호를 받은 키는 take_new_keys() 로 가져가 그 키를 쓰는 요소보다 먼저 보내야 합니다.
+    """
+
+    def __init__(self):
+        self.key_ids = {}
+        self.keys = []
+        self._sent_count = 0
+
+    def encode_parameters(self, parameters):
+        key_ids = self.key_ids
+        pairs = []
+        for key, value in parameters.items():
+            key_id = key_ids.get(key)
+            if key_id is None:
+                key_id = key_ids[key] = len(self.keys)
+                self.keys.append(key)
+            pairs.append([key_id, value])
+        return pairs
+
+    def encode_element_json(self, element_json):
+        element = json.loads(element_json)
+        for field in PARAMETER_FIELDS:
+            if field in element: element[field] = self.encode_parameters(element[field])
+        return json.dumps(element)
+
+    def encode_types(self, types):
+        """타입 테이블의 TypeParameters 도 같은 키 번호로 바꿉니다."""
+        return {type_id: dict(info, TypeParameters=self.encode_parameters(info["TypeParameters"])) for type_id, info in types.items()}
+
+    def take_new_keys(self):
+        """아직 보내지 않은 키들의 {"offset": 첫 번호, "keys": [...]}. 없으면 None."""
+        if self._sent_count == len(self.keys): return None
+        payload = {"offset": self._sent_count, "keys": self.keys[self._sent_count:]}
+        self._sent_count = len(self.keys)
+        return payload
+
+
+class KeyTableDecoder:
+    """서버 쪽 디코더 참고 구현. fetch_key_table 을 받은 순서대로 add_keys 하고, 요소마다 decode_element 합니다."""
+
+    def __init__(self):
+        self.keys = []
+
+    def add_keys(self, payload):
+        if payload["offset"] != len(self.keys): raise ValueError(f"키 테이블 순서가 맞지 않습니다: {payload['offset']} != {len(self.keys)}")
+        self.keys.extend(payload["keys"])
+
+    def decode_parameters(self, pairs):
+        keys = self.keys
+        return {keys[key_id]: value for key_id, value in pairs}
+
+    def decode_element(self, element):
+        for field in PARAMETER_FIELDS:
+            if field in element: element[field] = self.decode_parameters(element[field])
+        return element
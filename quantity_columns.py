@@ -0,0 +1,89 @@
+#
+# 열(column) 단위 수량 내보내기
+#
+# 적산에 필요한 수량 값(NetVolume, NetSideArea, Length 등)을 수량 키마다 float64 NumPy 배열 하나로 모아
+# 작은 JSON 헤더 + 리틀 엔디언 원시 바이너리 프레임으로 보냅니다. bpy 에 의존하지 않습니다.
+#
+# 전송 순서
+#   1) fetch_quantities_header (JSON): 행 수, 열 목록, 이어지는 바이너리 프레임 수
+#   2) 바이너리 프레임들: GlobalId 배열(S22) 다음에 열 순서대로 float64 배열. 큰 배열은 max_frame_bytes 로 나뉩니다.
+#   3) fetch_quantities_complete (JSON)
+# 값이 없는 칸은 NaN 입니다.
+#
+import numpy as np
+
+
+GLOBAL_ID_DTYPE = "S22" # IFC GlobalId 는 22자 ASCII
+VALUE_DTYPE = "<f8"
+MAX_FRAME_BYTES = 1 << 20 # 서버 웹소켓의 기본 최대 메시지 크기(1 MiB)를 넘지 않도록 배열을 나눕니다.
+
+
+class QuantityColumns:
+    """요소별 수량 딕셔너리를 받아 키별 열 배열을 만듭니다."""
+
+    def __init__(self):
+        self.global_ids = []
+        self._columns = {} # 키 -> (행 번호 목록, 값 목록)
+
+    def __len__(self):
+        return len(self.global_ids)
+
+    def add(self, global_id, quantities):
+        row = len(self.global_ids)
+        self.global_ids.append(global_id)
+        columns = self._columns
+        for key, value in quantities.items():
+            # 숫자가 아닌 값(문자열·bool 등)은 열 배열에 담을 수 없으므로 건너뜁니다.
+            if type(value) is not float and type(value) is not int: continue
+            column = columns.get(key)
+            if column is None: column = columns[key] = ([], [])
+            column[0].append(row)
+            column[1].append(value)
+
+    def arrays(self):
+        """{키: 길이가 행 수인 float64 배열}. 키 순서는 처음 나온 순서입니다."""
+        row_count = len(self.global_ids)
+        result = {}
+        for key, (rows, values) in self._columns.items():
+            array = np.full(row_count, np.nan, dtype=VALUE_DTYPE)
+            array[np.asarray(rows, dtype=np.intp)] = values
+            result[key] = array
+        return result
+
+    def global_id_array(self):
+        return np.array(self.global_ids, dtype=GLOBAL_ID_DTYPE)
+
+
+def _split_frames(array, max_frame_bytes):
+    data = memoryview(np.ascontiguousarray(array)).cast("B")
+    return [bytes(data[start:start + max_frame_bytes]) for start in range(0, len(data), max_frame_bytes)] or [b""]
+
+
+def encode_quantity_frames(columns, max_frame_bytes=MAX_FRAME_BYTES):
+    """(헤더 payload, 바이너리 프레임 목록) 을 반환합니다. max_frame_bytes 는 8 과 22 의 배수가 아니어도 됩니다."""
+    frames = _split_frames(columns.global_id_array(), max_frame_bytes)
+    header_columns = []
+    for key, array in columns.arrays().items():
+        array_frames = _split_frames(array, max_frame_bytes)
+        header_columns.append({"key": key, "frames": len(array_frames), "count": int(np.count_nonzero(~np.isnan(array)))})
+        frames.extend(array_frames)
+    header = {
+        "row_count": len(columns),
+        "global_ids": {"dtype": GLOBAL_ID_DTYPE, "frames": len(frames) - sum(column["frames"] for column in header_columns)},
+        "value_dtype": VALUE_DTYPE,
+        "columns": header_columns,
+        "frame_count": len(frames),
+    }
+    return header, frames
+
+
+def decode_quantity_frames(header, frames):
+    """서버 쪽 디코더 참고 구현: (GlobalId 문자열 목록, {키: float64 배열}) 을 반환합니다."""
+    if len(frames) != header["frame_count"]: raise ValueError(f"바이너리 프레임 수가 맞지 않습니다: {len(frames)} != {header['frame_count']}")
+    position = header["global_ids"]["frames"]
+    global_ids = np.frombuffer(b"".join(frames[:position]), dtype=header["global_ids"]["dtype"])
+    arrays = {}
+    for column in header["columns"]:
+        arrays[column["key"]] = np.frombuffer(b"".join(frames[position:position + column["frames"]]), dtype=header["value_dtype"])
+        position += column["frames"]
+    return [global_id.decode("ascii") for global_id in global_ids], arrays
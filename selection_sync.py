@@ -0,0 +1,56 @@
+#
+# 선택 변경 알림
+#
+# 서버가 subscribe_selection 으로 구독하면, 블렌더에서 선택이 바뀔 때마다 get_selection 을 기다리지 않고
+# 마지막으로 알린 선택과 비교해 추가·해제된 GlobalId 만 selection_changed 로 보냅니다.
+# 변경이 SELECTION_DEBOUNCE 동안 멈추면 보내고, 드래그처럼 계속 바뀌면 SELECTION_MAX_WAIT 마다 보냅니다.
+# bpy 에 의존하지 않습니다.
+#
+
+
+SELECTION_DEBOUNCE = 0.1
+SELECTION_MAX_WAIT = 0.5
+
+
+class SelectionTracker:
+    """구독 상태와 마지막으로 서버에 알린 선택(GlobalId 집합)을 관리합니다."""
+
+    def __init__(self, debounce=SELECTION_DEBOUNCE, max_wait=SELECTION_MAX_WAIT):
+        self.debounce = debounce
+        self.max_wait = max_wait
+        self.subscribed = False
+        self._sent = set()
+        self._first_change = None
+        self._last_change = None
+
+    def subscribe(self, guids):
+        """현재 선택을 기준으로 구독을 시작합니다."""
+        self.subscribed = True
+        self.reset(guids)
+
+    def unsubscribe(self):
+        self.subscribed = False
+        self._first_change = self._last_change = None
+
+    def reset(self, guids):
+        """서버가 이미 아는 선택(예: select_elements 로 적용한 선택)을 기준으로 삼습니다."""
+        self._sent = set(guids)
+
+    def mark_changed(self, now):
+        if self._first_change is None: self._first_change = now
+        self._last_change = now
+
+    def due_in(self, now):
+        """보낼 때까지 남은 시간(초). 0 이면 지금 보내고, 바뀐 것이 없으면 None."""
+        if self._last_change is None: return None
+        due = min(self._last_change + self.debounce, self._first_change + self.max_wait)
+        return max(due - now, 0.0)
+
+    def diff(self, guids):
+        """현재 선택과 마지막으로 알린 선택을 비교해 (추가, 해제) 목록을 반환하고, 현재 선택을 기준으로 삼습니다."""
+        current = set(guids)
+        added = [global_id for global_id in guids if global_id not in self._sent]
+        removed = [global_id for global_id in self._sent if global_id not in current]
+        self._sent = current
+        self._first_change = self._last_change = None
+        return added, removed
@@ -0,0 +1,208 @@
+#
+# 웹소켓 송신 큐
+#
+# 메인 스레드(생산자)가 넣은 프레임을 웹소켓 스레드의 송신 작업 하나가 순서대로 보냅니다.
+# websocket.send 는 연결의 전송 버퍼가 write_limit 를 넘으면 drain 될 때까지 기다리므로,
+# 네트워크나 서버가 느리면 큐가 차고, 큐가 가득 차면 생산자는 기다리거나(put) 다음 틱으로 미룹니다(try_put).
+# 큐 크기는 프레임 수와 바이트 수 두 가지로 제한합니다. bpy 에 의존하지 않습니다.
+#
+# 우선순위 통로: 선택 응답처럼 작고 급한 메시지는 priority=True 로 넣습니다. 별도 통로에 들어가 크기 제한 없이 바로 받아들여지고,
+# 송신 작업은 다음 프레임을 고를 때 이 통로를 먼저 비웁니다. 이미 보내고 있는 대량 프레임 하나가 끝날 때까지만 기다립니다.
+#
+# 묶음 프레임(hold=True): 수량 헤더 뒤의 원시 배열 프레임처럼 바이너리 프레임이 끼어들면 안 되는 묶음은 마지막 프레임을 뺀
+# 나머지를 hold=True 로 넣습니다. 이런 프레임을 보낸 뒤 묶음의 마지막 프레임을 보낼 때까지 바이너리 우선순위 프레임(msgpack)은
+# 기다리게 합니다. 우선순위 통로 맨 앞이 텍스트 프레임(JSON)이면 원시 배열과 구분되므로 그대로 먼저 보냅니다.
+# 묶음 프레임은 sequence(묶음을 넣는 생산자)와 함께 넣습니다. 첫 hold 프레임부터 마지막 프레임을 넣을 때까지
+# 다른 생산자의 일반 프레임(fetch_queued 같은 응답)은 따로 두었다가 묶음 뒤에 붙입니다. 생산자가 여러 틱에 걸쳐 넣어도 끼어들지 않습니다.
+#
+import asyncio
+import collections
+import threading
+import time
+
+
+SEND_QUEUE_MAX_FRAMES = 64
+SEND_QUEUE_MAX_BYTES = 4 * 1024 * 1024
+
+
+class SendQueueClosed(ConnectionError):
+    pass
+
+
+def frame_size(frame):
+    # 문자열은 인코딩하지 않고 글자 수로 어림합니다.
+    return len(frame)
+
+
+class SendQueue:
+    """연결 하나에 속한 송신 큐. put/try_put 은 어느 스레드에서나, run 은 웹소켓 이벤트 루프에서 호출합니다."""
+
+    def __init__(self, loop, max_frames=SEND_QUEUE_MAX_FRAMES, max_bytes=SEND_QUEUE_MAX_BYTES):
+        self.loop = loop
+        self.max_frames = max_frames
+        self.max_bytes = max_bytes
+        self._frames = collections.deque() # 전송 중인 프레임도 전송이 끝날 때까지 큐에 남습니다.
+        self._priority_frames = collections.deque()
+        self._condition = threading.Condition()
+        self._wakeup = asyncio.Event()
+        self._closed_error = None
+        self.bytes_pending = 0
+        self.peak_depth = 0
+        self.peak_bytes = 0
+        self.sent_frames = 0
+        self.sent_bytes = 0
+        self.full_count = 0 # 큐가 가득 차 생산자가 기다리거나 미룬 횟수
+        self.wait_time = 0.0 # 생산자가 put 에서 기다린 시간(초)
+        self.priority_frames = 0 # 우선순위 통로로 보낸 프레임 수
+        self._holding = False # hold=True 프레임을 보낸 뒤 묶음이 끝나지 않았으면 True
+        self._sequence = None # 일반 통로에 묶음을 넣고 있는 생산자. 그동안 다른 생산자의 일반 프레임은 _waiting 에 둡니다.
+        self._waiting = collections.deque()
+
+    @property
+    def depth(self):
+        return len(self._frames) + len(self._priority_frames)
+
+    @property
+    def closed(self):
+        return self._closed_error is not None
+
+    def _raise_if_closed(self):
+        if self._closed_error is not None: raise self._closed_error
+
+    def _has_room(self, size):
+        # 큐가 비어 있으면 한도보다 큰 프레임도 받아야 멈추지 않습니다.
+        return not self._frames or (len(self._frames) < self.max_frames and self.bytes_pending + size <= self.max_bytes)
+
+    def _append(self, frame, size, priority=False, hold=False):
+        # 묶음 중에는 우선순위 통로에 기다리는 프레임이 있어도 송신 작업이 잠들어 있을 수 있습니다.
+        was_empty = (not self._frames and not self._priority_frames) or self._holding
+        (self._priority_frames if priority else self._frames).append([frame, size, hold]) # hold 는 묶음이 취소되면 바뀌므로 목록으로 둡니다.
+        self.bytes_pending += size
+        if priority: self.priority_frames += 1
+        self.peak_depth = max(self.peak_depth, self.depth)
+        self.peak_bytes = max(self.peak_bytes, self.bytes_pending)
+        if was_empty: self.loop.call_soon_threadsafe(self._wakeup.set)
+
+    def _wait_for_sequence(self, frame, size, priority, sequence):
+        """다른 생산자가 묶음을 넣고 있으면 이 일반 프레임을 묶음이 끝날 때까지 따로 두고 True."""
+        if priority or self._sequence is None or sequence is self._sequence: return False
+        self._waiting.append((frame, size))
+        return True
+
+    def _enqueue(self, frame, size, priority, hold, sequence):
+        ends_sequence = sequence is not None and sequence is self._sequence and not hold
+        if sequence is not None and hold and not priority: self._sequence = sequence
+        self._append(frame, size, priority, hold)
+        if ends_sequence: self._end_sequence()
+
+    def _end_sequence(self):
+        self._sequence = None
+        while self._waiting: self._append(*self._waiting.popleft())
+
+    def end_sequence(self, sequence):
+        """묶음을 넣던 생산자가 마지막 프레임을 넣지 못하고 끝났을 때 호출합니다. 따로 둔 프레임을 보냅니다."""
+        with self._condition:
+            if self._sequence is sequence and sequence is not None: self._end_sequence()
+
+    def try_put(self, frame, priority=False, hold=False, sequence=None):
+        """자리가 있으면 넣고 True, 가득 찼으면 False 를 반환합니다. 연결이 닫혔으면 SendQueueClosed.
+
+        hold: 다음 일반 프레임까지 바이너리 우선순위 프레임이 끼어들지 않아야 하는 묶음 프레임.
+        sequence: 묶음을 넣는 생산자. 첫 hold 프레임부터 hold 가 아닌 프레임까지 일반 통로를 이 생산자가 씁니다.
+        """
+        size = frame_size(frame)
+        with self._condition:
+            self._raise_if_closed()
+            if self._wait_for_sequence(frame, size, priority, sequence): return True
+            if not priority and not self._has_room(size):
+                self.full_count += 1
+                return False
+            self._enqueue(frame, size, priority, hold, sequence)
+            return True
+
+    def put(self, frame, timeout=None, priority=False, hold=False, sequence=None):
+        """자리가 날 때까지 기다렸다가 넣습니다. timeout 안에 자리가 나지 않으면 TimeoutError. 우선순위 프레임은 기다리지 않습니다."""
+        size = frame_size(frame)
+        with self._condition:
+            self._raise_if_closed()
+            if self._wait_for_sequence(frame, size, priority, sequence): return
+            if not priority and not self._has_room(size):
+                self.full_count += 1
+                started = time.perf_counter()
+                ready = self._condition.wait_for(lambda: self._closed_error is not None or self._has_room(size), timeout)
+                self.wait_time += time.perf_counter() - started
+                self._raise_if_closed()
+                if not ready: raise TimeoutError(f"송신 큐가 {timeout}초 동안 비지 않았습니다.")
+            self._enqueue(frame, size, priority, hold, sequence)
+
+    def discard_pending(self):
+        """아직 보내지 않은 일반 프레임을 버리고 버린 수를 반환합니다. 보내고 있을 수 있는 맨 앞 프레임은 남깁니다.
+
+        끝나지 않은 묶음도 더 이어지지 않으므로 기다리던 우선순위 프레임과 따로 둔 다른 생산자의 프레임을 다시 보냅니다.
+        """
+        with self._condition:
+            dropped = len(self._frames) - 1 if self._frames else 0
+            while len(self._frames) > 1: self.bytes_pending -= self._frames.pop()[1]
+            if self._frames: self._frames[0][2] = False
+            if self._holding:
+                self._holding = False
+                self.loop.call_soon_threadsafe(self._wakeup.set)
+            self._end_sequence()
+            self._condition.notify_all()
+            return dropped
+
+    def is_idle(self):
+        """보낼 프레임이 모두 전송되었으면 True. 연결이 닫혔으면 SendQueueClosed."""
+        with self._condition:
+            self._raise_if_closed()
+            return not self._frames and not self._priority_frames and not self._waiting
+
+    def close(self, error=None):
+        with self._condition:
+            if self._closed_error is None: self._closed_error = error or SendQueueClosed("웹소켓 연결이 끊어졌습니다.")
+            self._frames.clear()
+            self._priority_frames.clear()
+            self._waiting.clear()
+            self._sequence = None
+            self.bytes_pending = 0
+            self._holding = False
+            self._condition.notify_all()
+
+    def metrics(self):
+        with self._condition:
+            return {
+                "depth": self.depth, "bytes_pending": self.bytes_pending, "priority_frames": self.priority_frames,
+                "peak_depth": self.peak_depth, "peak_bytes": self.peak_bytes,
+                "sent_frames": self.sent_frames, "sent_bytes": self.sent_bytes,
+                "full_count": self.full_count, "wait_time": round(self.wait_time, 3),
+            }
+
+    async def run(self, websocket):
+        """큐의 프레임을 순서대로 보냅니다. 전송이 실패하면 큐를 닫아 생산자에게 오류를 알립니다."""
+        try:
+            while True:
+                with self._condition:
+                    if self._closed_error is not None: return
+                    lane = self._priority_frames or self._frames # 우선순위 통로를 먼저 비웁니다.
+                    if self._holding and lane is self._priority_frames and not isinstance(lane[0][0], str): lane = self._frames
+                    entry = lane[0] if lane else None
+                    if entry is None: self._wakeup.clear()
+                if entry is None:
+                    await self._wakeup.wait()
+                    continue
+                frame, size, _ = entry
+                await websocket.send(frame) # 전송 버퍼가 가득 차면 drain 될 때까지 기다립니다.
+                with self._condition:
+                    if lane and lane[0] is entry:
+                        lane.popleft()
+                        self.bytes_pending -= size
+                    if lane is self._frames: self._holding = entry[2]
+                    self.sent_frames += 1
+                    self.sent_bytes += size
+                    self._condition.notify_all()
+        except asyncio.CancelledError:
+            self.close()
+            raise
+        except Exception as e:
+            self.close(SendQueueClosed(f"웹소켓 전송 실패: {e}"))
+            raise
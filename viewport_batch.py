@@ -0,0 +1,110 @@
+#
+# 많은 객체를 한 번에 다루는 뷰포트 작업
+#
+# 서버가 수만 개의 GlobalId 를 보내도 객체마다 연산자나 RNA 호출을 반복하지 않도록,
+# 블렌더 쪽에서는 foreach_get 으로 장면 전체 배열을 한 번에 읽고 계산은 NumPy 로 합니다. bpy 에 의존하지 않습니다.
+#
+import math
+
+import numpy as np
+
+
+# 서버의 팔레트 색은 웹과 같은 sRGB(#rrggbb 또는 0~1 [r, g, b(, a)])이고, 블렌더 객체 색(Object.color)은 선형입니다.
+DEFAULT_VALUE_PALETTE = ("#2c7bb6", "#abd9e9", "#ffffbf", "#fdae61", "#d7191c") # 낮은 값(파랑) -> 높은 값(빨강)
+DEFAULT_CATEGORY_PALETTE = ("#4e79a7", "#f28e2b", "#e15759", "#76b7b2", "#59a14f", "#edc948", "#b07aa1", "#ff9da7", "#9c755f", "#bab0ac")
+
+VIEWPORT_SENSOR_WIDTH = 36.0 # 블렌더 3D 뷰가 화각을 계산할 때 쓰는 센서 폭(mm)
+FRAME_MARGIN = 1.1 # 대상이 화면 가장자리에 붙지 않도록 둘 여유
+
+
+def union_bounds(matrices, corners, positions):
+    """positions 행 객체들의 월드 공간 합집합 경계 상자 (최소, 최대).
+
+    matrices 는 foreach_get("matrix_world") 로 읽은 (객체 수 * 16) 배열,
+    corners 는 foreach_get("bound_box") 로 읽은 (객체 수 * 24) 배열입니다. 대상이 없으면 None.
+    """
+    positions = np.asarray(positions, dtype=np.intp)
+    if not len(positions): return None
+    # 블렌더 행렬은 열 우선으로 저장되므로 (4, 4) 로 바꾸면 전치 행렬이 되어 행 벡터를 오른쪽에서 곱합니다.
+    matrices = np.asarray(matrices).reshape(-1, 4, 4)[positions]
+    corners = np.asarray(corners).reshape(-1, 8, 3)[positions]
+    world = np.matmul(corners, matrices[:, :3, :3]) + matrices[:, 3:4, :3]
+    return world.min(axis=(0, 1)), world.max(axis=(0, 1))
+
+
+def view_distance_for_bounds(minimum, maximum, lens):
+    """초점 거리 lens(mm) 인 3D 뷰에서 경계 상자 전체가 보이는 (중심, 시점 거리)."""
+    minimum = np.asarray(minimum, dtype=np.float64)
+    maximum = np.asarray(maximum, dtype=np.float64)
+    center = (minimum + maximum) / 2
+    radius = max(float(np.linalg.norm(maximum - minimum)) / 2, 0.1) # 점 하나여도 확대가 지나치지 않도록
+    angle = 2 * math.atan(VIEWPORT_SENSOR_WIDTH / (2 * lens))
+    return center, radius / math.tan(angle / 2) * FRAME_MARGIN
+
+
+def srgb_to_linear(rgb):
+    rgb = np.asarray(rgb, dtype=np.float32)
+    return np.where(rgb <= 0.04045, rgb / 12.92, ((rgb + 0.055) / 1.055) ** 2.4)
+
+
+def parse_color(color):
+    """'#rrggbb', '#rrggbbaa' 또는 [r, g, b(, a)] (0~1) -> sRGB RGBA 배열. 형식이 틀리면 ValueError."""
+    if isinstance(color, str):
+        text = color.lstrip("#")
+        if len(text) not in (6, 8): raise ValueError(f"색 형식이 올바르지 않습니다: {color}")
+        channels = [int(text[i:i + 2], 16) / 255 for i in range(0, len(text), 2)]
+    else: channels = [float(channel) for channel in color]
+    if len(channels) == 3: channels.append(1.0)
+    if len(channels) != 4: raise ValueError(f"색 형식이 올바르지 않습니다: {color}")
+    return np.clip(np.array(channels, dtype=np.float32), 0.0, 1.0)
+
+
+def to_object_colors(srgb_colors):
+    """sRGB RGBA (N, 4) -> Object.color 에 쓸 선형 RGBA (N, 4). 알파는 그대로 둡니다."""
+    colors = np.array(srgb_colors, dtype=np.float32).reshape(-1, 4)
+    colors[:, :3] = srgb_to_linear(colors[:, :3])
+    return colors
+
+
+def value_colors(values, palette=None, value_range=None):
+    """숫자 값마다 팔레트 색을 보간한 (선형 RGBA (N, 4), 값이 있는 행 마스크).
+
+    팔레트 색은 값 범위(value_range, 없으면 최솟값~최댓값)에 고르게 놓입니다. 값이 없거나(None) NaN 인 행은 칠하지 않습니다.
+    """
+    values = np.array(values, dtype=np.float64)
+    valid = np.isfinite(values)
+    stops = np.array([parse_color(color) for color in palette or DEFAULT_VALUE_PALETTE])
+    if value_range is not None: low, high = (float(bound) for bound in value_range)
+    elif valid.any(): low, high = float(values[valid].min()), float(values[valid].max())
+    else: low = high = 0.0
+    scaled = (values - low) / (high - low) if high > low else np.zeros_like(values)
+    positions = np.linspace(0.0, 1.0, len(stops))
+    scaled = np.clip(np.where(valid, scaled, 0.0), 0.0, 1.0)
+    srgb = np.stack([np.interp(scaled, positions, stops[:, channel]) for channel in range(4)], axis=1)
+    return to_object_colors(srgb), valid
+
+
+def category_colors(categories, palette=None):
+    """분류마다 팔레트 색을 정한 선형 RGBA (N, 4).
+
+    palette 가 {분류: 색} 이면 그 색을 쓰고, 목록이면(또는 {분류: 색} 에 없는 분류는 기본 팔레트에서)
+    분류가 처음 나온 순서대로 돌아가며 씁니다.
+    """
+    named = {category: parse_color(color) for category, color in palette.items()} if isinstance(palette, dict) else {}
+    cycle = [parse_color(color) for color in (palette if palette and not named else DEFAULT_CATEGORY_PALETTE)]
+    table = []
+    codes = {}
+    unnamed = 0
+    rows = np.empty(len(categories), dtype=np.intp)
+    for row, category in enumerate(categories):
+        code = codes.get(category)
+        if code is None:
+            code = codes[category] = len(table)
+            color = named.get(category)
+            if color is None:
+                color = cycle[unnamed % len(cycle)]
+                unnamed += 1
+            table.append(color)
+        rows[row] = code
+    if not table: return np.empty((0, 4), dtype=np.float32)
+    return to_object_colors(np.array(table))[rows]